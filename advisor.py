@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Search-Based Move Advisor
+基于蒙特卡洛树搜索的出牌建议：考虑未来抽牌、红桃随机回复和敌人反击
+"""
+
+import argparse
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from card import ids_to_cards
+from game_engine import RegicideGame, GameState
+from simulator import POLICIES, spawn_seeds, step_game
+
+# 行动类型
+PLAY = "play"
+DISCARD = "discard"
+
+# 单个弃牌节点最多考虑的弃牌方案数
+MAX_DISCARD_OPTIONS = 32
+
+
+def state_key(game):
+    """
+    搜索用的状态键：游戏的规范Zobrist哈希（增量维护，O(1)取得）。
+
+    牌库顺序是玩家看不到的信息，每次模拟都会重新洗牌，所以规范形式不计入；
+    弃牌堆顺序也不影响红桃的均匀随机回复。
+    """
+    return game.state_hash()
+
+
+def discard_options(cards, required, limit=MAX_DISCARD_OPTIONS):
+    """列出满足弃牌要求的最小弃牌组合（去掉任何一张都不够），按总点数从小到大"""
+    options = []
+    for size in range(1, len(cards) + 1):
+        for combo in itertools.combinations(cards, size):
+            total = sum(card.attack_value for card in combo)
+            if total < required:
+                continue
+            # 最小组合：去掉最小的一张后不满足要求
+            if total - min(card.attack_value for card in combo) >= required:
+                continue
+            options.append((total, combo))
+    options.sort(key=lambda option: (option[0], len(option[1])))
+    return [tuple(card.id for card in combo) for _, combo in options[:limit]]
+
+
+def legal_actions(game):
+    """当前状态下所有合法行动（以牌编号元组表示）"""
+    if game.game_state == GameState.DISCARD_SELECTION:
+        hand = game.get_current_player_hand()
+        return [(DISCARD, ids) for ids in discard_options(hand.cards, game.required_discard_value)]
+    # 按伤害内核的结算结果排序：能击败敌人的在前，其余按反击伤害从低到高；
+    # UCB1按顺序尝试未访问的行动，时间预算较短时先评估更有希望的出牌
+    plays = game.evaluate_possible_plays()
+    plays.sort(key=lambda play: (not play[1].defeats_enemy, play[1].counter_damage, -play[1].damage))
+    return [(PLAY, tuple(card.id for card in cards)) for cards, _ in plays]
+
+
+def apply_action(game, action):
+    """执行一个行动，返回是否成功"""
+    kind, card_ids = action
+    cards = ids_to_cards(card_ids)
+    if kind == DISCARD:
+        game.selected_for_discard = []
+        for card in cards:
+            game.toggle_discard_selection(card)
+        return game.confirm_discard()
+    return bool(game.play_cards(cards))
+
+
+def is_terminal(game):
+    """对局是否结束（无合法行动视为失败）"""
+    if game.game_state in (GameState.VICTORY, GameState.DEFEAT):
+        return True
+    if not game.has_legal_action():
+        game.declare_defeat()
+        return True
+    return False
+
+
+class SearchNode:
+    """置换表中的决策节点：记录每个行动的访问次数、累计回报和胜场"""
+
+    __slots__ = ('actions', 'visits', 'action_visits', 'action_value', 'action_wins', 'action_enemies')
+
+    def __init__(self, actions):
+        self.actions = actions
+        self.visits = 0
+        self.action_visits = [0] * len(actions)
+        self.action_value = [0.0] * len(actions)
+        self.action_wins = [0] * len(actions)
+        self.action_enemies = [0] * len(actions)
+
+    def select(self, exploration):
+        """UCB1选择：先尝试未访问过的行动"""
+        best_index = 0
+        best_score = -math.inf
+        log_visits = math.log(self.visits + 1)
+        for index, visits in enumerate(self.action_visits):
+            if visits == 0:
+                return index
+            score = self.action_value[index] / visits + exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best_score = score
+                best_index = index
+        return best_index
+
+    def update(self, index, reward, victory, enemies_defeated):
+        """回传一次模拟结果"""
+        self.visits += 1
+        self.action_visits[index] += 1
+        self.action_value[index] += reward
+        self.action_wins[index] += victory
+        self.action_enemies[index] += enemies_defeated
+
+
+def rollout_reward(game):
+    """模拟结束时的回报：胜利为1，失败按击败的敌人数给予少量部分分"""
+    defeated = game.enemy_queue.get_defeated_enemies()
+    if game.victory:
+        return 1.0, 1, defeated
+    return 0.5 * defeated / len(game.enemy_queue.enemies), 0, defeated
+
+
+def search(snapshot, player_count=1, iterations=1000, time_limit=None, exploration=0.7,
+           rollout_policy="greedy", seed=None, table=None, max_turns=1000):
+    """
+    信息集蒙特卡洛树搜索。
+
+    每次迭代从根状态出发，先用独立随机源重新洗牌并打乱尚未出场的敌人（对看不到的牌库和敌人顺序做确定化），
+    然后沿置换表中的节点按UCB1选择行动，遇到新状态时扩展节点并用默认策略模拟到终局，
+    最后把结果回传到路径上的所有节点。返回根节点的行动统计。
+    """
+    table = {} if table is None else table
+    game = RegicideGame(player_count)
+    rng = random.Random(seed)
+    policy = POLICIES[rollout_policy]()
+    deadline = time.perf_counter() + time_limit if time_limit else None
+
+    game.restore(snapshot)
+    root_key = state_key(game)
+    if is_terminal(game):
+        return SearchNode([])
+    root = table.get(root_key)
+    if root is None:
+        root = table[root_key] = SearchNode(legal_actions(game))
+
+    for iteration in range(iterations):
+        if deadline is not None and iteration and time.perf_counter() > deadline:
+            break
+
+        game.restore(snapshot)
+        game.rng.seed(rng.getrandbits(63))
+        game.deck.shuffle()
+        game.enemy_queue.shuffle_unrevealed()
+        policy.reset(rng.getrandbits(63))
+
+        # 选择与扩展：沿已有节点下行，遇到首次尝试的行动或新状态时停止
+        path = []
+        node = root
+        while True:
+            index = node.select(exploration)
+            path.append((node, index))
+            first_visit = node.action_visits[index] == 0
+            if not apply_action(game, node.actions[index]):
+                game.declare_defeat()
+            if first_visit or is_terminal(game):
+                break
+            key = state_key(game)
+            child = table.get(key)
+            if child is None:
+                table[key] = SearchNode(legal_actions(game))
+                break
+            node = child
+
+        # 模拟
+        steps = 0
+        while steps < max_turns and step_game(game, policy):
+            steps += 1
+
+        reward, victory, defeated = rollout_reward(game)
+        for visited, index in path:
+            visited.update(index, reward, victory, defeated)
+
+    return root
+
+
+def _search_worker(snapshot, player_count, iterations, time_limit, exploration, rollout_policy, seed):
+    """子进程任务：独立搜索并返回根节点的行动统计"""
+    root = search(snapshot, player_count, iterations, time_limit, exploration, rollout_policy, seed)
+    return root.actions, root.action_visits, root.action_wins, root.action_enemies, root.action_value
+
+
+class MCTSAdvisor:
+    """
+    出牌建议器：对当前局面的所有出牌（或弃牌）方案估计胜率并排序。
+
+    workers>1 时第一次 advise() 创建进程池，之后的调用复用它；用完后调用 close()（或用 with 语句）。
+    """
+
+    def __init__(self, iterations=2000, time_limit=None, workers=1, exploration=0.7,
+                 rollout_policy="greedy", seed=None, max_table_size=200000):
+        self.iterations = iterations          # 模拟次数预算
+        self.time_limit = time_limit          # 时间预算（秒），None表示只按次数
+        self.workers = workers                # 并行模拟的进程数
+        self.exploration = exploration
+        self.rollout_policy = rollout_policy
+        self.rng = random.Random(seed)
+        self.max_table_size = max_table_size
+        self.table = {}                       # 置换表，跨多次调用复用
+        self._executor = None                 # 并行搜索的进程池，跨多次调用复用
+
+    def _get_executor(self):
+        """进程池（第一次需要时创建）"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        """关闭进程池；之后再调用 advise() 会重新创建"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def __del__(self):
+        if getattr(self, '_executor', None) is not None:
+            self.close()
+
+    def advise(self, game):
+        """返回按估计胜率排序的建议列表"""
+        snapshot = game.snapshot()
+        if self.workers <= 1:
+            if len(self.table) > self.max_table_size:
+                self.table.clear()
+            root = search(snapshot, game.player_count, self.iterations, self.time_limit,
+                          self.exploration, self.rollout_policy, self.rng.getrandbits(63), self.table)
+            stats = [(root.actions, root.action_visits, root.action_wins,
+                      root.action_enemies, root.action_value)]
+        else:
+            per_worker = -(-self.iterations // self.workers)
+            seeds = spawn_seeds(self.rng.getrandbits(63), self.workers)
+            executor = self._get_executor()
+            futures = [
+                executor.submit(_search_worker, snapshot, game.player_count, per_worker,
+                                self.time_limit, self.exploration, self.rollout_policy, seed)
+                for seed in seeds
+            ]
+            stats = [future.result() for future in futures]
+
+        # 合并各进程的根节点统计
+        merged = {}
+        for actions, visits, wins, enemies, values in stats:
+            for action, n, w, e, v in zip(actions, visits, wins, enemies, values):
+                totals = merged.setdefault(action, [0, 0, 0, 0.0])
+                totals[0] += n
+                totals[1] += w
+                totals[2] += e
+                totals[3] += v
+
+        # 出牌附带伤害内核的即时结算结果
+        outcomes = {}
+        if game.game_state == GameState.PLAYING:
+            outcomes = {tuple(card.id for card in cards): outcome
+                        for cards, outcome in game.evaluate_possible_plays()}
+
+        advice = []
+        for (kind, card_ids), (visits, wins, enemies, value) in merged.items():
+            outcome = outcomes.get(card_ids) if kind == PLAY else None
+            advice.append({
+                'action': kind,
+                'cards': ids_to_cards(card_ids),
+                'damage': outcome.damage if outcome else None,
+                'counter_damage': outcome.counter_damage if outcome else None,
+                'win_probability': wins / visits if visits else 0.0,
+                'expected_enemies_defeated': enemies / visits if visits else 0.0,
+                'value': value / visits if visits else 0.0,
+                'visits': visits,
+            })
+        advice.sort(key=lambda item: (item['win_probability'], item['value'], item['visits']), reverse=True)
+        return advice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo move advisor for Regicide")
+    parser.add_argument("--seed", type=int, default=1, help="game seed of the position to analyse")
+    parser.add_argument("--iterations", type=int, default=2000, help="rollout budget")
+    parser.add_argument("--time-limit", type=float, default=None, help="time budget in seconds")
+    parser.add_argument("--workers", type=int, default=1, help="parallel search processes")
+    parser.add_argument("--rollout-policy", choices=sorted(POLICIES), default="greedy")
+    parser.add_argument("--top", type=int, default=10, help="number of plays to show")
+    args = parser.parse_args()
+
+    game = RegicideGame()
+    game.start_new_game(args.seed)
+    print(f"Enemy: {game.enemy_queue.get_current_enemy()}  Hand: {game.get_current_player_hand()}")
+
+    with MCTSAdvisor(args.iterations, args.time_limit, args.workers, rollout_policy=args.rollout_policy,
+                     seed=args.seed) as advisor:
+        start_time = time.perf_counter()
+        advice = advisor.advise(game)
+        elapsed = time.perf_counter() - start_time
+
+    for item in advice[:args.top]:
+        cards = " ".join(str(card) for card in item['cards'])
+        counter = "" if item['counter_damage'] is None else f"  counter {item['counter_damage']:2d}"
+        print(f"{item['action']:<8} {cards:<20} win {item['win_probability']:6.1%}  "
+              f"enemies {item['expected_enemies_defeated']:5.2f}{counter}  visits {item['visits']}")
+    print(f"{sum(item['visits'] for item in advice)} rollouts in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Vectorized Batch Engine
+NumPy批量引擎：用 (N, …) 数组同时推进N局游戏，规则与 RegicideGame 一致
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from card import CARDS_BY_ID, CARD_COUNT, RANK_COUNT, SUIT_ORDER, Suit
+from game_engine import RegicideGame, GameState
+
+# 阶段编码
+PLAYING = 0
+DISCARD_SELECTION = 1
+VICTORY = 2
+DEFEAT = 3
+
+PHASE_CODES = {
+    GameState.PLAYING: PLAYING,
+    GameState.DISCARD_SELECTION: DISCARD_SELECTION,
+    GameState.VICTORY: VICTORY,
+    GameState.DEFEAT: DEFEAT,
+}
+
+MAX_HAND_SIZE = RegicideGame.MAX_HAND_SIZE
+INITIAL_HAND_SIZE = 8
+ENEMY_COUNT = 12
+
+# 按整数编号索引的牌属性表
+CARD_IDS = np.arange(CARD_COUNT)
+CARD_VALUES = np.array([card.attack_value for card in CARDS_BY_ID], dtype=np.int16)
+CARD_SUITS = np.array([SUIT_ORDER.index(card.suit) for card in CARDS_BY_ID], dtype=np.int8)
+NUMBER_CARD_IDS = np.array([card.id for card in CARDS_BY_ID if card.is_number_card], dtype=np.int8)
+DECK_CAPACITY = len(NUMBER_CARD_IDS)
+
+HEARTS = SUIT_ORDER.index(Suit.HEARTS)
+DIAMONDS = SUIT_ORDER.index(Suit.DIAMONDS)
+CLUBS = SUIT_ORDER.index(Suit.CLUBS)
+SPADES = SUIT_ORDER.index(Suit.SPADES)
+
+# 敌人属性（按牌面编号 J=10, Q=11, K=12 索引）
+ENEMY_HEALTH = np.zeros(RANK_COUNT, dtype=np.int16)
+ENEMY_ATTACK = np.zeros(RANK_COUNT, dtype=np.int16)
+ENEMY_HEALTH[10:] = (20, 30, 40)
+ENEMY_ATTACK[10:] = (10, 15, 20)
+ENEMY_TIERS = [
+    np.array([suit_index * RANK_COUNT + offset for suit_index in range(len(SUIT_ORDER))], dtype=np.int8)
+    for offset in (10, 11, 12)
+]
+
+# 出牌/弃牌排序键：点数优先，编号次之（与 simulator.HighCardPolicy 一致）
+_CARD_ORDER_KEY = CARD_VALUES.astype(np.int32) * 64 + CARD_IDS
+
+
+class BatchRegicide:
+    """N局游戏的数组状态和批量规则推进"""
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+
+        self.deck = np.zeros((size, DECK_CAPACITY), dtype=np.int8)   # 牌库（从底到顶）
+        self.deck_len = np.zeros(size, dtype=np.int16)
+        self.hand = np.zeros((size, CARD_COUNT), dtype=bool)
+        self.discard = np.zeros((size, CARD_COUNT), dtype=bool)
+        self.enemies = np.zeros((size, ENEMY_COUNT), dtype=np.int8)
+        self.enemy_index = np.zeros(size, dtype=np.int16)
+        self.enemy_health = np.zeros(size, dtype=np.int16)
+        self.attack_reduction = np.zeros(size, dtype=np.int16)
+        self.phase = np.full(size, PLAYING, dtype=np.int8)
+        self.required_discard = np.zeros(size, dtype=np.int16)
+        self.turn_count = np.zeros(size, dtype=np.int32)
+
+        # 最近一步中各局回复的牌数（用于与标量引擎对比）
+        self.cards_healed = np.zeros(size, dtype=np.int16)
+
+    # ------------------------------------------------------------------
+    # 初始化
+    # ------------------------------------------------------------------
+
+    def start_new_games(self):
+        """为所有对局洗牌、排列敌人并发初始手牌"""
+        rows = np.arange(self.size)[:, None]
+
+        order = np.argsort(self.rng.random((self.size, DECK_CAPACITY)), axis=1)
+        self.deck[:] = NUMBER_CARD_IDS[order]
+        self.deck_len[:] = DECK_CAPACITY
+
+        tiers = []
+        for tier in ENEMY_TIERS:
+            order = np.argsort(self.rng.random((self.size, len(tier))), axis=1)
+            tiers.append(tier[order])
+        self.enemies[:] = np.concatenate(tiers, axis=1)
+
+        self.hand[:] = False
+        self.discard[:] = False
+        top = self.deck[:, DECK_CAPACITY - INITIAL_HAND_SIZE:]
+        self.hand[rows, top] = True
+        self.deck_len -= INITIAL_HAND_SIZE
+
+        self.enemy_index[:] = 0
+        self.attack_reduction[:] = 0
+        self.enemy_health[:] = ENEMY_HEALTH[self.enemies[:, 0] % RANK_COUNT]
+        self.phase[:] = PLAYING
+        self.required_discard[:] = 0
+        self.turn_count[:] = 0
+
+    def load_game(self, row, game):
+        """把标量 RegicideGame 的状态复制到第row局"""
+        deck_ids = game.deck.card_ids()
+        self.deck[row] = 0
+        self.deck[row, :len(deck_ids)] = deck_ids
+        self.deck_len[row] = len(deck_ids)
+
+        self.hand[row] = False
+        self.hand[row, [card.id for card in game.get_current_player_hand().cards]] = True
+        self.discard[row] = False
+        self.discard[row, [card.id for card in game.discard_pile]] = True
+
+        queue = game.enemy_queue
+        self.enemies[row] = [enemy.card.id for enemy in queue.enemies]
+        self.enemy_index[row] = queue.current_enemy_index
+        current = queue.get_current_enemy()
+        self.enemy_health[row] = current.current_health if current else 0
+        self.attack_reduction[row] = current.attack_reduction if current else 0
+
+        self.phase[row] = PHASE_CODES[game.game_state]
+        self.required_discard[row] = game.required_discard_value
+        self.turn_count[row] = game.turn_count
+
+    @classmethod
+    def from_games(cls, games, seed=None):
+        """从一组标量对局创建批量状态"""
+        batch = cls(len(games), seed)
+        for row, game in enumerate(games):
+            batch.load_game(row, game)
+        return batch
+
+    # ------------------------------------------------------------------
+    # 策略（可向量化）
+    # ------------------------------------------------------------------
+
+    def choose_plays(self, rows):
+        """高牌策略：每局打出点数最大的单张牌，返回 (len(rows), 52) 的出牌掩码"""
+        keys = np.where(self.hand[rows], _CARD_ORDER_KEY, -1)
+        chosen = np.argmax(keys, axis=1)
+        played = np.zeros((len(rows), CARD_COUNT), dtype=bool)
+        played[np.arange(len(rows)), chosen] = True
+        return played
+
+    def choose_discards(self, rows):
+        """弃牌策略：从小到大弃牌直到满足要求，返回弃牌掩码"""
+        hand = self.hand[rows]
+        keys = np.where(hand, _CARD_ORDER_KEY, np.iinfo(np.int32).max)
+        order = np.argsort(keys, axis=1)
+        sorted_values = np.where(np.take_along_axis(hand, order, axis=1), CARD_VALUES[order], 0)
+        before = np.cumsum(sorted_values, axis=1) - sorted_values
+        take_sorted = (before < self.required_discard[rows, None]) & (sorted_values > 0)
+        chosen = np.zeros_like(hand)
+        np.put_along_axis(chosen, order, take_sorted, axis=1)
+        return chosen
+
+    # ------------------------------------------------------------------
+    # 规则
+    # ------------------------------------------------------------------
+
+    def step(self):
+        """所有未结束的对局各推进一步，返回仍在进行的对局数"""
+        self.cards_healed[:] = 0
+
+        # 无合法行动视为失败（与 simulator.play_game 一致）
+        hand_value = (self.hand * CARD_VALUES).sum(axis=1)
+        stuck_play = (self.phase == PLAYING) & ~self.hand.any(axis=1)
+        stuck_discard = (self.phase == DISCARD_SELECTION) & (hand_value < self.required_discard)
+        self.phase[stuck_play | stuck_discard] = DEFEAT
+
+        discard_rows = np.flatnonzero(self.phase == DISCARD_SELECTION)
+        play_rows = np.flatnonzero(self.phase == PLAYING)
+
+        if len(discard_rows):
+            self.apply_discards(discard_rows, self.choose_discards(discard_rows))
+        if len(play_rows):
+            self.apply_plays(play_rows, self.choose_plays(play_rows))
+
+        return int(np.count_nonzero(self.phase < VICTORY))
+
+    def apply_discards(self, rows, chosen):
+        """确认弃牌（对应 RegicideGame.confirm_discard）"""
+        self.hand[rows] &= ~chosen
+        self.discard[rows] |= chosen
+        self.required_discard[rows] = 0
+        self.phase[rows] = PLAYING
+
+    def apply_plays(self, rows, played):
+        """出牌（对应 RegicideGame.play_cards / _execute_battle / _apply_suit_effects）"""
+        count = len(rows)
+        played_values = np.where(played, CARD_VALUES, 0)
+        played_count = played.sum(axis=1)
+
+        suit_power = np.zeros((count, len(SUIT_ORDER)), dtype=np.int32)
+        for suit_index in range(len(SUIT_ORDER)):
+            suit_power[:, suit_index] = (played_values * (CARD_SUITS == suit_index)).sum(axis=1)
+
+        # 黑桃：降低敌人攻击力
+        self.attack_reduction[rows] += suit_power[:, SPADES]
+
+        # 总攻击力 + 组合加成，梅花翻倍
+        total_attack = played_values.sum(axis=1)
+        total_attack += np.where(played_count > 1, played_count * (played_count - 1), 0)
+        clubs_played = (played & (CARD_SUITS == CLUBS)).any(axis=1)
+        total_attack = np.where(clubs_played & (suit_power[:, CLUBS] > 0), total_attack * 2, total_attack)
+
+        health = self.enemy_health[rows]
+        damage = np.minimum(total_attack, health)
+        health = health - damage
+        defeated = health <= 0
+        self.enemy_health[rows] = health
+
+        enemy_cards = self.enemies[rows, np.minimum(self.enemy_index[rows], ENEMY_COUNT - 1)]
+        base_attack = ENEMY_ATTACK[enemy_cards % RANK_COUNT]
+        counter = np.where(defeated, 0, np.maximum(0, base_attack - self.attack_reduction[rows]))
+
+        # 红桃：从弃牌堆随机回复（手牌上限按打出前计算）
+        hand = self.hand[rows]
+        discard = self.discard[rows]
+        hand_after = hand.sum(axis=1) - played_count
+        heal = np.minimum(np.minimum(suit_power[:, HEARTS], discard.sum(axis=1)), MAX_HAND_SIZE - hand_after)
+        heal = np.where(hand_after >= MAX_HAND_SIZE, 0, np.maximum(heal, 0))
+        heal_local = np.flatnonzero(heal > 0)
+        if len(heal_local):
+            keys = self.rng.random((len(heal_local), CARD_COUNT))
+            keys[~discard[heal_local]] = 2.0
+            order = np.argsort(keys, axis=1)
+            ranks = np.empty_like(order)
+            np.put_along_axis(ranks, order, CARD_IDS[None, :], axis=1)
+            healed = ranks < heal[heal_local, None]
+            hand[heal_local] |= healed
+            discard[heal_local] &= ~healed
+        self.cards_healed[rows] = heal
+
+        # 方块：从牌库顶抽牌
+        hand_after = hand.sum(axis=1) - played_count
+        deck_len = self.deck_len[rows]
+        draw = np.where(hand_after >= MAX_HAND_SIZE, 0,
+                        np.minimum(np.minimum(suit_power[:, DIAMONDS], MAX_HAND_SIZE - hand_after), deck_len))
+        draw = np.maximum(draw, 0)
+        draw_local = np.flatnonzero(draw > 0)
+        if len(draw_local):
+            positions = np.arange(DECK_CAPACITY)
+            lengths = deck_len[draw_local, None]
+            selected = (positions >= lengths - draw[draw_local, None]) & (positions < lengths)
+            sel_rows, sel_cols = np.nonzero(selected)
+            hand[draw_local[sel_rows], self.deck[rows[draw_local[sel_rows]], sel_cols]] = True
+            self.deck_len[rows] = deck_len - draw
+
+        # 打出的牌进入弃牌堆
+        hand &= ~played
+        discard |= played
+        self.hand[rows] = hand
+        self.discard[rows] = discard
+
+        # 击败敌人：切换到下一个敌人
+        next_index = self.enemy_index[rows] + defeated
+        self.enemy_index[rows] = next_index
+        victory = next_index >= ENEMY_COUNT
+        advance = defeated & ~victory
+        if advance.any():
+            advanced_rows = rows[advance]
+            next_cards = self.enemies[advanced_rows, next_index[advance]]
+            self.enemy_health[advanced_rows] = ENEMY_HEALTH[next_cards % RANK_COUNT]
+            self.attack_reduction[advanced_rows] = 0
+        self.phase[rows[victory]] = VICTORY
+
+        # 反击：进入弃牌选择（手牌为空时跳过）
+        ongoing = ~victory
+        has_cards = hand.any(axis=1)
+        needs_discard = ongoing & (counter > 0) & has_cards
+        self.phase[rows[needs_discard]] = DISCARD_SELECTION
+        self.required_discard[rows[needs_discard]] = counter[needs_discard]
+
+        # 失败条件：牌库为空且没有手牌
+        lost = ongoing & (self.deck_len[rows] == 0) & ~has_cards
+        self.phase[rows[lost]] = DEFEAT
+
+        self.turn_count[rows[ongoing]] += 1
+
+    def run(self, max_steps=1000):
+        """推进直到所有对局结束或达到步数上限"""
+        for _ in range(max_steps):
+            if self.step() == 0:
+                break
+        self.phase[self.phase < VICTORY] = DEFEAT
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def enemies_defeated(self):
+        """各局已击败的敌人数"""
+        return np.minimum(self.enemy_index, ENEMY_COUNT)
+
+    def summary(self):
+        """批量结果统计"""
+        wins = int(np.count_nonzero(self.phase == VICTORY))
+        return {
+            'games': self.size,
+            'wins': wins,
+            'win_rate': wins / self.size if self.size else 0.0,
+            'avg_enemies_defeated': float(self.enemies_defeated().mean()) if self.size else 0.0,
+            'avg_turns': float(self.turn_count.mean()) if self.size else 0.0,
+        }
+
+
+# ----------------------------------------------------------------------
+# 与标量引擎对照验证
+# ----------------------------------------------------------------------
+
+def _compare_row(batch, row, game, compare_cards):
+    """比较第row局与标量对局，返回不一致的字段列表"""
+    mismatches = []
+    queue = game.enemy_queue
+    current = queue.get_current_enemy()
+    expected = {
+        'phase': PHASE_CODES.get(game.game_state, -1),
+        'enemy_index': queue.current_enemy_index,
+        'enemy_health': current.current_health if current else 0,
+        'attack_reduction': current.attack_reduction if current else 0,
+        'required_discard': game.required_discard_value,
+        'turn_count': game.turn_count,
+        'deck': list(game.deck.card_ids()),
+        'hand_size': game.get_current_player_hand().size(),
+        'discard_size': len(game.discard_pile),
+    }
+    actual = {
+        'phase': int(batch.phase[row]),
+        'enemy_index': int(batch.enemy_index[row]),
+        'enemy_health': int(batch.enemy_health[row]) if batch.enemy_index[row] < ENEMY_COUNT else 0,
+        'attack_reduction': int(batch.attack_reduction[row]) if batch.enemy_index[row] < ENEMY_COUNT else 0,
+        'required_discard': int(batch.required_discard[row]),
+        'turn_count': int(batch.turn_count[row]),
+        'deck': batch.deck[row, :batch.deck_len[row]].tolist(),
+        'hand_size': int(batch.hand[row].sum()),
+        'discard_size': int(batch.discard[row].sum()),
+    }
+    if compare_cards:
+        expected['hand'] = sorted(card.id for card in game.get_current_player_hand().cards)
+        expected['discard'] = sorted(card.id for card in game.discard_pile)
+        actual['hand'] = np.flatnonzero(batch.hand[row]).tolist()
+        actual['discard'] = np.flatnonzero(batch.discard[row]).tolist()
+    for key, value in expected.items():
+        if actual[key] != value:
+            mismatches.append((key, value, actual[key]))
+    return mismatches
+
+
+def validate_against_scalar(seeds, max_steps=1000):
+    """
+    用固定种子对照标量引擎逐步验证批量规则。
+
+    每局先由标量引擎发牌，批量引擎载入同样的初始状态，然后双方用同一高牌策略同步推进。
+    红桃回复的具体牌由各自的随机源决定，因此有回复的那一步只比较数量，
+    比较完成后把标量状态重新载入批量引擎，继续验证后续步骤。
+    返回 (验证步数, 不一致列表)。
+    """
+    from simulator import HighCardPolicy
+
+    policy = HighCardPolicy()
+    games = []
+    for seed in seeds:
+        game = RegicideGame()
+        game.start_new_game(seed)
+        games.append(game)
+
+    batch = BatchRegicide.from_games(games, seed=0)
+    checked = 0
+    mismatches = []
+    for _ in range(max_steps):
+        stepped = []
+        for row, game in enumerate(games):
+            if game.game_state in (GameState.VICTORY, GameState.DEFEAT):
+                continue
+            stepped.append(row)
+            game.last_battle_result = None
+            if not game.has_legal_action():
+                game.declare_defeat()
+            elif game.game_state == GameState.DISCARD_SELECTION:
+                for card in policy.choose_discard(game):
+                    game.toggle_discard_selection(card)
+                game.confirm_discard()
+            else:
+                game.play_cards(policy.choose_play(game))
+        if not stepped:
+            break
+
+        batch.step()
+        for row in stepped:
+            game = games[row]
+            healed = game.last_battle_result.cards_healed if game.last_battle_result else 0
+            if healed != int(batch.cards_healed[row]):
+                mismatches.append((seeds[row], 'cards_healed', healed, int(batch.cards_healed[row])))
+            for key, expected, actual in _compare_row(batch, row, game, compare_cards=healed == 0):
+                mismatches.append((seeds[row], key, expected, actual))
+            batch.load_game(row, game)
+            checked += 1
+
+    return checked, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized Regicide batch engine")
+    parser.add_argument("--games", type=int, default=100000, help="games simulated in lockstep")
+    parser.add_argument("--seed", type=int, default=None, help="RNG seed")
+    parser.add_argument("--max-steps", type=int, default=1000, help="step limit")
+    parser.add_argument("--validate", type=int, default=0, metavar="N",
+                        help="validate against the scalar engine on N fixed seeds instead")
+    args = parser.parse_args()
+
+    if args.validate:
+        checked, mismatches = validate_against_scalar(range(args.validate), args.max_steps)
+        print(f"Validated {checked} game-steps on {args.validate} seeds: {len(mismatches)} mismatches")
+        for mismatch in mismatches[:20]:
+            print("  seed={} {}: scalar={} batch={}".format(*mismatch))
+        return
+
+    start_time = time.perf_counter()
+    batch = BatchRegicide(args.games, args.seed)
+    batch.start_new_games()
+    batch.run(args.max_steps)
+    elapsed = time.perf_counter() - start_time
+
+    stats = batch.summary()
+    print(f"Games:             {stats['games']}")
+    print(f"Elapsed:           {elapsed:.2f}s")
+    print(f"Games/sec:         {stats['games'] / elapsed:.1f}")
+    print(f"Win rate:          {stats['win_rate']:.2%} ({stats['wins']} wins)")
+    print(f"Enemies defeated:  {stats['avg_enemies_defeated']:.2f} avg")
+    print(f"Turns:             {stats['avg_turns']:.1f} avg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Discard Solver Benchmark
+弃牌求解器耗时：不同手牌数量和目标下每次求解的平均时间
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import CARDS_BY_ID  # noqa: E402
+from discard_solver import DiscardObjective, solve_discard  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the optimal discard solver")
+    parser.add_argument("--number", type=int, default=2000, help="solves per measurement")
+    parser.add_argument("--required", type=int, default=20, help="damage to cover (max enemy attack is 20)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    number_cards = [card for card in CARDS_BY_ID if card.is_number_card]
+
+    print(f"{'hand size':>9} {'objective':<14} {'us/solve':>9}")
+    for hand_size in (8, 10, 20, 40):
+        hand = rng.sample(number_cards, hand_size)
+        for objective in DiscardObjective:
+            seconds = min(timeit.repeat(lambda: solve_discard(hand, args.required, objective),
+                                        number=args.number, repeat=3)) / args.number
+            print(f"{hand_size:>9} {objective.value:<14} {seconds * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Hand Maintenance Benchmark
+手牌维护耗时：治疗和抽牌为主的回合（与引擎一样批量加入），对比每次插入后重新排序的旧实现
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import CARDS_BY_ID, SUIT_INDEX, Hand, mask_to_cards  # noqa: E402
+from zobrist import HAND_KEYS  # noqa: E402
+
+
+class ResortHand:
+    """旧实现：普通列表，每次加入后用lambda键整体重新排序"""
+
+    def __init__(self):
+        self.cards = []
+
+    def add_card(self, card):
+        self.cards.append(card)
+        self.sort_cards()
+
+    def add_cards(self, cards):
+        self.cards.extend(cards)
+        self.sort_cards()
+
+    def remove_cards(self, cards):
+        for card in cards:
+            if card in self.cards:
+                self.cards.remove(card)
+
+    def sort_cards(self):
+        self.cards.sort(key=lambda card: (SUIT_INDEX[card.suit], card.rank.value))
+
+
+class RebuildHand(Hand):
+    """对照：只维护掩码和Zobrist哈希（引擎需要），每次变化后丢弃元组、读取时从掩码重建（与Hand.cards同为元组）"""
+
+    __slots__ = ()
+
+    def add_card(self, card):
+        self.add_cards((card,))
+
+    def add_cards(self, cards):
+        for card in cards:
+            bit = 1 << card.id
+            if not self.mask & bit:
+                self.mask |= bit
+                self.zobrist ^= HAND_KEYS[card.id]
+        self._view = None
+
+    def remove_cards(self, cards):
+        for card in cards:
+            bit = 1 << card.id
+            if self.mask & bit:
+                self.mask ^= bit
+                self.zobrist ^= HAND_KEYS[card.id]
+        self._view = None
+
+    @property
+    def cards(self):
+        if self._view is None:
+            self._view = tuple(mask_to_cards(self.mask))
+        return self._view
+
+
+def make_turns(count, seed=0):
+    """生成一组回合：打出2张牌，然后治疗1~4张或抽3~8张"""
+    rng = random.Random(seed)
+    turns = []
+    for _ in range(count):
+        cards = rng.sample(CARDS_BY_ID, 16)
+        hand, played, rest = cards[:6], cards[6:8], cards[8:]
+        turns.append((hand, played, rest[:rng.randint(1, 4)], rest[:rng.randint(3, 8)]))
+    return turns
+
+
+def heal_turns(hand_class, turns):
+    """治疗为主：弃牌堆中的牌一次加入手牌（引擎 _heal_cards 的路径）后读取手牌"""
+    for hand_cards, played, healed, _ in turns:
+        hand = hand_class()
+        hand.add_cards(hand_cards)
+        hand.remove_cards(played)
+        hand.add_cards(healed)
+        hand.cards
+
+
+def draw_turns(hand_class, turns):
+    """抽牌为主：一次性加入多张牌后读取手牌"""
+    for hand_cards, played, _, drawn in turns:
+        hand = hand_class()
+        hand.add_cards(hand_cards)
+        hand.remove_cards(played)
+        hand.add_cards(drawn)
+        hand.cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time hand updates on heal- and draw-heavy turns")
+    parser.add_argument("--turns", type=int, default=2000, help="turns per measurement")
+    args = parser.parse_args()
+
+    turns = make_turns(args.turns)
+    implementations = [("re-sort per insert", ResortHand), ("rebuild from mask", RebuildHand),
+                       ("Hand", Hand)]
+
+    print(f"{'turn type':<10} {'implementation':<20} {'us/turn':>9} {'speedup':>9}")
+    for label, func in (("heal", heal_turns), ("draw", draw_turns)):
+        baseline = None
+        for name, hand_class in implementations:
+            seconds = min(timeit.repeat(lambda: func(hand_class, turns), number=1, repeat=5)) / len(turns)
+            if baseline is None:
+                baseline = seconds
+            print(f"{label:<10} {name:<20} {seconds * 1e6:>9.2f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
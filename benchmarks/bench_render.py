@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Card Rendering Benchmark
+卡牌绘制耗时：每帧缩放原始PNG的旧实现 vs 按 (牌, 尺寸) 缓存的显示格式纹理（无窗口运行），以及只重绘变化区域的一帧
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # 图像资源使用相对路径
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+import pygame  # noqa: E402
+
+from image_card_renderer import ImageCardRenderer  # noqa: E402
+
+
+class ScalePerFrameRenderer(ImageCardRenderer):
+    """旧实现：图像保持PNG载入时的像素格式，每次绘制都重新缩放"""
+
+    @staticmethod
+    def _convert(image):
+        return image
+
+    def _scaled(self, key, image, size):
+        return pygame.transform.scale(image, size)
+
+
+def draw_hand(renderer, screen, game):
+    """绘制整手牌（前两张为选中状态）"""
+    for index, card in enumerate(game.get_current_player_hand().cards):
+        renderer.draw_card(screen, card, 50 + index * 105, 560, selected=index < 2)
+
+
+def draw_enemy(renderer, screen, game):
+    """绘制当前敌人卡牌（含状态信息）"""
+    renderer.draw_enemy_card(screen, game.enemy_queue.get_current_enemy(), 500, 120)
+
+
+def change_regions(gui):
+    """脏矩形模式下的一帧：切换一个按钮的悬停状态并对敌人造成1点伤害（屏幕两端的区域变化）"""
+    button = gui.buttons['quit']
+    button.hovered = not button.hovered
+    enemy = gui.game.enemy_queue.get_current_enemy()
+    if enemy.current_health > 1:
+        enemy.take_damage(1)
+    else:
+        enemy.reset()
+    gui.dirty_rects = True
+    gui.draw()
+    gui.dirty_rects = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time card rendering with and without the texture cache")
+    parser.add_argument("--frames", type=int, default=200, help="frames per measurement")
+    args = parser.parse_args()
+
+    from regicide_fixed import RegicideFixedGUI
+
+    gui = RegicideFixedGUI(dirty_rects=False)  # 每帧全屏重绘，测量完整绘制耗时
+    gui.game.start_new_game(1)  # 直接进入对局画面
+    renderers = [("scale per frame", ScalePerFrameRenderer()), ("texture cache", ImageCardRenderer())]
+
+    print(f"{'measurement':<12} {'renderer':<18} {'ms/frame':>9} {'speedup':>9}")
+    measurements = (
+        ("hand", lambda renderer: draw_hand(renderer, gui.screen, gui.game)),
+        ("enemy", lambda renderer: draw_enemy(renderer, gui.screen, gui.game)),
+        ("full frame", lambda renderer: gui.draw()),
+        ("dirty frame", lambda renderer: change_regions(gui)),
+    )
+    for label, frame in measurements:
+        baseline = None
+        for name, renderer in renderers:
+            gui.card_renderer = renderer
+            frame(renderer)  # 预热（生成缓存）
+            seconds = min(timeit.repeat(lambda: frame(renderer), number=args.frames, repeat=3)) / args.frames
+            if baseline is None:
+                baseline = seconds
+            print(f"{label:<12} {name:<18} {seconds * 1e3:>9.3f} {baseline / seconds:>8.1f}x")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
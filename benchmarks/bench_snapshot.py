@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Snapshot Benchmark
+状态复制耗时对比：copy.deepcopy vs snapshot()/restore()/clone()
+"""
+
+import argparse
+import copy
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import RegicideGame, GameState  # noqa: E402
+from simulator import GreedyPolicy  # noqa: E402
+
+
+def mid_game_state(seed=1, turns=4):
+    """构造一个进行到中局的游戏（有弃牌堆、受伤的敌人）"""
+    game = RegicideGame()
+    game.start_new_game(seed)
+    policy = GreedyPolicy()
+    for _ in range(turns):
+        if not game.has_legal_action():
+            break
+        if game.game_state == GameState.DISCARD_SELECTION:
+            for card in policy.choose_discard(game):
+                game.toggle_discard_selection(card)
+            game.confirm_discard()
+        elif game.game_state == GameState.PLAYING:
+            game.play_cards(policy.choose_play(game))
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare deepcopy with snapshot/restore")
+    parser.add_argument("--number", type=int, default=20000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    game = mid_game_state()
+    target = RegicideGame()
+    state = game.snapshot()
+    state_with_rng = game.snapshot(include_rng=True)
+
+    cases = [
+        ("copy.deepcopy(game)", lambda: copy.deepcopy(game)),
+        ("game.snapshot()", game.snapshot),
+        ("game.snapshot(include_rng=True)", lambda: game.snapshot(include_rng=True)),
+        ("target.restore(snapshot)", lambda: target.restore(state)),
+        ("target.restore(snapshot with rng)", lambda: target.restore(state_with_rng)),
+        ("game.clone()", game.clone),
+    ]
+
+    baseline = None
+    print(f"{'operation':<36} {'us/op':>10} {'speedup':>9}")
+    for label, func in cases:
+        number = max(1, args.number // 20) if "deepcopy" in label or "clone" in label else args.number
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        if baseline is None:
+            baseline = seconds
+        print(f"{label:<36} {seconds * 1e6:>10.2f} {baseline / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Startup Benchmark
+冷启动导入耗时对比：纯规则核心 vs 图形界面
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在全新解释器中导入模块并输出耗时与是否加载了pygame
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import {module}\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed, 'pygame' in sys.modules, len(sys.modules))\n"
+)
+
+TARGETS = [
+    ("core", "game_engine"),
+    ("simulator", "simulator"),
+    ("gui", "regicide_fixed"),
+]
+
+
+def measure(module, runs):
+    """多次冷启动导入指定模块，返回耗时列表和pygame加载情况"""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    timings = []
+    pygame_loaded = False
+    module_count = 0
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return None, proc.stderr.strip().splitlines()[-1], 0
+        elapsed, loaded, count = proc.stdout.split()
+        timings.append(float(elapsed))
+        pygame_loaded = loaded == "True"
+        module_count = int(count)
+    return timings, pygame_loaded, module_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-import benchmark for the rules core and the GUI")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per target")
+    args = parser.parse_args()
+
+    print(f"{'target':<10} {'module':<16} {'median ms':>10} {'min ms':>8} {'modules':>8}  pygame")
+    for label, module in TARGETS:
+        timings, pygame_loaded, module_count = measure(module, args.runs)
+        if timings is None:
+            print(f"{label:<10} {module:<16} unavailable: {pygame_loaded}")
+            continue
+        median_ms = statistics.median(timings) * 1000
+        min_ms = min(timings) * 1000
+        print(f"{label:<10} {module:<16} {median_ms:>10.2f} {min_ms:>8.2f} {module_count:>8}  "
+              f"{'yes' if pygame_loaded else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,16 @@ Regicide Game - Card System
 扑克牌系统实现
 """
 
+import random
+from array import array
+from bisect import bisect_left, insort
+from collections import deque
 from enum import Enum
-import pygame
+from itertools import combinations
+from operator import attrgetter
+
+from zobrist import (DECK_KEYS, DECK_ORDER_KEYS, DISCARD_KEYS, DISCARD_ORDER_KEYS, HAND_KEYS, MASK64,
+                     ORDER_BASE, ORDER_POWERS, hash_cards, hash_mask, hash_sequence)
 
 class Suit(Enum):
     """花色枚举"""
@@ -30,49 +38,76 @@ class Rank(Enum):
     QUEEN = 12
     KING = 13
 
+# 花色顺序（与手牌排序一致），同时决定整数编号：id = 花色序号 * 13 + (点数 - 1)
+SUIT_ORDER = (Suit.HEARTS, Suit.DIAMONDS, Suit.CLUBS, Suit.SPADES)
+SUIT_INDEX = {suit: index for index, suit in enumerate(SUIT_ORDER)}
+RANK_COUNT = 13
+CARD_COUNT = 52
+
+# 牌面显示文字
+RANK_NAMES = {
+    Rank.ACE: "A", Rank.TWO: "2", Rank.THREE: "3", Rank.FOUR: "4",
+    Rank.FIVE: "5", Rank.SIX: "6", Rank.SEVEN: "7", Rank.EIGHT: "8",
+    Rank.NINE: "9", Rank.TEN: "10", Rank.JACK: "J", Rank.QUEEN: "Q", Rank.KING: "K"
+}
+
+# 已创建的牌（享元表），每种花色和牌面全局只有一个实例
+_INTERNED_CARDS = {}
+
 class Card:
-    """单张扑克牌类"""
+    """单张扑克牌类 - 不可变享元，Card(suit, rank) 总是返回同一个实例"""
     
-    def __init__(self, suit: Suit, rank: Rank):
-        self.suit = suit
-        self.rank = rank
+    __slots__ = ('suit', 'rank', 'id', 'attack_value', 'is_face_card', 'is_number_card', 'color')
+    
+    def __new__(cls, suit: Suit, rank: Rank):
+        card = _INTERNED_CARDS.get((suit, rank))
+        if card is not None:
+            return card
         
+        card = super().__new__(cls)
+        is_face_card = rank in (Rank.JACK, Rank.QUEEN, Rank.KING)
+        # 预先计算常用属性，避免每次访问时重复计算
+        values = {
+            'suit': suit,
+            'rank': rank,
+            'id': SUIT_INDEX[suit] * RANK_COUNT + rank.value - 1,  # 紧凑整数编号（0..51）
+            'attack_value': rank.value,                            # 攻击力值
+            'is_face_card': is_face_card,                          # 是否是人头牌（J、Q、K）
+            'is_number_card': not is_face_card,                    # 是否是数字牌（A-10）
+            'color': "red" if suit in (Suit.HEARTS, Suit.DIAMONDS) else "black",
+        }
+        for name, value in values.items():
+            object.__setattr__(card, name, value)
+        _INTERNED_CARDS[(suit, rank)] = card
+        return card
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("Card is immutable")
+    
+    def __delattr__(self, name):
+        raise AttributeError("Card is immutable")
+    
+    def __reduce__(self):
+        """序列化时只保存花色和牌面，反序列化后仍指向享元实例"""
+        return (Card, (self.suit, self.rank))
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+    
     def __str__(self):
         """字符串表示"""
-        rank_names = {
-            Rank.ACE: "A", Rank.TWO: "2", Rank.THREE: "3", Rank.FOUR: "4",
-            Rank.FIVE: "5", Rank.SIX: "6", Rank.SEVEN: "7", Rank.EIGHT: "8",
-            Rank.NINE: "9", Rank.TEN: "10", Rank.JACK: "J", Rank.QUEEN: "Q", Rank.KING: "K"
-        }
-        return f"{rank_names[self.rank]}{self.suit.value}"
+        return f"{RANK_NAMES[self.rank]}{self.suit.value}"
     
     def __eq__(self, other):
         """相等比较"""
-        return isinstance(other, Card) and self.suit == other.suit and self.rank == other.rank
+        return self is other
     
     def __hash__(self):
         """哈希值，用于集合操作"""
-        return hash((self.suit, self.rank))
-    
-    @property
-    def attack_value(self):
-        """攻击力值"""
-        return self.rank.value
-    
-    @property
-    def is_face_card(self):
-        """是否是人头牌（J、Q、K）"""
-        return self.rank in [Rank.JACK, Rank.QUEEN, Rank.KING]
-    
-    @property
-    def is_number_card(self):
-        """是否是数字牌（A-10）"""
-        return not self.is_face_card
-    
-    @property
-    def color(self):
-        """牌的颜色"""
-        return "red" if self.suit in [Suit.HEARTS, Suit.DIAMONDS] else "black"
+        return self.id
     
     def get_suit_ability_description(self):
         """获取花色特殊能力描述"""
@@ -84,118 +119,498 @@ class Card:
         }
         return abilities[self.suit]
 
+# 按整数编号索引的52张牌（享元表）
+CARDS_BY_ID = tuple(Card(suit, rank) for suit in SUIT_ORDER for rank in Rank)
+
+# 新牌库的初始顺序
+STANDARD_DECK = tuple(Card(suit, rank) for suit in Suit for rank in Rank)
+_FULL_DECK_HASH = hash_cards(DECK_KEYS, STANDARD_DECK)
+_FULL_DECK_ORDER_HASH = hash_sequence(DECK_ORDER_KEYS, STANDARD_DECK)
+_FULL_DECK_MASK = (1 << len(STANDARD_DECK)) - 1
+
+def card_from_id(card_id):
+    """整数编号转换为Card"""
+    return CARDS_BY_ID[card_id]
+
+def cards_to_ids(cards):
+    """Card序列转换为紧凑的整数数组"""
+    return array('B', [card.id for card in cards])
+
+def ids_to_cards(card_ids):
+    """整数编号序列转换为Card列表"""
+    return [CARDS_BY_ID[card_id] for card_id in card_ids]
+
+def cards_to_mask(cards):
+    """Card序列转换为位掩码（第id位表示该牌存在）"""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card.id
+    return mask
+
+def mask_to_ids(mask):
+    """位掩码转换为升序的整数编号列表"""
+    card_ids = []
+    while mask:
+        low_bit = mask & -mask
+        card_ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return card_ids
+
+def mask_to_cards(mask):
+    """位掩码转换为按编号（即手牌顺序）排列的Card列表"""
+    return [CARDS_BY_ID[card_id] for card_id in mask_to_ids(mask)]
+
 class Deck:
-    """牌库类"""
-    
-    def __init__(self):
-        self.cards = []
+    """
+    牌库类 - 以双端队列存储，左端为牌库底、右端为牌库顶。
+    
+    mask 和 zobrist 是牌库中牌的集合表示（不含顺序），order_hash 是从底到顶的顺序哈希，
+    在两端抽牌和放牌时按变化的牌增量更新。
+    """
+    
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()  # 洗牌使用的随机源
+        self._cards = deque()
+        self.mask = 0
+        self.zobrist = 0
+        self.order_hash = 0
         self.reset()
     
+    @property
+    def cards(self):
+        """牌库中的牌（从底到顶）"""
+        return self._cards
+    
+    @cards.setter
+    def cards(self, cards):
+        self._cards = deque(cards)
+        self.mask = cards_to_mask(self._cards)
+        self.zobrist = hash_cards(DECK_KEYS, self._cards)
+        self.order_hash = hash_sequence(DECK_ORDER_KEYS, self._cards)
+    
     def reset(self):
         """重置为完整牌库（52张牌）"""
-        self.cards = []
-        for suit in Suit:
-            for rank in Rank:
-                self.cards.append(Card(suit, rank))
+        self._cards = deque(STANDARD_DECK)
+        self.mask = _FULL_DECK_MASK
+        self.zobrist = _FULL_DECK_HASH
+        self.order_hash = _FULL_DECK_ORDER_HASH
     
     def shuffle(self):
-        """洗牌"""
-        import random
-        random.shuffle(self.cards)
+        """洗牌（双端队列不支持高效随机访问，先转为列表再洗）"""
+        cards = list(self._cards)
+        self.rng.shuffle(cards)
+        self._cards = deque(cards)
+        self.order_hash = hash_sequence(DECK_ORDER_KEYS, cards)
     
     def draw(self):
         """抽一张牌"""
-        if self.cards:
-            return self.cards.pop()
+        if self._cards:
+            card = self._cards.pop()
+            self.mask ^= 1 << card.id
+            self.zobrist ^= DECK_KEYS[card.id]
+            self.order_hash = (self.order_hash - DECK_ORDER_KEYS[card.id] * ORDER_POWERS[len(self._cards)]) & MASK64
+            return card
         return None
     
     def draw_multiple(self, count):
-        """抽多张牌"""
-        drawn = []
-        for _ in range(min(count, len(self.cards))):
-            card = self.draw()
-            if card:
-                drawn.append(card)
+        """抽多张牌（从牌库顶依次抽取）"""
+        pop = self._cards.pop
+        drawn = [pop() for _ in range(min(count, len(self._cards)))]
+        self.mask ^= cards_to_mask(drawn)
+        self.zobrist ^= hash_cards(DECK_KEYS, drawn)
+        # 抽出的牌原来在位置 剩余张数+len(drawn)-1 ... 剩余张数
+        order_hash = self.order_hash
+        position = len(self._cards) + len(drawn)
+        for card in drawn:
+            position -= 1
+            order_hash -= DECK_ORDER_KEYS[card.id] * ORDER_POWERS[position]
+        self.order_hash = order_hash & MASK64
         return drawn
     
     def add_card(self, card):
         """添加一张牌到牌库底部"""
-        self.cards.insert(0, card)
+        self._cards.appendleft(card)
+        self.mask |= 1 << card.id
+        self.zobrist ^= DECK_KEYS[card.id]
+        self.order_hash = (DECK_ORDER_KEYS[card.id] + self.order_hash * ORDER_BASE) & MASK64
     
     def add_cards(self, cards):
-        """添加多张牌到牌库底部"""
+        """添加多张牌到牌库底部（依次放到最底下，最后一张在最底部）"""
+        cards = list(cards)
+        self._cards.extendleft(cards)
+        self.mask |= cards_to_mask(cards)
+        self.zobrist ^= hash_cards(DECK_KEYS, cards)
+        # 每放一张牌到底部，原有的牌位置都加一
+        order_hash = self.order_hash
         for card in cards:
-            self.add_card(card)
+            order_hash = DECK_ORDER_KEYS[card.id] + order_hash * ORDER_BASE
+        self.order_hash = order_hash & MASK64
+    
+    def copy(self, rng=None):
+        """复制牌库（不经过__init__，不重新生成完整牌库）；rng为副本使用的随机源"""
+        deck = object.__new__(Deck)
+        deck.rng = rng if rng is not None else self.rng
+        deck._cards = self._cards.copy()
+        deck.mask = self.mask
+        deck.zobrist = self.zobrist
+        deck.order_hash = self.order_hash
+        return deck
+    
+    def card_ids(self):
+        """牌库的紧凑整数表示（从底到顶）"""
+        return cards_to_ids(self._cards)
+    
+    def load_ids(self, card_ids):
+        """从整数编号序列恢复牌库（从底到顶）"""
+        self._cards = deque(ids_to_cards(card_ids))
+        self.mask = cards_to_mask(self._cards)
+        self.zobrist = hash_cards(DECK_KEYS, self._cards)
+        self.order_hash = hash_sequence(DECK_ORDER_KEYS, self._cards)
     
     def is_empty(self):
         """检查牌库是否为空"""
-        return len(self.cards) == 0
+        return len(self._cards) == 0
     
     def cards_left(self):
         """剩余牌数"""
-        return len(self.cards)
+        return len(self._cards)
+    
+    def _partition(self, take):
+        """一次遍历把牌库分成两部分：取出满足条件的牌，其余按原顺序留在牌库"""
+        taken = []
+        kept = []
+        for card in self._cards:
+            (taken if take(card) else kept).append(card)
+        self._cards = deque(kept)
+        self.mask ^= cards_to_mask(taken)
+        self.zobrist ^= hash_cards(DECK_KEYS, taken)
+        self.order_hash = hash_sequence(DECK_ORDER_KEYS, kept)
+        return taken
     
     def get_enemies(self):
         """获取所有敌人牌（J、Q、K）"""
-        enemies = []
-        for card in self.cards[:]:
-            if card.is_face_card:
-                enemies.append(card)
-                self.cards.remove(card)
-        return enemies
+        return self._partition(attrgetter('is_face_card'))
     
     def get_number_cards(self):
         """获取所有数字牌（A-10）"""
-        number_cards = []
-        for card in self.cards[:]:
-            if card.is_number_card:
-                number_cards.append(card)
-                self.cards.remove(card)
-        return number_cards
+        return self._partition(attrgetter('is_number_card'))
+
+class DiscardPile:
+    """
+    弃牌堆 - 交换删除数组加位置索引。
+
+    _cards 是无序数组，删除时用最后一张牌填补空位，因此加入、删除和随机抽取都是O(1)；
+    _index 记录每张牌在数组中的位置，字典本身保留加入顺序，供界面显示和回放使用。
+    mask 和 zobrist 是与顺序无关的集合表示，随每张牌的增删更新；
+    order_hash 是 _cards 数组顺序的哈希（红桃随机回复按数组位置抽取），交换删除时常数次更新。
+    """
+    
+    __slots__ = ('_cards', '_index', 'mask', 'zobrist', 'order_hash')
+    
+    def __init__(self, cards=()):
+        self._cards = []
+        self._index = {}
+        self.mask = 0
+        self.zobrist = 0
+        self.order_hash = 0
+        self.extend(cards)
+    
+    def __len__(self):
+        return len(self._cards)
+    
+    def __iter__(self):
+        """按加入顺序遍历"""
+        return iter(self._index)
+    
+    def __contains__(self, card):
+        return card in self._index
+    
+    def append(self, card):
+        """加入一张牌"""
+        if card in self._index:
+            raise ValueError(f"{card} is already in the discard pile")
+        position = len(self._cards)
+        self._index[card] = position
+        self._cards.append(card)
+        self.mask |= 1 << card.id
+        self.zobrist ^= DISCARD_KEYS[card.id]
+        self.order_hash = (self.order_hash + DISCARD_ORDER_KEYS[card.id] * ORDER_POWERS[position]) & MASK64
+    
+    def extend(self, cards):
+        """加入多张牌"""
+        for card in cards:
+            self.append(card)
+    
+    def remove(self, card):
+        """移除一张牌：用数组最后一张牌填补它的位置"""
+        position = self._index.pop(card, None)
+        if position is None:
+            raise ValueError(f"{card} is not in the discard pile")
+        last = self._cards.pop()
+        last_position = len(self._cards)
+        order_hash = self.order_hash - DISCARD_ORDER_KEYS[card.id] * ORDER_POWERS[position]
+        if last is not card:
+            self._cards[position] = last
+            self._index[last] = position  # 更新已有键不改变它的加入顺序
+            last_key = DISCARD_ORDER_KEYS[last.id]
+            order_hash += last_key * (ORDER_POWERS[position] - ORDER_POWERS[last_position])
+        self.order_hash = order_hash & MASK64
+        self.mask ^= 1 << card.id
+        self.zobrist ^= DISCARD_KEYS[card.id]
+    
+    def sample_remove(self, count, rng):
+        """随机取出count张不重复的牌（每张O(1)），返回取出的牌"""
+        removed = []
+        for _ in range(min(count, len(self._cards))):
+            card = self._cards[rng.randrange(len(self._cards))]
+            self.remove(card)
+            removed.append(card)
+        return removed
+    
+    def clear(self):
+        """清空弃牌堆"""
+        self._cards.clear()
+        self._index.clear()
+        self.mask = 0
+        self.zobrist = 0
+        self.order_hash = 0
+    
+    def copy(self):
+        """复制弃牌堆（数组顺序和加入顺序都保留）"""
+        pile = object.__new__(DiscardPile)
+        pile._cards = self._cards.copy()
+        pile._index = self._index.copy()
+        pile.mask = self.mask
+        pile.zobrist = self.zobrist
+        pile.order_hash = self.order_hash
+        return pile
+    
+    @property
+    def cards(self):
+        """按加入顺序排列的牌列表（副本，修改请使用DiscardPile的方法）"""
+        return list(self._index)
+    
+    def get_state(self):
+        """紧凑状态：(加入顺序的编号, 数组顺序的编号)；两者都保存才能让恢复后的随机抽取与原对局一致"""
+        return cards_to_ids(self._index).tobytes(), cards_to_ids(self._cards).tobytes()
+    
+    def set_state(self, state):
+        """从 get_state() 的结果恢复"""
+        order_ids, slot_ids = state
+        self._cards = ids_to_cards(slot_ids)
+        positions = {card: position for position, card in enumerate(self._cards)}
+        self._index = {card: positions[card] for card in ids_to_cards(order_ids)}
+        self.mask = cards_to_mask(self._cards)
+        self.zobrist = hash_mask(DISCARD_KEYS, self.mask)
+        self.order_hash = hash_sequence(DISCARD_ORDER_KEYS, self._cards)
+    
+    def __repr__(self):
+        return f"DiscardPile({self.cards!r})"
+
+# 手牌排序键：整数编号即花色和牌面的排序顺序
+_card_id = attrgetter('id')
+
+# 出牌枚举缓存：手牌掩码 -> 所有合法出牌；多局模拟和搜索中同一手牌会反复出现
+PLAYS_MEMO_SIZE = 4096
+_PLAYS_MEMO = {}
+
+def _rank_index(cards):
+    """把按花色和牌面排好序的牌按点数分组"""
+    buckets = [[] for _ in range(RANK_COUNT)]
+    for card in cards:
+        buckets[card.rank.value - 1].append(card)
+    return tuple(tuple(bucket) for bucket in buckets)
+
+def _enumerate_plays(cards, rank_index):
+    """
+    生成所有合法出牌：任意非空的A牌子集，加上同一点数的非A牌的任意子集。
+    顺序：单张、同点数组合、多张A、A带同点数牌。
+    """
+    for card in cards:
+        yield (card,)
+
+    groups = [group for group in rank_index[1:] if group]
+    for group in groups:
+        for size in range(2, len(group) + 1):
+            yield from combinations(group, size)
+
+    aces = rank_index[0]
+    for ace_count in range(1, len(aces) + 1):
+        for ace_combo in combinations(aces, ace_count):
+            if ace_count > 1:
+                yield ace_combo
+            for group in groups:
+                for size in range(1, len(group) + 1):
+                    for combo in combinations(group, size):
+                        yield ace_combo + combo
 
 class Hand:
-    """手牌类"""
+    """
+    手牌类 - 以位掩码存储，同时维护按整数编号有序的私有列表（单张增删就地更新，批量加入后从掩码重建，都无需排序）。
+    zobrist 是手牌的集合哈希，随增删的牌增量更新。
+    """
+    
+    __slots__ = ('mask', '_cards', '_view', '_rank_index', '_plays', 'zobrist')
     
     def __init__(self):
-        self.cards = []
+        self.mask = 0
+        self.zobrist = 0
+        self._cards = []
+        self._view = None
+        self._rank_index = None
+        self._plays = None
+    
+    @property
+    def cards(self):
+        """按花色和牌面排序的手牌元组（不可变快照，手牌变化后不会随之改变）"""
+        if self._view is None:
+            if self._cards is None:
+                self._cards = mask_to_cards(self.mask)
+            self._view = tuple(self._cards)
+        return self._view
+    
+    @cards.setter
+    def cards(self, cards):
+        self.mask = cards_to_mask(cards)
+        self.zobrist = hash_mask(HAND_KEYS, self.mask)
+        self._cards = None
+        self._invalidate()
+    
+    def _invalidate(self):
+        """手牌变化后清除派生缓存（只读元组、点数索引、出牌枚举）"""
+        self._view = None
+        self._rank_index = None
+        self._plays = None
+    
+    def __contains__(self, card):
+        """O(1)成员检查"""
+        return bool(self.mask >> card.id & 1)
     
     def add_card(self, card):
-        """添加一张牌"""
-        self.cards.append(card)
-        self.sort_cards()
+        """添加一张牌：二分查找插入位置，保持有序"""
+        bit = 1 << card.id
+        if self.mask & bit:
+            return
+        self.mask |= bit
+        self.zobrist ^= HAND_KEYS[card.id]
+        if self._cards is not None:
+            insort(self._cards, card, key=_card_id)
+        self._invalidate()
     
     def add_cards(self, cards):
-        """添加多张牌"""
-        self.cards.extend(cards)
-        self.sort_cards()
+        """添加多张牌：只对新牌更新掩码和哈希；有序列表在下次读取时从掩码按编号一次生成，无需排序或归并"""
+        mask = self.mask
+        zobrist = self.zobrist
+        for card in cards:
+            bit = 1 << card.id
+            if not mask & bit:
+                mask |= bit
+                zobrist ^= HAND_KEYS[card.id]
+        if mask != self.mask:
+            self.mask = mask
+            self.zobrist = zobrist
+            self._cards = None
+            self._invalidate()
     
     def remove_card(self, card):
         """移除一张牌"""
-        if card in self.cards:
-            self.cards.remove(card)
+        bit = 1 << card.id
+        if self.mask & bit:
+            self.mask ^= bit
+            self.zobrist ^= HAND_KEYS[card.id]
+            if self._cards is not None:
+                del self._cards[bisect_left(self._cards, card.id, key=_card_id)]
+            self._invalidate()
             return True
         return False
     
     def remove_cards(self, cards):
-        """移除多张牌"""
+        """移除多张牌：先更新掩码，再一次过滤有序列表"""
+        mask = self.mask
         removed = []
         for card in cards:
-            if self.remove_card(card):
+            bit = 1 << card.id
+            if mask & bit:
+                mask ^= bit
                 removed.append(card)
+        if removed:
+            self.mask = mask
+            self.zobrist ^= hash_cards(HAND_KEYS, removed)
+            if self._cards is not None:
+                self._cards[:] = [card for card in self._cards if mask >> card.id & 1]
+            self._invalidate()
         return removed
     
+    def clear(self):
+        """清空手牌"""
+        self.mask = 0
+        self.zobrist = 0
+        self._cards = []
+        self._invalidate()
+    
+    def set_mask(self, mask):
+        """用位掩码整体替换手牌"""
+        self.mask = mask
+        self.zobrist = hash_mask(HAND_KEYS, mask)
+        self._cards = None
+        self._invalidate()
+    
+    def copy(self):
+        """复制手牌；只读元组、点数索引和出牌枚举缓存都不可变，直接共享"""
+        hand = object.__new__(Hand)
+        hand.mask = self.mask
+        hand.zobrist = self.zobrist
+        hand._cards = self._cards.copy() if self._cards is not None else None
+        hand._view = self._view
+        hand._rank_index = self._rank_index
+        hand._plays = self._plays
+        return hand
+    
     def sort_cards(self):
-        """排序手牌：按花色和牌面大小排序"""
-        suit_order = {Suit.HEARTS: 0, Suit.DIAMONDS: 1, Suit.CLUBS: 2, Suit.SPADES: 3}
-        self.cards.sort(key=lambda card: (suit_order[card.suit], card.rank.value))
+        """排序手牌：手牌在增删时始终保持按花色和牌面有序，无需额外操作"""
     
     def get_cards_by_rank(self, rank):
         """获取指定牌面的所有牌"""
-        return [card for card in self.cards if card.rank == rank]
+        return list(self.get_rank_index()[rank.value - 1])
+    
+    def get_rank_index(self):
+        """按点数分组的手牌索引：第i项是点数为i+1的牌（按花色顺序）组成的元组"""
+        if self._rank_index is None:
+            self._rank_index = _rank_index(self.cards)
+        return self._rank_index
+    
+    def iter_plays(self):
+        """
+        惰性枚举所有合法出牌（Card元组），单张在前，与can_play_combo的规则一致。
+        枚举的是开始时的手牌快照；调用方可以随时停止。完整遍历且期间手牌未变化时，
+        结果按手牌掩码缓存，手牌变化时失效。
+        """
+        plays = self._plays
+        if plays is None:
+            plays = _PLAYS_MEMO.get(self.mask)
+        if plays is not None:
+            self._plays = plays
+            yield from plays
+            return
+    
+        mask = self.mask
+        generated = []
+        for play in _enumerate_plays(self.cards, self.get_rank_index()):
+            generated.append(play)
+            yield play
+    
+        if self.mask != mask:
+            return
+        plays = tuple(generated)
+        if len(_PLAYS_MEMO) >= PLAYS_MEMO_SIZE:
+            _PLAYS_MEMO.clear()
+        _PLAYS_MEMO[mask] = plays
+        self._plays = plays
     
     def get_cards_by_suit(self, suit):
         """获取指定花色的所有牌"""
-        return [card for card in self.cards if card.suit == suit]
+        shift = SUIT_INDEX[suit] * RANK_COUNT
+        return mask_to_cards(((self.mask >> shift) & ((1 << RANK_COUNT) - 1)) << shift)
     
     def can_play_combo(self, cards):
         """检查是否可以打出组合牌"""
@@ -203,9 +618,9 @@ class Hand:
             return False
         
         # 检查是否都在手牌中
-        for card in cards:
-            if card not in self.cards:
-                return False
+        cards_mask = cards_to_mask(cards)
+        if cards_mask & self.mask != cards_mask:
+            return False
         
         # 获取所有非A牌的牌面
         non_ace_ranks = [card.rank for card in cards if card.rank != Rank.ACE]
@@ -224,11 +639,11 @@ class Hand:
     
     def is_empty(self):
         """检查手牌是否为空"""
-        return len(self.cards) == 0
+        return self.mask == 0
     
     def size(self):
         """手牌数量"""
-        return len(self.cards)
+        return self.mask.bit_count()
     
     def get_available_ranks(self):
         """获取手牌中所有可用的牌面"""
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Damage Kernel
+伤害计算内核：出牌伤害、击败判定和反击伤害的纯函数实现（不修改任何游戏状态）
+"""
+
+from card import Suit
+
+
+class PlayOutcome:
+    """一次出牌的结算结果"""
+
+    __slots__ = ('total_attack', 'combo_bonus', 'clubs_power', 'attack_reduction',
+                 'damage', 'defeats_enemy', 'counter_damage')
+
+    def __init__(self, total_attack, combo_bonus, clubs_power, attack_reduction,
+                 damage, defeats_enemy, counter_damage):
+        self.total_attack = total_attack          # 总攻击力（含组合加成和梅花翻倍）
+        self.combo_bonus = combo_bonus            # 组合牌加成
+        self.clubs_power = clubs_power            # 梅花牌力值（大于0时伤害翻倍）
+        self.attack_reduction = attack_reduction  # 黑桃降低的敌人攻击力
+        self.damage = damage                      # 实际造成的伤害（不超过敌人剩余生命）
+        self.defeats_enemy = defeats_enemy        # 是否击败敌人
+        self.counter_damage = counter_damage      # 敌人反击伤害（已扣除本次黑桃效果）
+
+    def to_dict(self):
+        """转换为 calculate_play_effectiveness 使用的字典格式"""
+        return {
+            'total_attack': self.total_attack,
+            'damage_to_enemy': self.damage,
+            'will_defeat_enemy': self.defeats_enemy,
+            'counter_damage': self.counter_damage,
+            'combo_bonus': self.combo_bonus,
+            'attack_reduction': self.attack_reduction,
+        }
+
+    def __repr__(self):
+        return (f"PlayOutcome(damage={self.damage}, defeats_enemy={self.defeats_enemy}, "
+                f"counter_damage={self.counter_damage})")
+
+
+def evaluate_play(cards, enemy_health, enemy_attack):
+    """
+    结算一次出牌。
+
+    enemy_health 为敌人当前生命值，enemy_attack 为出牌前的实际攻击力（已扣除之前的黑桃效果）。
+    规则与 RegicideGame._execute_battle 一致：黑桃先降低攻击力，多张牌有 n*(n-1) 的组合加成，
+    有梅花时总攻击力翻倍，敌人未被击败时按降低后的攻击力反击。
+    """
+    total = 0
+    spades_power = 0
+    clubs_power = 0
+    for card in cards:
+        value = card.attack_value
+        total += value
+        if card.suit is Suit.SPADES:
+            spades_power += value
+        elif card.suit is Suit.CLUBS:
+            clubs_power += value
+
+    count = len(cards)
+    combo_bonus = count * (count - 1)
+    total_attack = total + combo_bonus
+    if clubs_power > 0:
+        total_attack *= 2
+
+    damage = min(total_attack, enemy_health)
+    defeats_enemy = damage >= enemy_health
+    counter_damage = 0 if defeats_enemy else max(0, enemy_attack - spades_power)
+    return PlayOutcome(total_attack, combo_bonus, clubs_power, spades_power,
+                       damage, defeats_enemy, counter_damage)
+
+
+def evaluate_plays(plays, enemy):
+    """对当前敌人一次性结算所有候选出牌，返回与 plays 一一对应的 PlayOutcome 列表"""
+    if enemy is None or enemy.is_defeated:
+        return []
+    health = enemy.current_health
+    attack = enemy.attack_power
+    return [evaluate_play(cards, health, attack) for cards in plays]
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Training Data Export
+训练数据导出：把模拟中每个决策的 (状态, 合法行动, 选择, 对局结果) 按固定行数分块写成 .npz 文件
+
+每个分块文件包含以下列（行数相同）：
+    state             float32 (行, FEATURE_SIZE)  state_encoder 特征
+    legal             uint8   (行, LEGAL_BYTES)   regicide_env 合法行动掩码（按位打包，低位在前）
+    action            int16                       regicide_env 行动编号（弃牌时每选一张牌记录一行）
+    cards             int64                       选择的牌（出牌或弃掉的牌）的掩码
+    step              int16                       本局第几个决策
+    game_seed         int64                       对局种子
+    state_hash        uint64                      规范状态的Zobrist哈希（可用于去重）
+    victory           int8                        该局最终是否胜利
+    enemies_defeated  int8                        该局最终击败的敌人数
+
+写盘在后台线程中进行：写满的分块放入有界队列，写完后缓冲区回收复用，
+因此无论导出多少行，内存占用一般不超过 (queue_size + 2) 个分块。
+分块要等其中各局结束、回填结果后才能写出；一局跨越的分块数超过这个上限时临时多分配，避免等待自己。
+"""
+
+import os
+import queue
+import threading
+
+import numpy as np
+
+from card import cards_to_mask
+from regicide_env import ACTION_COUNT, DISCARD_ACTION_OFFSET, PLAY_ACTION_INDEX, legal_action_mask
+from state_encoder import FEATURE_SIZE, encode_state
+
+DEFAULT_CHUNK_ROWS = 8192
+DEFAULT_QUEUE_SIZE = 4
+LEGAL_BYTES = (ACTION_COUNT + 7) // 8
+
+COLUMNS = {
+    'state': (np.float32, (FEATURE_SIZE,)),
+    'legal': (np.uint8, (LEGAL_BYTES,)),
+    'action': (np.int16, ()),
+    'cards': (np.int64, ()),
+    'step': (np.int16, ()),
+    'game_seed': (np.int64, ()),
+    'state_hash': (np.uint64, ()),
+    'victory': (np.int8, ()),
+    'enemies_defeated': (np.int8, ()),
+}
+
+
+class _Chunk:
+    """一个分块的列缓冲区"""
+
+    __slots__ = ('columns', 'rows')
+
+    def __init__(self, capacity):
+        self.columns = {name: np.zeros((capacity,) + shape, dtype=dtype)
+                        for name, (dtype, shape) in COLUMNS.items()}
+        self.rows = 0
+
+
+class TrainingDataExporter:
+    """
+    流式训练数据导出器。
+
+    用法：每局开始调用 begin_game()，每个决策前调用 record()，对局结束调用 end_game() 回填结果，
+    最后 close()（或用 with 语句）。文件名为 {prefix}-{序号:05d}.npz。
+    """
+
+    def __init__(self, directory, prefix="part", chunk_rows=DEFAULT_CHUNK_ROWS,
+                 queue_size=DEFAULT_QUEUE_SIZE, compress=False):
+        if chunk_rows < 1:
+            raise ValueError(f"chunk_rows must be at least 1, got {chunk_rows}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.chunk_rows = chunk_rows
+        self.compress = compress
+        self.rows_written = 0
+        self.rows_recorded = 0   # 已结束对局的行数（含尚未写盘的）
+        self.files = []
+
+        self._max_chunks = queue_size + 2
+        self._allocated = 0
+        self._free = queue.Queue()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, name="training-data-writer", daemon=True)
+        self._writer.start()
+
+        self._pending = []       # 已写满但本局尚未结束的分块
+        self._chunk = self._acquire_chunk()
+        self._game_segments = []  # 本局各行所在的 (分块, 起始行)
+        self._game_seed = 0
+        self._game_step = 0
+        self._legal = np.zeros(ACTION_COUNT, dtype=bool)
+        self._closed = False
+
+    # ---- 生产端（模拟线程） ----
+
+    def begin_game(self, game_seed):
+        """新对局开始"""
+        self._game_seed = game_seed
+        self._game_step = 0
+        self._game_segments = [(self._chunk, self._chunk.rows)]
+
+    def record(self, game, cards, discard=False):
+        """记录一个决策：当前状态、合法行动以及即将出的牌；弃牌时cards是即将加入弃牌选择的一张牌"""
+        chunk = self._chunk
+        if chunk.rows == self.chunk_rows:
+            self._pending.append(chunk)
+            chunk = self._chunk = self._acquire_chunk()
+            self._game_segments.append((chunk, 0))
+
+        row = chunk.rows
+        columns = chunk.columns
+        encode_state(game, columns['state'][row])
+        legal_action_mask(game, self._legal)
+        columns['legal'][row] = np.packbits(self._legal, bitorder='little')
+        mask = cards_to_mask(cards)
+        if discard:
+            columns['action'][row] = DISCARD_ACTION_OFFSET + cards[0].id
+        else:
+            columns['action'][row] = PLAY_ACTION_INDEX.get(mask, -1)
+        columns['cards'][row] = mask
+        columns['step'][row] = self._game_step
+        columns['game_seed'][row] = self._game_seed
+        columns['state_hash'][row] = game.state_hash()
+        chunk.rows = row + 1
+        self._game_step += 1
+
+    def end_game(self, victory, enemies_defeated):
+        """对局结束：回填本局所有行的结果，并提交已写满的分块"""
+        for chunk, start in self._game_segments:
+            chunk.columns['victory'][start:chunk.rows] = victory
+            chunk.columns['enemies_defeated'][start:chunk.rows] = enemies_defeated
+        self._game_segments = []
+        self.rows_recorded += self._game_step
+        for chunk in self._pending:
+            self._submit(chunk)
+        self._pending = []
+
+    def close(self):
+        """写出最后一个不满的分块，等待后台线程结束；后台写入出错时在这里抛出"""
+        if self._closed:
+            return
+        self._closed = True
+        # 未结束对局的行结果未知，丢弃
+        if self._game_segments:
+            for chunk, _ in self._game_segments:
+                chunk.rows = 0
+            first_chunk, start = self._game_segments[0]
+            first_chunk.rows = start
+            self._game_segments = []
+        for chunk in self._pending + [self._chunk]:
+            if chunk.rows:
+                self._submit(chunk)
+        self._pending = []
+        self._queue.put(None)
+        self._writer.join()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _acquire_chunk(self):
+        """
+        取一个空闲分块；达到上限时等待后台线程写完一个。
+        如果所有分块都在等待本局结束（没有分块在写盘途中），等待永远不会结束，此时超出上限分配。
+        """
+        try:
+            chunk = self._free.get_nowait()
+        except queue.Empty:
+            writing = self._allocated - len(self._pending)
+            if self._allocated < self._max_chunks or writing == 0:
+                self._allocated += 1
+                return _Chunk(self.chunk_rows)
+            chunk = self._free.get()
+        chunk.rows = 0
+        return chunk
+
+    def _submit(self, chunk):
+        """把分块交给后台线程写盘（队列满时等待）"""
+        self._raise_writer_error()
+        path = os.path.join(self.directory, f"{self.prefix}-{len(self.files):05d}.npz")
+        self.files.append(path)
+        self.rows_written += chunk.rows
+        self._queue.put((path, chunk))
+
+    def _raise_writer_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"Training data writer failed: {self._error}") from self._error
+
+    # ---- 写盘端（后台线程） ----
+
+    def _write_loop(self):
+        """后台线程：依次写出队列中的分块，写完后把缓冲区放回空闲池"""
+        save = np.savez_compressed if self.compress else np.savez
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            path, chunk = item
+            if self._error is None:
+                try:
+                    rows = chunk.rows
+                    save(path, **{name: column[:rows] for name, column in chunk.columns.items()})
+                except Exception as error:  # 交给生产端在下一次提交时抛出
+                    self._error = error
+            self._free.put(chunk)
+
+
+def load_chunk(path):
+    """读取一个分块文件，返回 {列名: 数组}"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def unpack_legal(packed):
+    """把打包的合法行动掩码还原为 (行, ACTION_COUNT) 的布尔数组"""
+    return np.unpackbits(packed, axis=-1, count=ACTION_COUNT, bitorder='little').astype(bool)
+
+
+def iter_chunks(directory):
+    """按文件名顺序遍历目录中的所有分块"""
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".npz"):
+            yield load_chunk(os.path.join(directory, name))
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Discard Solver
+弃牌求解器：在满足反击伤害要求的前提下，求损失最小的弃牌组合（覆盖型背包DP）
+"""
+
+from enum import Enum
+
+from card import Rank
+
+
+class DiscardObjective(Enum):
+    """弃牌目标"""
+    MIN_TOTAL = "min_total"        # 弃掉的总点数最少
+    FEWEST_CARDS = "fewest_cards"  # 弃掉的牌数最少
+    KEEP_COMBOS = "keep_combos"    # 尽量保留A牌和能组合的同点数牌
+
+
+# 代价编码为单个整数，按优先级分段（手牌总点数和张数都小于256）
+_SCALE = 256
+
+
+def _card_costs(cards, objective):
+    """每张牌被弃掉的代价"""
+    if objective == DiscardObjective.MIN_TOTAL:
+        return [card.attack_value * _SCALE + 1 for card in cards]
+    if objective == DiscardObjective.FEWEST_CARDS:
+        return [_SCALE + card.attack_value for card in cards]
+    if objective == DiscardObjective.KEEP_COMBOS:
+        rank_counts = {}
+        for card in cards:
+            rank_counts[card.rank] = rank_counts.get(card.rank, 0) + 1
+        costs = []
+        for card in cards:
+            combo_piece = card.rank == Rank.ACE or rank_counts[card.rank] > 1
+            costs.append(combo_piece * _SCALE * _SCALE + card.attack_value * _SCALE + 1)
+        return costs
+    raise ValueError(f"Unknown discard objective: {objective}")
+
+
+def _build_table(values, costs, required):
+    """
+    dp[i][s]：只用前i张牌、弃牌点数达到s（超过required按required计）时的最小代价。
+    不可达为None。
+    """
+    table = [[None] * (required + 1)]
+    table[0][0] = 0
+    for value, cost in zip(values, costs):
+        previous = table[-1]
+        current = list(previous)
+        for total, best in enumerate(previous):
+            if best is None:
+                continue
+            reached = min(total + value, required)
+            candidate = best + cost
+            if current[reached] is None or candidate < current[reached]:
+                current[reached] = candidate
+        table.append(current)
+    return table
+
+
+def optimal_discards(cards, required, objective=DiscardObjective.MIN_TOTAL, limit=8):
+    """
+    返回所有（最多limit个）代价最小的弃牌组合，每个组合为Card列表。
+    手牌总点数不足时返回空列表；required<=0 时返回 [[]]。
+    """
+    if required <= 0:
+        return [[]]
+    cards = list(cards)
+    values = [card.attack_value for card in cards]
+    if sum(values) < required:
+        return []
+
+    costs = _card_costs(cards, objective)
+    table = _build_table(values, costs, required)
+    best = table[-1][required]
+
+    # 回溯所有达到最优代价的选择
+    solutions = []
+
+    def backtrack(index, total, remaining_cost, chosen):
+        if len(solutions) >= limit:
+            return
+        if index == 0:
+            if total == 0 and remaining_cost == 0:
+                solutions.append([cards[i] for i in reversed(chosen)])
+            return
+        previous = table[index - 1]
+        item = index - 1
+        # 不弃第index张牌
+        if previous[total] == remaining_cost:
+            backtrack(index - 1, total, remaining_cost, chosen)
+        # 弃第index张牌：前一状态的点数t满足 min(t + value, required) == total
+        value = values[item]
+        cost = costs[item]
+        if total == required:
+            sources = range(max(0, required - value), required + 1)
+        elif total >= value:
+            sources = (total - value,)
+        else:
+            sources = ()
+        for source in sources:
+            if previous[source] is not None and previous[source] + cost == remaining_cost:
+                chosen.append(item)
+                backtrack(index - 1, source, remaining_cost - cost, chosen)
+                chosen.pop()
+
+    backtrack(len(cards), required, best, [])
+    return solutions
+
+
+def solve_discard(cards, required, objective=DiscardObjective.MIN_TOTAL):
+    """返回一个代价最小的弃牌组合（Card列表）；无法满足要求时返回None"""
+    solutions = optimal_discards(cards, required, objective, limit=1)
+    return solutions[0] if solutions else None
@@ -6,6 +6,8 @@ Regicide Game - Enemy System
 
 from enum import Enum
 from card import Card, Suit, Rank
+from zobrist import (DEFEATED_KEYS, ENEMY_HEALTH_KEYS, ENEMY_KEYS, ENEMY_ORDER_KEYS, ENEMY_REDUCTION_KEYS,
+                     hash_sequence)
 import random
 
 class EnemyType(Enum):
@@ -17,6 +19,9 @@ class EnemyType(Enum):
 class Enemy:
     """敌人类"""
     
+    __slots__ = ('card', 'suit', 'rank', 'max_health', 'current_health',
+                 'base_attack_power', 'attack_reduction', 'is_defeated', 'zobrist')
+    
     def __init__(self, card: Card):
         if not card.is_face_card:
             raise ValueError("敌人必须是人头牌（J、Q、K）")
@@ -27,12 +32,39 @@ class Enemy:
         
         # 设置敌人属性
         self.max_health = self._get_max_health()
-        self.current_health = self.max_health
         self.base_attack_power = self._get_attack_power()
+        self.reset()
+        
+    def reset(self):
+        """恢复满血和初始状态（新游戏复用敌人对象）"""
+        self.current_health = self.max_health
         self.attack_reduction = 0  # 黑桃造成的攻击力减少
         
         # 敌人状态
         self.is_defeated = False
+        self.update_zobrist()
+    
+    def copy(self):
+        """复制敌人（不经过__init__的查表和校验）"""
+        enemy = object.__new__(Enemy)
+        enemy.card = self.card
+        enemy.suit = self.suit
+        enemy.rank = self.rank
+        enemy.max_health = self.max_health
+        enemy.current_health = self.current_health
+        enemy.base_attack_power = self.base_attack_power
+        enemy.attack_reduction = self.attack_reduction
+        enemy.is_defeated = self.is_defeated
+        enemy.zobrist = self.zobrist
+        return enemy
+    
+    def update_zobrist(self):
+        """
+        重新计算生命值和攻击力减少的哈希（直接修改这两个属性后调用）。
+        减少值超过基础攻击力后效果相同，按基础攻击力计入，使等价状态的哈希相同。
+        """
+        self.zobrist = (ENEMY_HEALTH_KEYS[self.current_health]
+                        ^ ENEMY_REDUCTION_KEYS[min(self.attack_reduction, self.base_attack_power)])
         
     def _get_max_health(self):
         """根据牌面获取最大生命值"""
@@ -58,11 +90,13 @@ class Enemy:
             return 0
         
         actual_damage = min(damage, self.current_health)
+        self.zobrist ^= ENEMY_HEALTH_KEYS[self.current_health]
         self.current_health -= actual_damage
         
         if self.current_health <= 0:
             self.is_defeated = True
             self.current_health = 0
+        self.zobrist ^= ENEMY_HEALTH_KEYS[self.current_health]
             
         return actual_damage
     
@@ -77,7 +111,10 @@ class Enemy:
     
     def reduce_attack_power(self, reduction):
         """黑桃效果：永久降低攻击力"""
+        base = self.base_attack_power
+        self.zobrist ^= ENEMY_REDUCTION_KEYS[min(self.attack_reduction, base)]
         self.attack_reduction += reduction
+        self.zobrist ^= ENEMY_REDUCTION_KEYS[min(self.attack_reduction, base)]
         return self.attack_reduction
     
     def get_counter_attack_damage(self, defense=0):
@@ -124,46 +161,119 @@ class Enemy:
         return self.get_display_name()
 
 class EnemyQueue:
-    """敌人队列类 - 管理12个敌人的出场顺序"""
+    """
+    敌人队列类 - 管理12个敌人的出场顺序。
     
-    def __init__(self):
+    zobrist 只包含已击败数、当前敌人及其状态：后续敌人的顺序是玩家看不到的信息，不计入。
+    order_hash 是整个出场顺序的哈希，只在顺序改变（开局、恢复、重新打乱）时重新计算。
+    """
+    
+    def __init__(self, rng=None):
+        self.rng = rng if rng is not None else random.Random()  # 敌人排序使用的随机源
         self.enemies = []
         self.current_enemy_index = 0
+        self._position_hash = 0
+        self.order_hash = 0
+        
+        # 创建所有12个敌人（只创建一次，之后每局重置复用）
+        self._jacks = [Enemy(Card(suit, Rank.JACK)) for suit in Suit]
+        self._queens = [Enemy(Card(suit, Rank.QUEEN)) for suit in Suit]
+        self._kings = [Enemy(Card(suit, Rank.KING)) for suit in Suit]
+        self._enemies_by_id = {enemy.card.id: enemy for enemy in self._jacks + self._queens + self._kings}
+        
         self.setup_enemies()
     
     def setup_enemies(self):
         """设置敌人队列（按难度递增）"""
-        # 创建所有12个敌人
-        all_enemies = []
-        
-        # 4个杰克
-        for suit in Suit:
-            jack_card = Card(suit, Rank.JACK)
-            all_enemies.append(Enemy(jack_card))
-        
-        # 4个皇后
-        for suit in Suit:
-            queen_card = Card(suit, Rank.QUEEN)
-            all_enemies.append(Enemy(queen_card))
-            
-        # 4个国王
-        for suit in Suit:
-            king_card = Card(suit, Rank.KING)
-            all_enemies.append(Enemy(king_card))
-        
         # 按难度排序：先杰克，再皇后，最后国王
-        jacks = [e for e in all_enemies if e.rank == Rank.JACK]
-        queens = [e for e in all_enemies if e.rank == Rank.QUEEN]
-        kings = [e for e in all_enemies if e.rank == Rank.KING]
+        jacks = list(self._jacks)
+        queens = list(self._queens)
+        kings = list(self._kings)
+        for enemy in jacks + queens + kings:
+            enemy.reset()
         
         # 每个难度级别内部随机排序
-        random.shuffle(jacks)
-        random.shuffle(queens)
-        random.shuffle(kings)
+        self.rng.shuffle(jacks)
+        self.rng.shuffle(queens)
+        self.rng.shuffle(kings)
         
         # 组成最终队列
         self.enemies = jacks + queens + kings
         self.current_enemy_index = 0
+        self._update_position_hash()
+        self._update_order_hash()
+    
+    def get_state(self):
+        """紧凑状态：(敌人顺序字节串, 当前敌人序号, 当前敌人生命值, 当前敌人攻击力减少)"""
+        current = self.get_current_enemy()
+        return (
+            bytes(enemy.card.id for enemy in self.enemies),
+            self.current_enemy_index,
+            current.current_health if current else 0,
+            current.attack_reduction if current else 0,
+        )
+    
+    def set_state(self, state):
+        """从 get_state() 的结果恢复队列（已击败的敌人生命值为0，后续敌人为初始状态）"""
+        order, index, health, reduction = state
+        self.enemies = [self._enemies_by_id[card_id] for card_id in order]
+        self.current_enemy_index = index
+        for position, enemy in enumerate(self.enemies):
+            enemy.reset()
+            if position < index:
+                enemy.current_health = 0
+                enemy.is_defeated = True
+                enemy.update_zobrist()
+            elif position == index:
+                enemy.current_health = health
+                enemy.attack_reduction = reduction
+                enemy.update_zobrist()
+        self._update_position_hash()
+        self._update_order_hash()
+    
+    def copy(self, rng=None):
+        """复制队列和全部12个敌人（不经过__init__，不重新排序）；rng为副本使用的随机源"""
+        queue = object.__new__(EnemyQueue)
+        queue.rng = rng if rng is not None else self.rng
+        queue.enemies = [enemy.copy() for enemy in self.enemies]
+        by_id = queue._enemies_by_id = {enemy.card.id: enemy for enemy in queue.enemies}
+        queue._jacks = [by_id[enemy.card.id] for enemy in self._jacks]
+        queue._queens = [by_id[enemy.card.id] for enemy in self._queens]
+        queue._kings = [by_id[enemy.card.id] for enemy in self._kings]
+        queue.current_enemy_index = self.current_enemy_index
+        queue._position_hash = self._position_hash
+        queue.order_hash = self.order_hash
+        return queue
+    
+    def shuffle_unrevealed(self):
+        """重新打乱尚未出场的敌人（每个难度级别内部），当前敌人和已击败的敌人不动"""
+        tier_size = len(self._jacks)
+        for tier_start in range(0, len(self.enemies), tier_size):
+            start = max(tier_start, self.current_enemy_index + 1)
+            end = tier_start + tier_size
+            if end - start > 1:
+                hidden = self.enemies[start:end]
+                self.rng.shuffle(hidden)
+                self.enemies[start:end] = hidden
+        self._update_order_hash()
+    
+    def _update_position_hash(self):
+        """已击败数和当前敌人身份的哈希（当前敌人变化时调用）"""
+        index = self.current_enemy_index
+        self._position_hash = DEFEATED_KEYS[index]
+        if index < len(self.enemies):
+            self._position_hash ^= ENEMY_KEYS[self.enemies[index].card.id]
+    
+    def _update_order_hash(self):
+        """出场顺序的哈希（顺序改变时调用）"""
+        self.order_hash = hash_sequence(ENEMY_ORDER_KEYS, (enemy.card for enemy in self.enemies))
+    
+    @property
+    def zobrist(self):
+        """队列的哈希：位置哈希加上当前敌人的生命值和攻击力减少"""
+        if self.current_enemy_index < len(self.enemies):
+            return self._position_hash ^ self.enemies[self.current_enemy_index].zobrist
+        return self._position_hash
     
     def get_current_enemy(self):
         """获取当前敌人"""
@@ -177,6 +287,7 @@ class EnemyQueue:
             current_enemy = self.enemies[self.current_enemy_index]
             current_enemy.is_defeated = True
             self.current_enemy_index += 1
+            self._update_position_hash()
     
     def get_next_enemy(self):
         """获取下一个敌人（预览）"""
@@ -233,6 +344,9 @@ class EnemyQueue:
 class BattleResult:
     """战斗结果类"""
     
+    __slots__ = ('damage_dealt', 'counter_damage', 'enemy_defeated', 'special_effects',
+                 'cards_drawn', 'cards_healed', 'enemy_cards_discarded')
+    
     def __init__(self):
         self.damage_dealt = 0
         self.counter_damage = 0
@@ -5,8 +5,12 @@ Regicide Game - Game Engine
 """
 
 from enum import Enum
-from card import *
-from enemy import *
+from card import Deck, DiscardPile, Hand, Suit, SUIT_ORDER, cards_to_ids, ids_to_cards
+from enemy import EnemyQueue, BattleResult
+from discard_solver import DiscardObjective, solve_discard
+from damage import evaluate_play, evaluate_plays
+from game_log import PLAY as PLAY_EVENT, DISCARD as DISCARD_EVENT, HEAL as HEAL_EVENT, DRAW as DRAW_EVENT
+from zobrist import MASK64, PHASE_KEYS, PLAYER_KEYS, REQUIRED_KEYS, SELECTED_KEYS, TURN_KEY, hash_cards, rotate
 import random
 
 class GameState(Enum):
@@ -19,20 +23,41 @@ class GameState(Enum):
     VICTORY = "VICTORY"
     DEFEAT = "DEFEAT"
 
+# 游戏状态的整数编码（用于紧凑快照）
+GAME_STATES = tuple(GameState)
+GAME_STATE_CODES = {state: code for code, state in enumerate(GAME_STATES)}
+
+# SplitMix64：派生每局种子的独立种子序列，状态只有一个整数，复制代价为零
+_SEED_STEP = 0x9E3779B97F4A7C15
+
+def _next_game_seed(state):
+    """推进种子序列，返回 (新状态, 63位对局种子)"""
+    state = (state + _SEED_STEP) & MASK64
+    value = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return state, (value ^ (value >> 31)) >> 1
+
 class RegicideGame:
     """Regicide游戏主引擎"""
 
     # 手牌上限
     MAX_HAND_SIZE = 10
 
-    def __init__(self, player_count=1):
+    def __init__(self, player_count=1, seed=None):
         self.player_count = player_count
         self.game_state = GameState.MENU
         
+        # 随机源：每局一个由对局种子初始化的实例，本局所有随机性（洗牌、敌人排序、红桃回复）都来自它；
+        # 未指定对局种子时从独立的种子序列派生，因此第n局的种子只取决于seed和n，与之前各局用了多少随机数无关
+        self.seed = seed
+        self._seed_state = random.Random(seed).getrandbits(64)
+        self.rng = random.Random(seed)
+        self.game_seed = None  # 当前这一局的种子，可用于复现对局
+        
         # 初始化游戏组件
-        self.deck = Deck()
-        self.discard_pile = []
-        self.enemy_queue = EnemyQueue()
+        self.deck = Deck(self.rng)
+        self.discard_pile = DiscardPile()
+        self.enemy_queue = EnemyQueue(self.rng)
         
         # 玩家手牌（支持多人游戏扩展）
         self.player_hands = [Hand() for _ in range(player_count)]
@@ -50,24 +75,39 @@ class RegicideGame:
         self.required_discard_value = 0  # 需要弃牌的总点数
         self.selected_for_discard = []   # 选中要弃牌的牌
         
-    def start_new_game(self):
-        """开始新游戏"""
+        # 事件日志（见game_log.GameLog），None表示不记录
+        self.log = None
+        
+    def attach_log(self, log):
+        """挂接事件日志，之后开始的对局和所有行动都会追加到日志中；传入None停止记录"""
+        self.log = log
+        
+    def start_new_game(self, seed=None):
+        """开始新游戏（指定seed可复现对局，须为64位有符号整数；否则从引擎的种子序列派生本局种子）"""
+        if seed is None:
+            self._seed_state, seed = _next_game_seed(self._seed_state)
+        elif not isinstance(seed, int) or not -(1 << 63) <= seed < (1 << 63):
+            # 事件日志以64位有符号整数保存种子；在改变任何状态之前拒绝
+            raise ValueError(f"Game seed must be an integer in [-2**63, 2**63), got {seed!r}")
+        self.game_seed = seed
+        self.rng = random.Random(seed)
+        self.deck.rng = self.rng
+        self.enemy_queue.rng = self.rng
+        if self.log is not None:
+            self.log.record_seed(seed, self.player_count)
+        
         # 重置所有状态
         self.deck.reset()
-        self.deck.shuffle()
         self.discard_pile.clear()
         self.enemy_queue.restart()
         
-        # 移除敌人牌，只保留数字牌
-        enemy_cards = self.deck.get_enemies()
-        self.deck = Deck()
-        number_cards = self.deck.get_number_cards()
-        self.deck.cards = number_cards
+        # 移除敌人牌（由敌人队列管理），只保留数字牌
+        self.deck.get_enemies()
         self.deck.shuffle()
         
         # 给每个玩家发初始手牌（8张）
         for hand in self.player_hands:
-            hand.cards.clear()
+            hand.clear()
             initial_cards = self.deck.draw_multiple(8)
             hand.add_cards(initial_cards)
         
@@ -78,8 +118,18 @@ class RegicideGame:
         self.game_over = False
         self.victory = False
         
+        if self.log is not None:
+            self.log.record_enemy(self.enemy_queue.get_current_enemy())
+        
         return True
     
+    def declare_defeat(self):
+        """判定本局失败（规则判定的失败，或调用方发现没有合法行动时）"""
+        self.game_over = True
+        self.game_state = GameState.DEFEAT
+        if self.log is not None:
+            self.log.record_end(False)
+    
     def get_current_player_hand(self):
         """获取当前玩家手牌"""
         return self.player_hands[self.current_player]
@@ -100,6 +150,9 @@ class RegicideGame:
         if not current_enemy or current_enemy.is_defeated:
             return False
         
+        if self.log is not None:
+            self.log.record_cards(PLAY_EVENT, cards)
+        
         # 执行战斗
         battle_result = self._execute_battle(cards, current_enemy)
         self.last_battle_result = battle_result
@@ -120,7 +173,12 @@ class RegicideGame:
             if self.enemy_queue.is_all_defeated():
                 self.victory = True
                 self.game_state = GameState.VICTORY
+                if self.log is not None:
+                    self.log.record_end(True)
                 return battle_result
+            
+            if self.log is not None:
+                self.log.record_enemy(self.enemy_queue.get_current_enemy())
         
         # 处理反击伤害
         if battle_result.counter_damage > 0:
@@ -128,57 +186,41 @@ class RegicideGame:
         
         # 检查失败条件
         if self._check_defeat_conditions():
-            self.game_over = True
-            self.game_state = GameState.DEFEAT
+            self.declare_defeat()
         
         self.turn_count += 1
         return battle_result
     
     def _execute_battle(self, cards, enemy):
-        """执行战斗逻辑"""
+        """执行战斗逻辑（数值由伤害内核计算，这里只把结果应用到敌人身上）"""
         result = BattleResult()
+        outcome = evaluate_play(cards, enemy.current_health, enemy.attack_power)
 
         # 先应用黑桃效果（降低敌人攻击力）
-        spades_cards = [card for card in cards if card.suit == Suit.SPADES]
-        if spades_cards:
-            spades_power = sum(card.attack_value for card in spades_cards)
-            attack_reduction = spades_power
-            if not enemy.is_defeated:
-                total_reduction = enemy.reduce_attack_power(attack_reduction)
-                result.add_special_effect(f"Spades: Reduced enemy attack by {attack_reduction} (total -{total_reduction})")
-
-        # 计算总攻击力
-        total_attack = sum(card.attack_value for card in cards)
+        if outcome.attack_reduction:
+            total_reduction = enemy.reduce_attack_power(outcome.attack_reduction)
+            result.add_special_effect(f"Spades: Reduced enemy attack by {outcome.attack_reduction} (total -{total_reduction})")
 
-        # 计算组合牌加成
-        if len(cards) > 1:
-            combo_bonus = len(cards) * (len(cards) - 1)
-            total_attack += combo_bonus
-            result.add_special_effect(f"Combo bonus: +{combo_bonus}")
+        # 组合牌加成
+        if outcome.combo_bonus:
+            result.add_special_effect(f"Combo bonus: +{outcome.combo_bonus}")
 
         # 梅花翻倍效果
-        clubs_cards = [card for card in cards if card.suit == Suit.CLUBS]
-        if clubs_cards:
-            clubs_power = sum(card.attack_value for card in clubs_cards)
-            # 根据梅花牌力值决定翻倍效果
-            if clubs_power > 0:
-                total_attack *= 2
-                result.add_special_effect(f"Clubs: Double damage (Clubs power {clubs_power})")
+        if outcome.clubs_power:
+            result.add_special_effect(f"Clubs: Double damage (Clubs power {outcome.clubs_power})")
 
         # 对敌人造成伤害
-        damage_dealt = enemy.take_damage(total_attack)
-        result.damage_dealt = damage_dealt
+        result.damage_dealt = enemy.take_damage(outcome.total_attack)
 
-        # 计算反击伤害（如果敌人未被击败）
-        if not enemy.is_defeated:
-            counter_damage = enemy.get_counter_attack_damage(0)  # 移除梅花防御，现在没有防御值
-            result.counter_damage = counter_damage
+        # 反击伤害（敌人未被击败时）
+        result.counter_damage = outcome.counter_damage
 
         return result
     
     def _apply_suit_effects(self, cards, result):
         """应用花色特殊效果"""
-        suits_played = set(card.suit for card in cards)
+        # 按固定花色顺序结算（集合迭代顺序随进程哈希种子变化，会导致结果不可复现）
+        suits_played = [suit for suit in SUIT_ORDER if any(card.suit == suit for card in cards)]
 
         for suit in suits_played:
             suit_cards = [card for card in cards if card.suit == suit]
@@ -190,7 +232,7 @@ class RegicideGame:
                 # 红桃：治疗 - 从弃牌堆回复牌到手牌（考虑手牌上限）
                 current_hand = self.get_current_player_hand()
                 # 计算打出牌后的实际手牌数量
-                current_hand_size = len(current_hand.cards) - len(cards)
+                current_hand_size = current_hand.size() - len(cards)
 
                 if current_hand_size >= self.MAX_HAND_SIZE:
                     result.add_special_effect(f"Hearts: Hand full ({self.MAX_HAND_SIZE} cards), cannot heal")
@@ -213,7 +255,7 @@ class RegicideGame:
                 # 方块：抽牌（考虑手牌上限）
                 current_hand = self.get_current_player_hand()
                 # 计算打出牌后的实际手牌数量
-                current_hand_size = len(current_hand.cards) - len(cards)
+                current_hand_size = current_hand.size() - len(cards)
 
                 if current_hand_size >= self.MAX_HAND_SIZE:
                     # 手牌已满，无法抽牌
@@ -225,6 +267,8 @@ class RegicideGame:
 
                     if drawn_cards:
                         current_hand.add_cards(drawn_cards)
+                        if self.log is not None:
+                            self.log.record_cards(DRAW_EVENT, drawn_cards)
                         result.cards_drawn = len(drawn_cards)
                         if len(drawn_cards) < suit_power:
                             result.add_special_effect(f"Diamonds: Drew {len(drawn_cards)} cards (limited by hand size)")
@@ -244,7 +288,7 @@ class RegicideGame:
 
         current_hand = self.get_current_player_hand()
         # 计算打出牌后的实际手牌数量
-        current_hand_size = len(current_hand.cards) - cards_being_played
+        current_hand_size = current_hand.size() - cards_being_played
 
         # 检查手牌上限
         if current_hand_size >= self.MAX_HAND_SIZE:
@@ -255,13 +299,11 @@ class RegicideGame:
         if max_heal <= 0:
             return []
 
-        # 随机选择治疗的牌
-        healed_cards = random.sample(self.discard_pile, max_heal)
-
-        # 从弃牌堆移除，加入当前玩家手牌
-        for card in healed_cards:
-            self.discard_pile.remove(card)
-            current_hand.add_card(card)
+        # 从弃牌堆随机取出治疗的牌（O(1)交换删除），一次性加入当前玩家手牌
+        healed_cards = self.discard_pile.sample_remove(max_heal, self.rng)
+        current_hand.add_cards(healed_cards)
+        if self.log is not None:
+            self.log.record_cards(HEAL_EVENT, healed_cards)
         
         return healed_cards
     
@@ -279,6 +321,19 @@ class RegicideGame:
         # 改变游戏状态为弃牌选择
         self.game_state = GameState.DISCARD_SELECTION
     
+    def has_legal_action(self):
+        """检查当前玩家是否还有合法行动（可出牌或可满足弃牌要求）"""
+        current_hand = self.get_current_player_hand()
+        
+        if self.game_state == GameState.DISCARD_SELECTION:
+            hand_value = sum(card.attack_value for card in current_hand.cards)
+            return hand_value >= self.required_discard_value
+        
+        if self.game_state == GameState.PLAYING:
+            return not current_hand.is_empty()
+        
+        return False
+    
     def _check_defeat_conditions(self):
         """检查失败条件"""
         # 条件1：牌库为空且没有手牌
@@ -326,35 +381,12 @@ class RegicideGame:
         return None
     
     def get_possible_plays(self):
-        """获取所有可能的出牌组合"""
-        current_hand = self.get_current_player_hand()
-        possible_plays = []
-        
-        # 单张牌
-        for card in current_hand.cards:
-            possible_plays.append([card])
-        
-        # 组合牌（相同牌面）
-        for rank in current_hand.get_available_ranks():
-            cards_of_rank = current_hand.get_cards_by_rank(rank)
-            if len(cards_of_rank) > 1:
-                # 2张相同牌面
-                for i in range(len(cards_of_rank)):
-                    for j in range(i + 1, len(cards_of_rank)):
-                        possible_plays.append([cards_of_rank[i], cards_of_rank[j]])
-                
-                # 3张相同牌面
-                if len(cards_of_rank) >= 3:
-                    for i in range(len(cards_of_rank)):
-                        for j in range(i + 1, len(cards_of_rank)):
-                            for k in range(j + 1, len(cards_of_rank)):
-                                possible_plays.append([cards_of_rank[i], cards_of_rank[j], cards_of_rank[k]])
-                
-                # 4张相同牌面
-                if len(cards_of_rank) == 4:
-                    possible_plays.append(cards_of_rank)
-        
-        return possible_plays
+        """获取所有可能的出牌组合（包括A牌带同点数牌的组合）"""
+        return [list(cards) for cards in self.iter_possible_plays()]
+    
+    def iter_possible_plays(self):
+        """惰性枚举所有可能的出牌组合（Card元组），可以提前停止"""
+        return self.get_current_player_hand().iter_plays()
     
     def calculate_play_effectiveness(self, cards):
         """计算出牌的效果预览"""
@@ -365,34 +397,117 @@ class RegicideGame:
         if not current_enemy:
             return None
         
-        # 计算总攻击力
-        total_attack = sum(card.attack_value for card in cards)
-        
-        # 计算组合牌加成
-        if len(cards) > 1:
-            combo_bonus = len(cards) * (len(cards) - 1)
-            total_attack += combo_bonus
-        
-        # 梅花翻倍效果
-        clubs_cards = [card for card in cards if card.suit == Suit.CLUBS]
-        if clubs_cards:
-            clubs_power = sum(card.attack_value for card in clubs_cards)
-            if clubs_power > 0:
-                total_attack *= 2
-        
-        # 计算反击伤害（现在没有防御）
-        counter_damage = 0
-        damage_to_enemy = min(total_attack, current_enemy.current_health)
-        if damage_to_enemy < current_enemy.current_health:
-            counter_damage = current_enemy.attack_power  # 移除防御计算
-        
-        return {
-            'total_attack': total_attack,
-            'damage_to_enemy': damage_to_enemy,
-            'will_defeat_enemy': damage_to_enemy >= current_enemy.current_health,
-            'counter_damage': counter_damage,
-            'combo_bonus': combo_bonus if len(cards) > 1 else 0
-        }
+        return evaluate_play(cards, current_enemy.current_health, current_enemy.attack_power).to_dict()
+    
+    def evaluate_possible_plays(self, plays=None):
+        """
+        对当前敌人一次性结算所有候选出牌（默认为全部合法出牌）。
+        返回 (出牌, PlayOutcome) 列表；没有当前敌人时返回空列表。
+        """
+        if plays is None:
+            plays = tuple(self.iter_possible_plays())
+        return list(zip(plays, evaluate_plays(plays, self.enemy_queue.get_current_enemy())))
+    
+    def state_hash(self):
+        """
+        规范状态的64位Zobrist哈希，用作置换表和数据去重的键。
+        
+        牌库、手牌、弃牌堆和敌人的哈希在各自变化时已增量更新，这里只做常数次异或。
+        规范形式不区分牌库顺序、弃牌堆顺序（红桃从弃牌堆均匀随机回复）、后续敌人顺序和回合数；
+        需要区分这些顺序时使用 snapshot()。
+        """
+        value = (PHASE_KEYS[GAME_STATE_CODES[self.game_state]]
+                 ^ REQUIRED_KEYS[self.required_discard_value]
+                 ^ PLAYER_KEYS[self.current_player]
+                 ^ self.deck.zobrist
+                 ^ self.discard_pile.zobrist
+                 ^ self.enemy_queue.zobrist)
+        for index, hand in enumerate(self.player_hands):
+            value ^= rotate(hand.zobrist, index)
+        if self.selected_for_discard:
+            value ^= hash_cards(SELECTED_KEYS, self.selected_for_discard)
+        return value
+    
+    def full_state_hash(self):
+        """
+        完整状态的64位哈希：在 state_hash() 的基础上加入牌库顺序、弃牌堆数组顺序、敌人出场顺序和回合数。
+        
+        规范哈希相同的两个状态在同样的行动和随机源下仍可能走向不同的结果（抽到的牌、回复的牌、
+        下一个敌人不同）；需要区分它们的置换表和缓存用这个哈希。各部分的顺序哈希都已增量维护。
+        """
+        return (self.state_hash()
+                ^ rotate(self.deck.order_hash, 1)
+                ^ rotate(self.discard_pile.order_hash, 2)
+                ^ rotate(self.enemy_queue.order_hash, 3)
+                ^ (self.turn_count * TURN_KEY & MASK64))
+    
+    def snapshot(self, include_rng=False):
+        """
+        获取完整游戏状态的紧凑不可变快照（整数和字节串组成的元组）。
+        
+        牌以整数编号保存，可直接用作字典键。include_rng=True 时附带本局随机源状态，
+        恢复后后续的洗牌和红桃回复结果也与原对局一致（派生之后各局种子的种子序列不在快照中）。
+        """
+        return (
+            GAME_STATE_CODES[self.game_state],
+            self.turn_count,
+            self.current_player,
+            self.victory,
+            self.game_over,
+            self.deck.card_ids().tobytes(),
+            tuple(hand.mask for hand in self.player_hands),
+            self.discard_pile.get_state(),
+            self.enemy_queue.get_state(),
+            self.required_discard_value,
+            cards_to_ids(self.selected_for_discard).tobytes(),
+            self.game_seed,
+            self.rng.getstate() if include_rng else None,
+        )
+    
+    def restore(self, snapshot):
+        """从 snapshot() 的结果恢复游戏状态"""
+        (state_code, self.turn_count, self.current_player, self.victory, self.game_over,
+         deck_ids, hand_masks, discard_state, enemy_state, self.required_discard_value,
+         selected_ids, self.game_seed, rng_state) = snapshot
+        
+        self.game_state = GAME_STATES[state_code]
+        self.deck.load_ids(deck_ids)
+        for hand, mask in zip(self.player_hands, hand_masks):
+            hand.set_mask(mask)
+        self.discard_pile.set_state(discard_state)
+        self.enemy_queue.set_state(enemy_state)
+        self.selected_for_discard = ids_to_cards(selected_ids)
+        self.last_battle_result = None
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
+    
+    def clone(self):
+        """
+        复制出一个独立的游戏实例（包括随机源状态），不挂接事件日志。
+        
+        不经过__init__：直接复制各组件的状态，不重新生成牌库和敌人，也不从系统熵初始化随机源。
+        """
+        game = object.__new__(RegicideGame)
+        game.player_count = self.player_count
+        game.game_state = self.game_state
+        game.seed = self.seed
+        game._seed_state = self._seed_state
+        game.rng = random.Random.__new__(random.Random)
+        game.rng.setstate(self.rng.getstate())
+        game.game_seed = self.game_seed
+        game.deck = self.deck.copy(game.rng)
+        game.discard_pile = self.discard_pile.copy()
+        game.enemy_queue = self.enemy_queue.copy(game.rng)
+        game.player_hands = [hand.copy() for hand in self.player_hands]
+        game.current_player = self.current_player
+        game.turn_count = self.turn_count
+        game.game_over = self.game_over
+        game.victory = self.victory
+        game.last_battle_result = None
+        game.required_discard_value = self.required_discard_value
+        game.selected_for_discard = list(self.selected_for_discard)
+        game.log = None
+        return game
     
     def reset_game(self):
         """重置游戏"""
@@ -423,6 +538,13 @@ class RegicideGame:
         total_value = sum(card.attack_value for card in self.selected_for_discard)
         return total_value >= self.required_discard_value
     
+    def suggest_discard(self, objective=DiscardObjective.MIN_TOTAL):
+        """计算满足当前弃牌要求、损失最小的弃牌组合；不在弃牌阶段或无法满足时返回None"""
+        if self.game_state != GameState.DISCARD_SELECTION:
+            return None
+        current_hand = self.get_current_player_hand()
+        return solve_discard(current_hand.cards, self.required_discard_value, objective)
+    
     def confirm_discard(self):
         """确认弃牌选择"""
         if not self.can_confirm_discard():
@@ -430,10 +552,12 @@ class RegicideGame:
         
         current_hand = self.get_current_player_hand()
         
+        if self.log is not None:
+            self.log.record_cards(DISCARD_EVENT, self.selected_for_discard)
+        
         # 从手牌中移除选中的牌
         for card in self.selected_for_discard:
-            if card in current_hand.cards:
-                current_hand.cards.remove(card)
+            if current_hand.remove_card(card):
                 self.discard_pile.append(card)
         
         # 重置弃牌状态
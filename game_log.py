@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Event Log
+追加式对局事件日志：紧凑二进制编码、流式读取和按日志重放
+
+编码（每个事件以1字节类型开头，牌用0..51的整数编号）：
+    SEED     类型, 玩家数(1), 种子(8字节有符号小端)
+    PLAY     类型, 张数(1), 牌编号...
+    DISCARD  类型, 张数(1), 牌编号...
+    HEAL     类型, 张数(1), 牌编号...
+    DRAW     类型, 张数(1), 牌编号...
+    ENEMY    类型, 敌人牌编号(1)
+    END      类型, 是否胜利(1)
+
+一个日志流可以包含多局，每局从SEED事件开始。对局完全由种子和玩家的选择（PLAY、DISCARD）决定，
+HEAL、DRAW、ENEMY和END是引擎推导出的结果，重放时用来校验。
+"""
+
+import argparse
+import struct
+import sys
+
+from card import cards_to_ids, ids_to_cards
+
+# 事件类型
+SEED = 1
+PLAY = 2
+DISCARD = 3
+HEAL = 4
+DRAW = 5
+ENEMY = 6
+END = 7
+
+EVENT_NAMES = {SEED: "seed", PLAY: "play", DISCARD: "discard", HEAL: "heal",
+               DRAW: "draw", ENEMY: "enemy", END: "end"}
+CARD_EVENTS = frozenset((PLAY, DISCARD, HEAL, DRAW))
+
+_SEED_FORMAT = struct.Struct('<Bq')  # 玩家数, 种子
+
+# 回放关键帧间隔（行动数）
+KEYFRAME_INTERVAL = 8
+
+
+class ReplayError(Exception):
+    """日志无法重放，或重放结果与日志记录不一致"""
+
+
+class GameLog:
+    """追加式事件日志，内容保存在一个bytearray中"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data=b''):
+        self.data = bytearray(data)
+
+    def __len__(self):
+        """日志字节数"""
+        return len(self.data)
+
+    def clear(self):
+        """清空日志"""
+        self.data.clear()
+
+    def record_seed(self, seed, player_count):
+        """新对局开始（种子需能用64位有符号整数表示）"""
+        self.data.append(SEED)
+        self.data += _SEED_FORMAT.pack(player_count, seed)
+
+    def record_cards(self, event, cards):
+        """记录带牌列表的事件（PLAY、DISCARD、HEAL、DRAW）"""
+        card_ids = cards_to_ids(cards)
+        self.data.append(event)
+        self.data.append(len(card_ids))
+        self.data += card_ids
+
+    def record_enemy(self, enemy):
+        """当前敌人变为enemy"""
+        self.data.append(ENEMY)
+        self.data.append(enemy.card.id)
+
+    def record_end(self, victory):
+        """对局结束"""
+        self.data.append(END)
+        self.data.append(1 if victory else 0)
+
+    def events(self):
+        """遍历日志中的事件"""
+        return iter_events(self.data)
+
+    def to_bytes(self):
+        """日志内容的不可变副本"""
+        return bytes(self.data)
+
+
+def _decode(event, payload):
+    """把事件负载解码为事件值"""
+    if event == SEED:
+        player_count, seed = _SEED_FORMAT.unpack(payload)
+        return seed, player_count
+    if event == ENEMY:
+        return payload[0]
+    if event == END:
+        return bool(payload[0])
+    return bytes(payload)
+
+
+def iter_events(data):
+    """
+    从内存中的日志逐个解析事件，产生 (事件类型, 值)：
+    SEED的值为 (种子, 玩家数)，牌事件为牌编号组成的bytes，ENEMY为敌人牌编号，END为是否胜利。
+    """
+    view = memoryview(data)
+    position = 0
+    size = len(view)
+    while position < size:
+        event = view[position]
+        if event in CARD_EVENTS:
+            count = view[position + 1]
+            start = position + 2
+            position = start + count
+            if position > size:
+                raise ValueError("Truncated event log")
+            yield event, bytes(view[start:position])
+        elif event == SEED:
+            start = position + 1
+            position = start + _SEED_FORMAT.size
+            if position > size:
+                raise ValueError("Truncated event log")
+            yield event, _decode(event, view[start:position])
+        elif event in (ENEMY, END):
+            if position + 2 > size:
+                raise ValueError("Truncated event log")
+            yield event, _decode(event, view[position + 1:position + 2])
+            position += 2
+        else:
+            raise ValueError(f"Unknown event type {event} at offset {position}")
+
+
+def read_events(stream, chunk_size=65536):
+    """从二进制文件流中流式读取事件（不需要把整个文件读入内存）"""
+    buffer = bytearray()
+    position = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            del buffer[:position]
+            buffer += chunk
+            position = 0
+        # 只解析缓冲区中完整的事件
+        while position < len(buffer):
+            event = buffer[position]
+            if event in CARD_EVENTS:
+                if position + 2 > len(buffer):
+                    break
+                length = 2 + buffer[position + 1]
+            elif event == SEED:
+                length = 1 + _SEED_FORMAT.size
+            elif event in (ENEMY, END):
+                length = 2
+            else:
+                raise ValueError(f"Unknown event type {event}")
+            if position + length > len(buffer):
+                break
+            yield event, _decode(event, buffer[position + (2 if event in CARD_EVENTS else 1):position + length])
+            position += length
+        if not chunk:
+            if position < len(buffer):
+                raise ValueError("Truncated event log")
+            return
+
+
+def split_games(events):
+    """把事件流按SEED事件切分为单局事件列表"""
+    game_events = None
+    for event in events:
+        if event[0] == SEED:
+            if game_events:
+                yield game_events
+            game_events = [event]
+        elif game_events is None:
+            raise ValueError("Event log does not start with a SEED event")
+        else:
+            game_events.append(event)
+    if game_events:
+        yield game_events
+
+
+def _apply_action(game, event, value):
+    """把日志中的一个玩家行动应用到游戏上"""
+    if event == PLAY:
+        if not game.play_cards(ids_to_cards(value)):
+            raise ReplayError(f"Illegal play in log: {list(value)}")
+    elif event == DISCARD:
+        game.selected_for_discard = ids_to_cards(value)
+        if not game.confirm_discard():
+            raise ReplayError(f"Illegal discard in log: {list(value)}")
+    elif event == END and not value and not game.game_over:
+        # 无合法行动等由调用方判定的失败
+        game.declare_defeat()
+
+
+def replay(events, verify=True):
+    """
+    按日志重放一局，返回最终的 RegicideGame。
+
+    只有种子、PLAY和DISCARD驱动重放；verify=True 时重放过程重新生成完整日志，
+    与输入逐个事件比较，不一致（例如引擎规则改变）时抛出 ReplayError。
+    """
+    from game_engine import RegicideGame
+
+    events = iter(events)
+    first = next(events, None)
+    if first is None or first[0] != SEED:
+        raise ReplayError("Event log does not start with a SEED event")
+    seed, player_count = first[1]
+
+    game = RegicideGame(player_count)
+    check = GameLog() if verify else None
+    game.attach_log(check)
+    game.start_new_game(seed)
+
+    expected = [first]
+    for event, value in events:
+        expected.append((event, value))
+        if event == SEED:
+            raise ReplayError("replay() takes a single game; use split_games() for multi-game logs")
+        _apply_action(game, event, value)
+    game.attach_log(None)
+
+    if verify:
+        for index, (produced, recorded) in enumerate(zip(check.events(), expected)):
+            if produced != recorded:
+                raise ReplayError(f"Event {index} differs: log has {recorded}, replay produced {produced}")
+        produced_count = sum(1 for _ in check.events())
+        if produced_count != len(expected):
+            raise ReplayError(f"Log has {len(expected)} events, replay produced {produced_count}")
+    return game
+
+
+class ReplayTimeline:
+    """
+    可随机跳转的单局回放。
+
+    构建时按日志重放一遍，每隔interval个行动保存一个带随机源状态的快照作为关键帧；
+    跳转到任意位置只需恢复最近的关键帧，再重放不超过interval-1个行动。
+    位置p表示已经执行了前p个行动（0为开局发牌后）。
+    """
+
+    def __init__(self, events, interval=KEYFRAME_INTERVAL):
+        from game_engine import RegicideGame
+
+        events = iter(events)
+        first = next(events, None)
+        if first is None or first[0] != SEED:
+            raise ReplayError("Event log does not start with a SEED event")
+        seed, player_count = first[1]
+
+        self.seed = seed
+        self.interval = interval
+        self.game = RegicideGame(player_count)
+        self.game.start_new_game(seed)
+        self.actions = []      # 玩家行动 (事件类型, 值)
+        self.outcomes = []     # 每个行动之后引擎推导出的事件（回复、抽牌、敌人变化、结束）
+        self.keyframes = [self.game.snapshot(include_rng=True)]
+
+        for event, value in events:
+            if event == SEED:
+                raise ReplayError("ReplayTimeline takes a single game; use split_games() for multi-game logs")
+            if event in (PLAY, DISCARD) or (event == END and not value and not self.game.game_over):
+                _apply_action(self.game, event, value)
+                self.actions.append((event, value))
+                self.outcomes.append([])
+                if len(self.actions) % interval == 0:
+                    self.keyframes.append(self.game.snapshot(include_rng=True))
+            elif self.outcomes:
+                self.outcomes[-1].append((event, value))
+
+        self.final_snapshot = self.game.snapshot(include_rng=True)
+        self.position = len(self.actions)
+
+    @classmethod
+    def from_file(cls, path, game_index=0, interval=KEYFRAME_INTERVAL):
+        """从日志文件中载入第game_index局"""
+        with open(path, "rb") as stream:
+            for index, game_events in enumerate(split_games(read_events(stream))):
+                if index == game_index:
+                    return cls(game_events, interval)
+        raise ReplayError(f"{path} has no game #{game_index}")
+
+    def __len__(self):
+        """行动总数"""
+        return len(self.actions)
+
+    def seek(self, position):
+        """跳转到指定位置，返回回放用的游戏对象"""
+        position = max(0, min(position, len(self.actions)))
+        keyframe = position // self.interval
+        self.game.restore(self.keyframes[keyframe])
+        for event, value in self.actions[keyframe * self.interval:position]:
+            _apply_action(self.game, event, value)
+        self.position = position
+        return self.game
+
+    def step(self, delta):
+        """前进（delta>0）或后退若干个行动"""
+        return self.seek(self.position + delta)
+
+    def describe(self, card_name=str):
+        """最近一个已执行行动及其结果的说明"""
+        if self.position == 0:
+            return "Opening hand"
+        index = self.position - 1
+        events = [self.actions[index]] + self.outcomes[index]
+        return ", ".join(format_event(event, value, card_name) for event, value in events)
+
+
+def format_event(event, value, card_name=str):
+    """事件的可读文本（card_name决定单张牌的显示方式）"""
+    name = EVENT_NAMES[event]
+    if event == SEED:
+        return f"{name} {value[0]} players={value[1]}"
+    if event in CARD_EVENTS:
+        return f"{name} " + " ".join(card_name(card) for card in ids_to_cards(value))
+    if event == ENEMY:
+        return f"{name} {card_name(ids_to_cards((value,))[0])}"
+    return f"{name} {'victory' if value else 'defeat'}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and replay Regicide event logs")
+    parser.add_argument("path", help="binary event log (for example from simulator.py --log)")
+    parser.add_argument("--show", action="store_true", help="print every event instead of replaying")
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as stream:
+        if args.show:
+            for event, value in read_events(stream):
+                print(format_event(event, value))
+            return
+
+        games = wins = 0
+        for game_events in split_games(read_events(stream)):
+            try:
+                game = replay(game_events)
+            except ReplayError as error:
+                print(f"Game {games} (seed {game_events[0][1][0]}): {error}", file=sys.stderr)
+                sys.exit(1)
+            games += 1
+            wins += game.victory
+    print(f"Replayed {games} games ({wins} wins), all consistent with the log")
+
+
+if __name__ == "__main__":
+    main()
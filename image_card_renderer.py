@@ -8,6 +8,7 @@ import pygame
 import os
 from card import Card, Suit, Rank
 from enemy import Enemy
+from text_cache import get_font, render_text
 
 class ImageCardRenderer:
     """基于图像的卡牌渲染器"""
@@ -23,11 +24,16 @@ class ImageCardRenderer:
         self.enemy_card_width = int(self.card_width * 1.5)
         self.enemy_card_height = int(self.card_height * 1.5)
 
-        # 图像缓存
+        # 图像缓存（原始尺寸）
         self.card_images = {}
         self.enemy_images = {}
         self.card_back_image = None
 
+        # 缩放后的纹理缓存：(图像键, (宽, 高)) -> 已转换为显示像素格式的Surface
+        # 首次绘制某个尺寸时生成，分辨率改变时调用 clear_texture_cache() 重建
+        self.texture_cache = {}
+        self._stats_background = None
+
         # 加载所有图像
         self._load_all_images()
 
@@ -51,7 +57,7 @@ class ImageCardRenderer:
 
                 filename = f"assets/images/cards/{suit.name.lower()}_{rank.name.lower()}.png"
                 if os.path.exists(filename):
-                    image = pygame.image.load(filename)
+                    image = self._convert(pygame.image.load(filename))
                     self.card_images[(suit, rank)] = image
                 else:
                     print(f"Warning: Image not found: {filename}")
@@ -61,7 +67,7 @@ class ImageCardRenderer:
             for rank in [Rank.JACK, Rank.QUEEN, Rank.KING]:
                 filename = f"assets/images/enemies/{suit.name.lower()}_{rank.name.lower()}.png"
                 if os.path.exists(filename):
-                    image = pygame.image.load(filename)
+                    image = self._convert(pygame.image.load(filename))
                     self.enemy_images[(suit, rank)] = image
                 else:
                     print(f"Warning: Enemy image not found: {filename}")
@@ -69,12 +75,38 @@ class ImageCardRenderer:
         # 加载卡背
         back_filename = "assets/images/backs/card_back.png"
         if os.path.exists(back_filename):
-            self.card_back_image = pygame.image.load(back_filename)
+            self.card_back_image = self._convert(pygame.image.load(back_filename))
         else:
             print(f"Warning: Card back image not found: {back_filename}")
 
         print(f"Loaded {len(self.card_images)} card images and {len(self.enemy_images)} enemy images")
 
+    @staticmethod
+    def _convert(image):
+        """
+        转换为显示像素格式，之后的绘制无需逐像素转换；还没有显示窗口时原样返回。
+        带透明通道的图像用 convert_alpha()，不透明的图像用 convert()（不透明绘制更快）。
+        """
+        if pygame.display.get_surface() is None:
+            return image
+        if image.get_flags() & pygame.SRCALPHA:
+            return image.convert_alpha()
+        return image.convert()
+
+    def _scaled(self, key, image, size):
+        """取缓存中缩放到size的纹理，没有时缩放一次并转换为显示像素格式"""
+        cache_key = (key, size)
+        texture = self.texture_cache.get(cache_key)
+        if texture is None:
+            texture = self._convert(pygame.transform.scale(image, size))
+            self.texture_cache[cache_key] = texture
+        return texture
+
+    def clear_texture_cache(self):
+        """显示分辨率或像素格式改变时清空纹理缓存（之后按需重建）"""
+        self.texture_cache.clear()
+        self._stats_background = None
+
     def draw_card(self, surface, card, x, y, selected=False, small=False):
         """绘制单张卡牌"""
         width = self.small_card_width if small else self.card_width
@@ -83,9 +115,8 @@ class ImageCardRenderer:
         # 获取卡牌图像
         card_key = (card.suit, card.rank)
         if card_key in self.card_images:
-            # 缩放图像到合适大小
-            original_image = self.card_images[card_key]
-            scaled_image = pygame.transform.scale(original_image, (width, height))
+            # 取缓存中已缩放的图像
+            scaled_image = self._scaled(card_key, self.card_images[card_key], (width, height))
 
             # 绘制卡牌
             card_rect = pygame.Rect(x, y, width, height)
@@ -107,8 +138,8 @@ class ImageCardRenderer:
         height = self.small_card_height if small else self.card_height
 
         if self.card_back_image:
-            # 缩放卡背图像
-            scaled_back = pygame.transform.scale(self.card_back_image, (width, height))
+            # 取缓存中已缩放的卡背图像
+            scaled_back = self._scaled('back', self.card_back_image, (width, height))
             surface.blit(scaled_back, (x, y))
         else:
             # 回退到简单的卡背绘制
@@ -124,9 +155,8 @@ class ImageCardRenderer:
         # 获取敌人图像
         enemy_key = (enemy.suit, enemy.rank)
         if enemy_key in self.enemy_images:
-            # 缩放敌人图像
-            original_image = self.enemy_images[enemy_key]
-            scaled_image = pygame.transform.scale(original_image, (width, height))
+            # 取缓存中已缩放的敌人图像
+            scaled_image = self._scaled(enemy_key, self.enemy_images[enemy_key], (width, height))
 
             # 绘制敌人卡牌
             surface.blit(scaled_image, (x, y))
@@ -142,25 +172,30 @@ class ImageCardRenderer:
 
     def _draw_enemy_stats(self, surface, enemy, x, y, width, height):
         """在敌人卡牌上绘制状态信息"""
-        font_large = pygame.font.Font(None, 24)
-        font_small = pygame.font.Font(None, 18)
-
-        # 半透明背景
-        stats_bg = pygame.Surface((width, 60))
-        stats_bg.set_alpha(180)
-        stats_bg.fill((0, 0, 0))
+        font_large = get_font(24)
+        font_small = get_font(18)
+
+        # 半透明背景（只创建一次）
+        stats_bg = self._stats_background
+        if stats_bg is None or stats_bg.get_width() != width:
+            stats_bg = pygame.Surface((width, 60))
+            if pygame.display.get_surface() is not None:
+                stats_bg = stats_bg.convert()
+            stats_bg.fill((0, 0, 0))
+            stats_bg.set_alpha(180)
+            self._stats_background = stats_bg
         surface.blit(stats_bg, (x, y + height - 60))
 
         # 生命值
         health_text = f"HP: {enemy.current_health}/{enemy.max_health}"
-        health_surface = font_large.render(health_text, True, self.colors['white'])
+        health_surface = render_text(font_large, health_text, self.colors['white'])
         health_x = x + width // 2 - health_surface.get_width() // 2
         health_y = y + height - 50
         surface.blit(health_surface, (health_x, health_y))
 
         # 攻击力
         attack_text = f"ATK: {enemy.attack_power}"
-        attack_surface = font_small.render(attack_text, True, self.colors['white'])
+        attack_surface = render_text(font_small, attack_text, self.colors['white'])
         attack_x = x + width // 2 - attack_surface.get_width() // 2
         attack_y = y + height - 25
         surface.blit(attack_surface, (attack_x, attack_y))
@@ -207,7 +242,7 @@ class ImageCardRenderer:
         pygame.draw.rect(surface, background_color, inner_rect)
 
         # 简单的文本显示
-        font = pygame.font.Font(None, 16 if small else 20)
+        font = get_font(16 if small else 20)
 
         # 花色符号映射
         suit_symbols = {
@@ -230,8 +265,8 @@ class ImageCardRenderer:
         suit_text = suit_symbols[card.suit]
 
         # 绘制文本
-        rank_surface = font.render(rank_text, True, suit_color)
-        suit_surface = font.render(suit_text, True, suit_color)
+        rank_surface = render_text(font, rank_text, suit_color)
+        suit_surface = render_text(font, suit_text, suit_color)
 
         surface.blit(rank_surface, (x + 5, y + 5))
         surface.blit(suit_surface, (x + 5, y + 25))
@@ -270,9 +305,9 @@ class ImageCardRenderer:
         pygame.draw.rect(surface, self.colors['gold'], card_rect, 4)
 
         # 简单的敌人信息显示
-        font = pygame.font.Font(None, 24)
+        font = get_font(24)
         name_text = f"{enemy.rank.name}"
-        name_surface = font.render(name_text, True, self.colors['white'])
+        name_surface = render_text(font, name_text, self.colors['white'])
         name_x = x + width // 2 - name_surface.get_width() // 2
         name_y = y + 10
         surface.blit(name_surface, (name_x, name_y))
\ No newline at end of file
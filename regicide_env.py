@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Reinforcement Learning Environment
+强化学习环境：Gym风格的 reset()/step() 接口、固定长度观测、合法行动掩码，以及同步/多进程向量化环境
+
+行动空间（共 ACTION_COUNT 个离散行动）：
+    出牌  0 .. PLAY_ACTION_COUNT-1：A牌的花色子集 × {不带其他牌, 点数2..10中某一点数的非空花色子集}，
+          去掉空出牌后共 16 * (1 + 9 * 15) - 1 = 2175 个
+    弃牌  DISCARD_ACTION_OFFSET + 牌编号：把一张手牌加入弃牌选择，选中点数达到要求时自动确认
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+
+import numpy as np
+
+from card import CARDS_BY_ID, CARD_COUNT, RANK_COUNT, SUIT_ORDER, Rank, mask_to_cards
+from game_engine import RegicideGame, GameState
+from state_encoder import ENEMY_COUNT, FEATURE_SIZE, allocate, encode_state
+from simulator import spawn_seeds
+
+# ---- 行动空间 ----
+
+def _rank_mask(rank_value, suit_subset):
+    """某一点数在给定花色子集（4位）下的牌掩码"""
+    mask = 0
+    for suit_index in range(len(SUIT_ORDER)):
+        if suit_subset >> suit_index & 1:
+            mask |= 1 << (suit_index * RANK_COUNT + rank_value - 1)
+    return mask
+
+
+def _build_play_actions():
+    """按编号顺序列出所有出牌行动的牌掩码"""
+    groups = [0] + [_rank_mask(rank_value, suit_subset)
+                    for rank_value in range(Rank.TWO.value, Rank.TEN.value + 1)
+                    for suit_subset in range(1, 16)]
+    actions = []
+    for group in groups:
+        for ace_subset in range(16):
+            mask = group | _rank_mask(Rank.ACE.value, ace_subset)
+            if mask:
+                actions.append(mask)
+    return tuple(actions)
+
+
+PLAY_ACTION_MASKS = _build_play_actions()
+PLAY_ACTION_INDEX = {mask: index for index, mask in enumerate(PLAY_ACTION_MASKS)}
+PLAY_ACTION_COUNT = len(PLAY_ACTION_MASKS)
+DISCARD_ACTION_OFFSET = PLAY_ACTION_COUNT
+ACTION_COUNT = PLAY_ACTION_COUNT + CARD_COUNT
+
+# 观测即 state_encoder 的特征向量
+OBS_SIZE = FEATURE_SIZE
+
+# 出牌合法行动编号缓存：手牌掩码 -> 行动编号数组
+_PLAY_INDICES_MEMO = {}
+_PLAY_INDICES_MEMO_SIZE = 8192
+
+
+def _play_indices(hand):
+    """当前手牌所有合法出牌的行动编号"""
+    indices = _PLAY_INDICES_MEMO.get(hand.mask)
+    if indices is None:
+        indices = []
+        for cards in hand.iter_plays():
+            mask = 0
+            for card in cards:
+                mask |= 1 << card.id
+            index = PLAY_ACTION_INDEX.get(mask)
+            if index is not None:  # 手牌中只会有A-10，所有出牌都在行动空间内
+                indices.append(index)
+        indices = np.array(indices, dtype=np.int64)
+        if len(_PLAY_INDICES_MEMO) >= _PLAY_INDICES_MEMO_SIZE:
+            _PLAY_INDICES_MEMO.clear()
+        _PLAY_INDICES_MEMO[hand.mask] = indices
+    return indices
+
+
+def legal_action_mask(game, out=None):
+    """长度 ACTION_COUNT 的布尔掩码，True表示该行动当前合法"""
+    if out is None:
+        out = np.zeros(ACTION_COUNT, dtype=bool)
+    else:
+        out[:] = False
+
+    hand = game.get_current_player_hand()
+    if game.game_state == GameState.PLAYING:
+        out[_play_indices(hand)] = True
+    elif game.game_state == GameState.DISCARD_SELECTION:
+        selected = game.selected_for_discard
+        for card in hand.cards:
+            if card not in selected:
+                out[DISCARD_ACTION_OFFSET + card.id] = True
+    return out
+
+
+class RegicideEnv:
+    """
+    单局强化学习环境。
+
+    reset() 返回 (观测, 信息)，step(action) 返回 (观测, 奖励, 终止, 截断, 信息)。
+    奖励：每击败一个敌人 enemy_reward，胜利额外 victory_reward。
+    没有合法行动时判定失败并终止；执行非法行动抛出 ValueError。
+    """
+
+    observation_size = OBS_SIZE
+    action_count = ACTION_COUNT
+
+    def __init__(self, seed=None, max_steps=1000, enemy_reward=1.0 / ENEMY_COUNT, victory_reward=1.0):
+        self.game = RegicideGame(seed=seed)
+        self.max_steps = max_steps
+        self.enemy_reward = enemy_reward
+        self.victory_reward = victory_reward
+        self.steps = 0
+        self.episode_return = 0.0
+        self.done = True
+
+    def reset(self, seed=None):
+        """开始新的一局（seed为None时从环境随机源派生）"""
+        self.game.start_new_game(seed)
+        self.steps = 0
+        self.episode_return = 0.0
+        self.done = False
+        return self.observe(), self.info()
+
+    def observe(self, out=None):
+        """当前观测（写入out，未提供时新建）"""
+        if out is None:
+            out = allocate()
+        return encode_state(self.game, out)
+
+    def action_mask(self, out=None):
+        """当前合法行动掩码"""
+        return legal_action_mask(self.game, out)
+
+    def info(self):
+        """附加信息"""
+        return {
+            'game_seed': self.game.game_seed,
+            'enemies_defeated': self.game.enemy_queue.get_defeated_enemies(),
+            'victory': self.game.victory,
+        }
+
+    def act(self, action):
+        """执行行动但不生成观测，返回 (奖励, 终止, 截断)；向量化环境直接使用"""
+        if self.done:
+            raise RuntimeError("Episode has ended; call reset() first")
+        game = self.game
+        action = int(action)
+        defeated_before = game.enemy_queue.get_defeated_enemies()
+
+        if 0 <= action < PLAY_ACTION_COUNT:
+            if game.game_state != GameState.PLAYING:
+                raise ValueError(f"Play action {action} outside the playing phase")
+            if not game.play_cards(mask_to_cards(PLAY_ACTION_MASKS[action])):
+                raise ValueError(f"Illegal play action {action}")
+        elif DISCARD_ACTION_OFFSET <= action < ACTION_COUNT:
+            card = CARDS_BY_ID[action - DISCARD_ACTION_OFFSET]
+            if (game.game_state != GameState.DISCARD_SELECTION
+                    or card not in game.get_current_player_hand() or card in game.selected_for_discard):
+                raise ValueError(f"Illegal discard action {action}")
+            game.toggle_discard_selection(card)
+            if game.can_confirm_discard():
+                game.confirm_discard()
+        else:
+            raise ValueError(f"Action {action} out of range")
+
+        self.steps += 1
+        if game.game_state in (GameState.PLAYING, GameState.DISCARD_SELECTION) and not game.has_legal_action():
+            game.declare_defeat()
+
+        terminated = game.game_state in (GameState.VICTORY, GameState.DEFEAT)
+        truncated = not terminated and self.steps >= self.max_steps
+        reward = self.enemy_reward * (game.enemy_queue.get_defeated_enemies() - defeated_before)
+        if game.victory:
+            reward += self.victory_reward
+        self.episode_return += reward
+        self.done = terminated or truncated
+        return reward, terminated, truncated
+
+    def step(self, action):
+        """执行一个行动"""
+        reward, terminated, truncated = self.act(action)
+        return self.observe(), reward, terminated, truncated, self.info()
+
+
+class SyncVectorEnv:
+    """
+    在当前进程中推进多个环境。
+
+    观测和掩码写入预先分配的 (N, OBS_SIZE) / (N, ACTION_COUNT) 数组（可以是共享内存）；
+    某个环境结束后自动开始新的一局，结束那一局的统计放在该环境的info['episode']中。
+    """
+
+    def __init__(self, num_envs, seed=None, max_steps=1000, observations=None, masks=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.envs = [RegicideEnv(env_seed, max_steps, **env_kwargs) for env_seed in spawn_seeds(seed, num_envs)]
+        self.observations = observations if observations is not None else np.zeros((num_envs, OBS_SIZE), np.float32)
+        self.masks = masks if masks is not None else np.zeros((num_envs, ACTION_COUNT), dtype=bool)
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seeds=None):
+        """重置所有环境，返回 (观测, 掩码)"""
+        for index, env in enumerate(self.envs):
+            env.reset(None if seeds is None else seeds[index])
+            env.observe(self.observations[index])
+            env.action_mask(self.masks[index])
+        return self.observations, self.masks
+
+    def step(self, actions):
+        """每个环境执行一个行动，返回 (观测, 奖励, 终止, 截断, 信息列表)"""
+        infos = [None] * self.num_envs
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            reward, terminated, truncated = env.act(action)
+            self.rewards[index] = reward
+            self.terminated[index] = terminated
+            self.truncated[index] = truncated
+            if terminated or truncated:
+                infos[index] = {'episode': {'return': env.episode_return, 'length': env.steps, **env.info()}}
+                env.reset()
+            env.observe(self.observations[index])
+            env.action_mask(self.masks[index])
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        """同步环境无需释放资源"""
+
+
+def _subprocess_worker(remote, parent_remote, start, count, seed, max_steps, env_kwargs,
+                       observation_buffer, mask_buffer, num_envs):
+    """子进程：推进一段连续编号的环境，观测和掩码直接写入共享内存"""
+    parent_remote.close()
+    observations = np.frombuffer(observation_buffer, dtype=np.float32).reshape(num_envs, OBS_SIZE)
+    masks = np.frombuffer(mask_buffer, dtype=np.bool_).reshape(num_envs, ACTION_COUNT)
+    envs = SyncVectorEnv(count, seed, max_steps, observations[start:start + count],
+                         masks[start:start + count], **env_kwargs)
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'step':
+                _, rewards, terminated, truncated, infos = envs.step(data)
+                remote.send((rewards, terminated, truncated, infos))
+            elif command == 'reset':
+                envs.reset(data)
+                remote.send(None)
+            elif command == 'close':
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        remote.close()
+
+
+class SubprocVectorEnv:
+    """
+    在多个子进程中推进环境。
+
+    每个子进程负责一段连续编号的环境，观测和掩码写在共享内存中，主进程直接读取，
+    管道中只传递行动、奖励和结束标志。
+    """
+
+    def __init__(self, num_envs, workers=None, seed=None, max_steps=1000, **env_kwargs):
+        workers = max(1, min(workers or mp.cpu_count(), num_envs))
+        context = mp.get_context()
+        self.num_envs = num_envs
+        self._observation_buffer = context.RawArray('f', num_envs * OBS_SIZE)
+        self._mask_buffer = context.RawArray('b', num_envs * ACTION_COUNT)
+        self.observations = np.frombuffer(self._observation_buffer, dtype=np.float32).reshape(num_envs, OBS_SIZE)
+        self.masks = np.frombuffer(self._mask_buffer, dtype=np.bool_).reshape(num_envs, ACTION_COUNT)
+
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        self._slices = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:])]
+        self._remotes = []
+        self._processes = []
+        for (start, stop), worker_seed in zip(self._slices, spawn_seeds(seed, workers)):
+            remote, worker_remote = context.Pipe()
+            process = context.Process(
+                target=_subprocess_worker,
+                args=(worker_remote, remote, start, stop - start, worker_seed, max_steps, env_kwargs,
+                      self._observation_buffer, self._mask_buffer, num_envs),
+                daemon=True,
+            )
+            process.start()
+            worker_remote.close()
+            self._remotes.append(remote)
+            self._processes.append(process)
+        self.closed = False
+
+    def reset(self, seeds=None):
+        """重置所有环境，返回 (观测, 掩码)（共享内存视图）"""
+        for remote, (start, stop) in zip(self._remotes, self._slices):
+            remote.send(('reset', None if seeds is None else list(seeds[start:stop])))
+        for remote in self._remotes:
+            remote.recv()
+        return self.observations, self.masks
+
+    def step(self, actions):
+        """每个环境执行一个行动，返回 (观测, 奖励, 终止, 截断, 信息列表)"""
+        actions = np.asarray(actions)
+        for remote, (start, stop) in zip(self._remotes, self._slices):
+            remote.send(('step', actions[start:stop]))
+        results = [remote.recv() for remote in self._remotes]
+        rewards = np.concatenate([result[0] for result in results])
+        terminated = np.concatenate([result[1] for result in results])
+        truncated = np.concatenate([result[2] for result in results])
+        infos = [info for result in results for info in result[3]]
+        return self.observations, rewards, terminated, truncated, infos
+
+    def close(self):
+        """关闭子进程"""
+        if self.closed:
+            return
+        for remote in self._remotes:
+            remote.send(('close', None))
+        for process in self._processes:
+            process.join()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
+
+def sample_legal_actions(masks, rng):
+    """为每个环境在合法行动中均匀随机选择一个"""
+    keys = rng.random(masks.shape)
+    keys[~masks] = -1.0
+    return keys.argmax(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure vectorized Regicide environment throughput")
+    parser.add_argument("--envs", type=int, default=64, help="environments stepped per call")
+    parser.add_argument("--steps", type=int, default=300, help="vector steps to run")
+    parser.add_argument("--backend", choices=("sync", "subproc"), default="sync")
+    parser.add_argument("--workers", type=int, default=None, help="subprocess workers (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="RNG seed")
+    args = parser.parse_args()
+
+    if args.backend == "sync":
+        envs = SyncVectorEnv(args.envs, args.seed)
+    else:
+        envs = SubprocVectorEnv(args.envs, args.workers, args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    try:
+        _, masks = envs.reset()
+        episodes = wins = 0
+        start_time = time.perf_counter()
+        for _ in range(args.steps):
+            _, _, _, _, infos = envs.step(sample_legal_actions(masks, rng))
+            for info in infos:
+                if info is not None:
+                    episodes += 1
+                    wins += info['episode']['victory']
+        elapsed = time.perf_counter() - start_time
+    finally:
+        envs.close()
+
+    total_steps = args.envs * args.steps
+    print(f"Backend:           {args.backend} ({args.envs} envs)")
+    print(f"Env steps:         {total_steps} in {elapsed:.2f}s")
+    print(f"Steps/sec:         {total_steps / elapsed:.0f}")
+    print(f"Episodes finished: {episodes} (random agent wins {wins})")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,22 @@ Regicide Game - Complete implementation with image-based cards
 import pygame
 import sys
 import os
+import time
 from game_engine import RegicideGame, GameState
-from card import Card, Suit, Rank
+from card import Card, Suit, Rank, RANK_NAMES, cards_to_ids
+from discard_solver import DiscardObjective
+from game_log import GameLog, ReplayError, ReplayTimeline
 from enemy import Enemy
 from image_card_renderer import ImageCardRenderer
+from text_cache import clear_fonts, get_font, render_text
 import math
 
 # 设置环境变量
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
 
+# 脏矩形间距小于该值时合并为一个区域重绘（每个区域都要完整执行一遍场景绘制）
+MERGE_MARGIN = 32
+
 class Colors:
     """颜色常量"""
     # 背景色
@@ -87,15 +94,15 @@ class FixedCardRenderer:
         
         # 绘制牌面
         font_size = 14 if small else 18
-        font = pygame.font.Font(None, font_size)
+        font = get_font(font_size)
         
         # 牌面文字
         rank_text = self._get_rank_display(card.rank)
-        rank_surface = font.render(rank_text, True, text_color)
+        rank_surface = render_text(font, rank_text, text_color)
         
         # 花色符号
         suit_text = self.suit_symbols[card.suit]
-        suit_surface = font.render(suit_text, True, text_color)
+        suit_surface = render_text(font, suit_text, text_color)
         
         # 位置计算
         rank_x = x + 5
@@ -108,16 +115,16 @@ class FixedCardRenderer:
         
         # 中央大花色符号
         if not small:
-            center_font = pygame.font.Font(None, 32)
-            center_suit = center_font.render(suit_text, True, text_color)
+            center_font = get_font(32)
+            center_suit = render_text(center_font, suit_text, text_color)
             center_x = x + width // 2 - center_suit.get_width() // 2
             center_y = y + height // 2 - center_suit.get_height() // 2
             surface.blit(center_suit, (center_x, center_y))
         
         # A牌宠物标识
         if card.rank == Rank.ACE:
-            pet_font = pygame.font.Font(None, 16)
-            pet_text = pet_font.render("PET", True, Colors.GOLD)
+            pet_font = get_font(16)
+            pet_text = render_text(pet_font, "PET", Colors.GOLD)
             pet_x = x + width // 2 - pet_text.get_width() // 2
             pet_y = y + height - 20
             surface.blit(pet_text, (pet_x, pet_y))
@@ -163,28 +170,28 @@ class FixedCardRenderer:
         pygame.draw.rect(surface, Colors.GOLD, card_rect, 4)
         
         # 绘制敌人信息
-        font_large = pygame.font.Font(None, 28)
-        font_medium = pygame.font.Font(None, 22)
-        font_small = pygame.font.Font(None, 18)
+        font_large = get_font(28)
+        font_medium = get_font(22)
+        font_small = get_font(18)
         
         # 敌人名称
         suit_name = self.suit_symbols[enemy.suit]
         name_text = f"{suit_name} {enemy_name}"
-        name_surface = font_medium.render(name_text, True, Colors.WHITE)
+        name_surface = render_text(font_medium, name_text, Colors.WHITE)
         name_x = x + width // 2 - name_surface.get_width() // 2
         name_y = y + 10
         surface.blit(name_surface, (name_x, name_y))
         
         # 生命值
         health_text = f"{enemy.current_health}/{enemy.max_health}"
-        health_surface = font_large.render(health_text, True, Colors.WHITE)
+        health_surface = render_text(font_large, health_text, Colors.WHITE)
         health_x = x + width // 2 - health_surface.get_width() // 2
         health_y = y + height // 2 - 20
         surface.blit(health_surface, (health_x, health_y))
         
         # 攻击力
         attack_text = f"ATK: {enemy.attack_power}"
-        attack_surface = font_small.render(attack_text, True, Colors.WHITE)
+        attack_surface = render_text(font_small, attack_text, Colors.WHITE)
         attack_x = x + width // 2 - attack_surface.get_width() // 2
         attack_y = y + height - 30
         surface.blit(attack_surface, (attack_x, attack_y))
@@ -218,13 +225,28 @@ class FixedCardRenderer:
         }
         return rank_names[rank]
 
+def merge_rects(rects, margin=MERGE_MARGIN):
+    """合并重叠或间距小于margin的矩形，返回合并后的列表"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = 0
+        while index < len(merged):
+            if rect.inflate(margin, margin).colliderect(merged[index]):
+                rect.union_ip(merged.pop(index))
+                index = 0  # 扩大后可能与之前检查过的矩形相交
+            else:
+                index += 1
+        merged.append(rect)
+    return merged
+
 class Button:
     """按钮类"""
     
     def __init__(self, x, y, width, height, text, font_size=20):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
-        self.font = pygame.font.Font(None, font_size)
+        self.font = get_font(font_size)
         self.hovered = False
         self.clicked = False
         
@@ -248,7 +270,7 @@ class Button:
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, Colors.WHITE, self.rect, 2)
         
-        text_surface = self.font.render(self.text, True, Colors.TEXT_LIGHT)
+        text_surface = render_text(self.font, self.text, Colors.TEXT_LIGHT)
         text_x = self.rect.centerx - text_surface.get_width() // 2
         text_y = self.rect.centery - text_surface.get_height() // 2
         surface.blit(text_surface, (text_x, text_y))
@@ -256,27 +278,40 @@ class Button:
 class RegicideFixedGUI:
     """Regicide修复版GUI - 纯英文界面"""
     
-    def __init__(self, width=1200, height=800):
+    FRAME_RATE = 60              # 帧率上限
+    IDLE_TIMEOUT_MS = 500        # 空闲时最长阻塞等待事件的时间
+    MESSAGE_DURATION_MS = 3000   # 消息显示时间
+    REPLAY_STEP_MS = 600         # 自动回放每个行动的时间
+    
+    def __init__(self, width=1200, height=800, dirty_rects=True):
         pygame.init()
         
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
+        self.screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
         pygame.display.set_caption("Regicide - Card Battle Game")
         
         self.clock = pygame.time.Clock()
         self.running = True
         
-        # 游戏引擎
+        # 游戏引擎（记录事件日志，用于回放）
         self.game = RegicideGame()
+        self.game_log = GameLog()
+        self.game.attach_log(self.game_log)
+        
+        # 回放模式：replay为ReplayTimeline，回放期间self.game指向回放用的游戏对象
+        self.replay = None
+        self.live_game = None
+        self.scrubbing = False
+        self.autoplay_since = None  # 自动回放时当前行动开始的时刻（毫秒），暂停时为None
         
         # 渲染器 - 使用图像渲染器
         self.card_renderer = ImageCardRenderer()
         
         # 字体（使用默认字体避免问题）
-        self.font_large = pygame.font.Font(None, 36)
-        self.font_medium = pygame.font.Font(None, 24)
-        self.font_small = pygame.font.Font(None, 18)
+        self.font_large = get_font(36)
+        self.font_medium = get_font(24)
+        self.font_small = get_font(18)
         
         # UI状态
         self.selected_cards = []
@@ -287,12 +322,24 @@ class RegicideFixedGUI:
             'new_game': Button(50, 50, 100, 35, "New Game"),
             'play_cards': Button(width - 150, height - 60, 100, 35, "Play Cards"),
             'confirm_discard': Button(width - 150, height - 100, 120, 35, "Confirm Discard"),
+            'suggest_discard': Button(width - 280, height - 100, 120, 35, "Suggest Discard"),
+            'replay': Button(160, 50, 80, 35, "Replay"),
             'quit': Button(50, 20, 50, 25, "Quit", 16)  # 移到左上角
         }
         
+        # 回放控制按钮（只在回放模式下显示和响应）
+        self.replay_buttons = {
+            'exit_replay': Button(50, 95, 100, 30, "Exit Replay", 18),
+            'replay_start': Button(160, 95, 40, 30, "<<", 18),
+            'replay_back': Button(205, 95, 40, 30, "<", 18),
+            'replay_forward': Button(250, 95, 40, 30, ">", 18),
+            'replay_end': Button(295, 95, 40, 30, ">>", 18),
+            'replay_auto': Button(340, 95, 60, 30, "Auto", 18),
+        }
+        
         # 消息显示
         self.messages = []
-        self.message_timer = 0
+        self.message_expires = 0  # 消息到期时刻（pygame.time.get_ticks() 毫秒）
         
         # 花色能力说明
         self.suit_abilities = {
@@ -306,29 +353,195 @@ class RegicideFixedGUI:
         self.hand_scroll_offset = 0  # 手牌滚动偏移量
         self.max_visible_cards = 12  # 屏幕最多显示的手牌数量
         self.card_spacing = 105      # 卡牌间距（适应更大的卡牌）
+        
+        # 静态图层（背景渐变、花色说明、牌堆面板、手牌区域边框），窗口大小改变时重建
+        self.build_static_layers()
+        
+        # 脏矩形渲染：记录上一帧各区域的签名，只重绘签名变化的区域（F2切换为全屏重绘以对比CPU占用）
+        self.dirty_rects = dirty_rects
+        self.screen_signature = None
+        self.region_signatures = {}
+        self.render_stats = {'full_frames': 0, 'partial_frames': 0, 'unchanged_frames': 0, 'updated_pixels': 0}
+        self.cpu_sample = (time.perf_counter(), time.process_time(), 0.0)
+        self.cpu_usage = 0.0
+        
+        # 自适应帧调度：没有动画时阻塞等待事件，不再以固定60Hz空转
+        self.frame_stats = {'frames': 0, 'idle_waits': 0, 'frames_skipped': 0, 'idle_time': 0.0}
+    
+    def build_static_layers(self):
+        """预先绘制每帧都不变的图层（背景、面板边框、覆盖层），绘制时每层只需一次blit"""
+        self.background_layer = pygame.Surface((self.width, self.height)).convert()
+        for y in range(self.height):
+            ratio = y / self.height
+            r = int(Colors.DARK_BLUE[0] + (Colors.NAVY[0] - Colors.DARK_BLUE[0]) * ratio)
+            g = int(Colors.DARK_BLUE[1] + (Colors.NAVY[1] - Colors.DARK_BLUE[1]) * ratio)
+            b = int(Colors.DARK_BLUE[2] + (Colors.NAVY[2] - Colors.DARK_BLUE[2]) * ratio)
+            pygame.draw.line(self.background_layer, (r, g, b), (0, y), (self.width, y))
+        
+        # 花色说明面板
+        self.suit_guide_layer = pygame.Surface((330, 120)).convert()
+        self.suit_guide_layer.fill(Colors.NAVY)
+        pygame.draw.rect(self.suit_guide_layer, Colors.WHITE, self.suit_guide_layer.get_rect(), 1)
+        title_text = render_text(self.font_small, "Suit Abilities:", Colors.GOLD)
+        self.suit_guide_layer.blit(title_text, (10, 10))
+        abilities = [
+            "H (Hearts): Heal cards from discard",
+            "D (Diamonds): Draw more cards",
+            "S (Spades): Weaken enemy attack",
+            "C (Clubs): Double damage"
+        ]
+        for i, ability in enumerate(abilities):
+            ability_text = render_text(self.font_small, ability, Colors.WHITE)
+            self.suit_guide_layer.blit(ability_text, (10, 30 + i * 18))
+        
+        # 牌堆面板边框和标题
+        self.deck_panel_layer = pygame.Surface((120, 150)).convert()
+        self.deck_panel_layer.fill((30, 30, 60))
+        pygame.draw.rect(self.deck_panel_layer, Colors.WHITE, self.deck_panel_layer.get_rect(), 2)
+        title_text = render_text(self.font_small, "Deck", Colors.WHITE)
+        self.deck_panel_layer.blit(title_text, (60 - title_text.get_width() // 2, 10))
+        
+        # 手牌区域背景和边框
+        self.hand_area_rect = pygame.Rect(60, self.height - 190, self.width - 120, 170)
+        self.hand_frame_layer = pygame.Surface(self.hand_area_rect.size).convert()
+        self.hand_frame_layer.fill((40, 40, 80))
+        pygame.draw.rect(self.hand_frame_layer, Colors.WHITE, self.hand_frame_layer.get_rect(), 2)
+        
+        # 弃牌选择时的半透明覆盖层
+        self.discard_overlay_layer = pygame.Surface((self.width, self.height)).convert()
+        self.discard_overlay_layer.fill(Colors.BLACK)
+        self.discard_overlay_layer.set_alpha(128)
+        
+        # 动态区域的范围：脏矩形跟踪和绘制时的裁剪判断共用
+        renderer = self.card_renderer
+        self.region_rects = {
+            'enemy': pygame.Rect(self.width // 2 - 60, 100, renderer.enemy_card_width, renderer.enemy_card_height),
+            'hand': pygame.Rect(0, self.height - 190, self.width, 190),
+            'game_info': pygame.Rect(40, 140, 260, 185),
+            'deck': pygame.Rect(self.width - 150, 20, 120, 150),
+            'play_preview': pygame.Rect(self.width - 310, 330, 280, 150),
+            'discard_prompt': pygame.Rect(0, 140, self.width, 100),
+            'messages': pygame.Rect(0, self.height - 300, self.width, 110),
+            'replay_scrub': pygame.Rect(40, self.height - 250, self.width - 80, 45),
+        }
+    
+    def handle_resize(self, width, height):
+        """窗口大小改变：重新定位靠右下的按钮，重建静态图层和卡牌纹理缓存"""
+        self.width = width
+        self.height = height
+        self.screen = pygame.display.get_surface()
+        self.buttons['play_cards'].rect.topleft = (width - 150, height - 60)
+        self.buttons['confirm_discard'].rect.topleft = (width - 150, height - 100)
+        self.buttons['suggest_discard'].rect.topleft = (width - 280, height - 100)
+        self.build_static_layers()
+        self.card_renderer.clear_texture_cache()
+        self.screen_signature = None
+    
+    def toggle_render_mode(self):
+        """在脏矩形渲染和全屏重绘之间切换"""
+        self.dirty_rects = not self.dirty_rects
+        self.screen_signature = None
+        for key in self.render_stats:
+            self.render_stats[key] = 0
+        self.add_message(f"Render mode: {self.render_mode_name()}")
+    
+    def render_mode_name(self):
+        """当前渲染模式的名称"""
+        return "dirty rects" if self.dirty_rects else "full redraw"
+    
+    def update_cpu_meter(self):
+        """每秒统计一次进程CPU占用和空闲比例，显示在窗口标题中（用于对比渲染模式）"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        idle_time = self.frame_stats['idle_time']
+        last_wall, last_cpu, last_idle = self.cpu_sample
+        if wall - last_wall < 1.0:
+            return
+        self.cpu_usage = (cpu - last_cpu) / (wall - last_wall)
+        idle_ratio = (idle_time - last_idle) / (wall - last_wall)
+        self.cpu_sample = (wall, cpu, idle_time)
+        pygame.display.set_caption(f"Regicide - Card Battle Game [{self.render_mode_name()}, "
+                                   f"CPU {self.cpu_usage:.0%}, idle {idle_ratio:.0%}]")
+    
+    def idle_timeout(self):
+        """
+        距离画面下一次需要随时间变化还有多少毫秒，在此之前没有输入就可以一直阻塞等待。
+        显示中的消息不会变化，只在到期时重绘一次；有动画时返回0（以完整帧率运行）。
+        """
+        if self.animation_active():
+            return 0
+        timeout = self.IDLE_TIMEOUT_MS
+        if self.messages:
+            timeout = min(timeout, max(0, self.message_expires - pygame.time.get_ticks()))
+        return timeout
+    
+    def animation_active(self):
+        """是否有随时间连续变化的画面（目前只有自动回放时移动的进度条）"""
+        return self.replay is not None and self.autoplay_since is not None
+    
+    def wait_for_events(self, timeout):
+        """阻塞等待事件（最多timeout毫秒），返回事件列表（超时为空列表）；等待时间计入 idle_time"""
+        if timeout <= 0:
+            return pygame.event.get()
+        start = time.perf_counter()
+        event = pygame.event.wait(timeout)
+        self.frame_stats['idle_waits'] += 1
+        self.frame_stats['idle_time'] += time.perf_counter() - start
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
     
     def run(self):
-        """运行游戏主循环"""
+        """运行游戏主循环：等待输入事件或下一次定时变化，不再以固定帧率空转"""
+        last_frame = time.perf_counter()
         while self.running:
-            self.handle_events()
+            events = self.wait_for_events(self.idle_timeout())
+            self.handle_events(events)
             self.update()
             self.draw()
-            self.clock.tick(60)
-        
+            
+            # 固定帧率的循环在这两帧之间还会绘制的帧数（按实际经过的时间计算）
+            now = time.perf_counter()
+            self.frame_stats['frames'] += 1
+            self.frame_stats['frames_skipped'] += max(0, int((now - last_frame) * self.FRAME_RATE) - 1)
+            last_frame = now
+            self.update_cpu_meter()
+            self.clock.tick(self.FRAME_RATE)
+        
+        clear_fonts()  # Font对象在pygame.quit()之后失效
         pygame.quit()
         sys.exit()
     
-    def handle_events(self):
-        """处理事件"""
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        """处理事件（events为None时取出事件队列中的所有事件）"""
+        if events is None:
+            events = pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
             
+            elif event.type == pygame.VIDEORESIZE:
+                self.handle_resize(event.w, event.h)
+            
+            # 窗口被遮挡后重新显示：屏幕内容需要完整重绘
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.screen_signature = None
+            
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                self.toggle_render_mode()
+            
             # 鼠标滚轮事件 - 滚动手牌
             elif event.type == pygame.MOUSEWHEEL:
                 if self.game.game_state == GameState.PLAYING:
                     self.handle_hand_scroll(event.y)
             
+            # 回放模式：只响应回放控制、退出和新游戏
+            if self.replay is not None:
+                self.handle_replay_event(event)
+                for button_name in ('new_game', 'quit'):
+                    if self.buttons[button_name].handle_event(event):
+                        self.handle_button_click(button_name)
+                continue
+            
             # 按钮事件
             for button_name, button in self.buttons.items():
                 if button.handle_event(event):
@@ -340,7 +553,13 @@ class RegicideFixedGUI:
     
     def handle_button_click(self, button_name):
         """处理按钮点击"""
+        if self.replay is not None and button_name not in ('new_game', 'quit'):
+            return  # 回放中不能操作回放用的游戏
+        
         if button_name == 'new_game':
+            if self.replay is not None:
+                self.exit_replay()
+            self.game_log.clear()
             self.game.start_new_game()
             self.selected_cards.clear()
             self.hand_scroll_offset = 0  # 重置滚动偏移
@@ -367,9 +586,123 @@ class RegicideFixedGUI:
                     required = self.game.required_discard_value
                     self.add_message(f"Need {required} points, selected {current_value}")
                     
+        elif button_name == 'suggest_discard':
+            if self.game.game_state == GameState.DISCARD_SELECTION:
+                suggestion = self.game.suggest_discard(DiscardObjective.KEEP_COMBOS)
+                if suggestion is not None:
+                    self.game.selected_for_discard = list(suggestion)
+                    cards_text = " ".join(self.card_text(card) for card in suggestion)
+                    self.add_message(f"Suggested: {cards_text}")
+                else:
+                    self.add_message("No discard can cover the damage")
+                    
+        elif button_name == 'replay':
+            if not self.game_log:
+                self.add_message("Nothing to replay yet")
+            else:
+                self.start_replay(ReplayTimeline(self.game_log.events()))
+                    
         elif button_name == 'quit':
             self.running = False
     
+    @staticmethod
+    def card_text(card):
+        """界面字体可显示的短牌名，如 10H"""
+        return f"{RANK_NAMES[card.rank]}{card.suit.name[0]}"
+    
+    def start_replay(self, timeline):
+        """进入回放模式（从开局开始）"""
+        self.replay = timeline
+        self.live_game = self.game
+        self.game = timeline.seek(0)
+        self.selected_cards.clear()
+        self.hand_scroll_offset = 0
+        self.messages.clear()
+        self.autoplay_since = None
+    
+    def exit_replay(self):
+        """退出回放模式，回到正在进行的游戏"""
+        self.game = self.live_game
+        self.replay = None
+        self.live_game = None
+        self.scrubbing = False
+        self.autoplay_since = None
+        self.card_rects.clear()
+        self.adjust_scroll_position()
+    
+    def seek_replay(self, position):
+        """回放跳转：恢复最近的关键帧并重放少量行动"""
+        self.game = self.replay.seek(position)
+        self.adjust_scroll_position()
+        if self.autoplay_since is not None:
+            self.autoplay_since = pygame.time.get_ticks()
+    
+    def toggle_autoplay(self):
+        """开始或暂停自动回放；已在末尾时从头开始"""
+        if self.autoplay_since is not None:
+            self.autoplay_since = None
+            return
+        if self.replay.position >= len(self.replay):
+            self.seek_replay(0)
+        self.autoplay_since = pygame.time.get_ticks()
+    
+    def replay_progress(self):
+        """回放进度（行动数，自动回放时包含当前行动已经过的比例）"""
+        position = self.replay.position
+        if self.autoplay_since is not None:
+            elapsed = pygame.time.get_ticks() - self.autoplay_since
+            position += min(1.0, elapsed / self.REPLAY_STEP_MS)
+        return position
+    
+    def replay_scrub_rect(self):
+        """回放进度条区域（手牌区域上方）"""
+        return pygame.Rect(60, self.height - 225, self.width - 120, 10)
+    
+    def handle_replay_event(self, event):
+        """处理回放模式下的键盘、按钮和进度条拖动"""
+        if event.type == pygame.KEYDOWN:
+            steps = {pygame.K_LEFT: -1, pygame.K_RIGHT: 1, pygame.K_PAGEUP: -10, pygame.K_PAGEDOWN: 10}
+            if event.key in steps:
+                self.seek_replay(self.replay.position + steps[event.key])
+            elif event.key == pygame.K_HOME:
+                self.seek_replay(0)
+            elif event.key == pygame.K_END:
+                self.seek_replay(len(self.replay))
+            elif event.key == pygame.K_SPACE:
+                self.toggle_autoplay()
+            elif event.key == pygame.K_ESCAPE:
+                self.exit_replay()
+            return
+        
+        for button_name, button in self.replay_buttons.items():
+            if button.handle_event(event):
+                if button_name == 'exit_replay':
+                    self.exit_replay()
+                    return
+                if button_name == 'replay_auto':
+                    self.toggle_autoplay()
+                    return
+                targets = {
+                    'replay_start': 0,
+                    'replay_back': self.replay.position - 1,
+                    'replay_forward': self.replay.position + 1,
+                    'replay_end': len(self.replay),
+                }
+                self.seek_replay(targets[button_name])
+                return
+        
+        # 进度条：点击或拖动跳转到对应位置
+        scrub_rect = self.replay_scrub_rect()
+        if event.type == pygame.MOUSEBUTTONDOWN and scrub_rect.inflate(0, 16).collidepoint(event.pos):
+            self.scrubbing = True
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.scrubbing = False
+        if self.scrubbing and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+            ratio = (event.pos[0] - scrub_rect.x) / scrub_rect.width
+            position = round(max(0.0, min(1.0, ratio)) * len(self.replay))
+            if position != self.replay.position:
+                self.seek_replay(position)
+    
     def handle_hand_scroll(self, scroll_y):
         """处理手牌滚动"""
         hand = self.game.get_current_player_hand()
@@ -440,7 +773,7 @@ class RegicideFixedGUI:
     def add_message(self, text):
         """添加消息"""
         self.messages.append(text)
-        self.message_timer = 180  # 3秒显示时间
+        self.message_expires = pygame.time.get_ticks() + self.MESSAGE_DURATION_MS
         
         # 只保留最近5条消息
         if len(self.messages) > 5:
@@ -487,18 +820,102 @@ class RegicideFixedGUI:
             return message
     
     def update(self):
-        """更新游戏状态"""
-        if self.message_timer > 0:
-            self.message_timer -= 1
-            if self.message_timer <= 0:
-                self.messages.clear()
+        """更新游戏状态：消息到期后清除，自动回放到时前进一个行动"""
+        now = pygame.time.get_ticks()
+        if self.messages and now >= self.message_expires:
+            self.messages.clear()
+        if self.animation_active() and now - self.autoplay_since >= self.REPLAY_STEP_MS:
+            self.seek_replay(self.replay.position + 1)
+            if self.replay.position >= len(self.replay):
+                self.autoplay_since = None
     
     def draw(self):
-        """绘制游戏画面"""
+        """绘制并显示一帧：脏矩形模式下只重绘和更新变化的区域，否则全屏重绘"""
+        if not self.dirty_rects:
+            self.draw_scene()
+            pygame.display.flip()
+            self.render_stats['full_frames'] += 1
+            self.render_stats['updated_pixels'] += self.width * self.height
+            return
+        
+        screen_signature, regions = self.screen_regions()
+        previous = self.region_signatures
+        self.region_signatures = {name: signature for name, (rect, signature) in regions.items()}
+        
+        # 界面切换、窗口变化或回放跳转：整屏重绘
+        if screen_signature != self.screen_signature:
+            self.screen_signature = screen_signature
+            self.draw_scene()
+            pygame.display.flip()
+            self.render_stats['full_frames'] += 1
+            self.render_stats['updated_pixels'] += self.width * self.height
+            return
+        
+        dirty = [rect for name, (rect, signature) in regions.items() if previous.get(name) != signature]
+        if not dirty:
+            self.render_stats['unchanged_frames'] += 1
+            return
+        
+        # 相邻或重叠的区域先合并，然后对每个区域分别裁剪并重绘整个场景：
+        # 区域重叠（覆盖层、面板）时结果与全屏重绘相同，相距很远的区域也不会扩大成覆盖大半窗口的并集
+        dirty = merge_rects(dirty)
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.draw_scene()
+        self.screen.set_clip(None)
+        pygame.display.update(dirty)
+        self.render_stats['partial_frames'] += 1
+        self.render_stats['updated_pixels'] += sum(rect.width * rect.height for rect in dirty)
+    
+    def screen_regions(self):
+        """
+        返回 (整屏签名, {区域名: (矩形, 签名)})。
+        整屏签名变化时需要全屏重绘；区域签名变化时只需重绘该区域。
+        签名只取绘制该区域所用的状态，每帧计算的代价很小。
+        """
+        game = self.game
+        replay_position = self.replay.position if self.replay is not None else None
+        screen_signature = (game.game_state, replay_position, self.width, self.height)
+        
+        enemy_queue = game.enemy_queue
+        enemy_signature = enemy_queue.zobrist
+        deck_signature = (game.deck.cards_left(), len(game.discard_pile))
+        hand = game.get_current_player_hand()
+        selected = cards_to_ids(self.selected_cards)
+        selected_for_discard = cards_to_ids(game.selected_for_discard)
+        rects = self.region_rects
+        
+        regions = {
+            'enemy': (rects['enemy'], enemy_signature),
+            'hand': (rects['hand'], (cards_to_ids(hand.cards), selected, selected_for_discard, self.hand_scroll_offset)),
+            'game_info': (rects['game_info'], (enemy_signature, deck_signature, hand.size(), game.turn_count)),
+            'deck': (rects['deck'], deck_signature),
+            'play_preview': (rects['play_preview'], (selected, enemy_signature)),
+            'discard_prompt': (rects['discard_prompt'], (selected_for_discard, game.required_discard_value)),
+            'messages': (rects['messages'], tuple(self.messages)),
+        }
+        for name, button in self.buttons.items():
+            regions['button_' + name] = (button.rect, button.hovered)
+        for name, button in self.replay_buttons.items():
+            regions['replay_' + name] = (button.rect, button.hovered)
+        if self.replay is not None:
+            regions['replay_scrub'] = (rects['replay_scrub'], self.replay_knob_x())
+        return screen_signature, regions
+    
+    def in_clip(self, rect):
+        """矩形是否与当前裁剪区域相交（脏矩形重绘时跳过裁剪区域外的元素）"""
+        return self.screen.get_clip().colliderect(rect)
+    
+    def draw_scene(self):
+        """绘制整个场景（不更新显示）；只绘制与裁剪区域相交的动态元素"""
         # 渐变背景
         self.draw_gradient_background()
         
-        if self.game.game_state == GameState.MENU:
+        if self.replay is not None:
+            # 回放模式复用游戏界面的绘制
+            self.draw_game()
+            self.draw_replay_controls()
+        elif self.game.game_state == GameState.MENU:
             self.draw_menu()
         elif self.game.game_state in [GameState.PLAYING, GameState.PLAYER_TURN]:
             self.draw_game()
@@ -517,28 +934,21 @@ class RegicideFixedGUI:
         
         # 绘制花色说明
         self.draw_suit_guide()
-        
-        pygame.display.flip()
     
     def draw_gradient_background(self):
-        """绘制渐变背景"""
-        for y in range(self.height):
-            ratio = y / self.height
-            r = int(Colors.DARK_BLUE[0] + (Colors.NAVY[0] - Colors.DARK_BLUE[0]) * ratio)
-            g = int(Colors.DARK_BLUE[1] + (Colors.NAVY[1] - Colors.DARK_BLUE[1]) * ratio)
-            b = int(Colors.DARK_BLUE[2] + (Colors.NAVY[2] - Colors.DARK_BLUE[2]) * ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.width, y))
+        """绘制渐变背景（预先绘制的图层）"""
+        self.screen.blit(self.background_layer, (0, 0))
     
     def draw_menu(self):
         """绘制菜单界面"""
         # 标题
-        title_text = self.font_large.render("REGICIDE", True, Colors.GOLD)
+        title_text = render_text(self.font_large, "REGICIDE", Colors.GOLD)
         title_x = self.width // 2 - title_text.get_width() // 2
         title_y = self.height // 2 - 100
         self.screen.blit(title_text, (title_x, title_y))
         
         # 副标题
-        subtitle_text = self.font_medium.render("Card Battle Game", True, Colors.WHITE)
+        subtitle_text = render_text(self.font_medium, "Card Battle Game", Colors.WHITE)
         subtitle_x = self.width // 2 - subtitle_text.get_width() // 2
         subtitle_y = title_y + 60
         self.screen.blit(subtitle_text, (subtitle_x, subtitle_y))
@@ -552,7 +962,7 @@ class RegicideFixedGUI:
         ]
         
         for i, rule in enumerate(rules):
-            rule_text = self.font_small.render(rule, True, Colors.TEXT_LIGHT)
+            rule_text = render_text(self.font_small, rule, Colors.TEXT_LIGHT)
             rule_x = self.width // 2 - rule_text.get_width() // 2
             rule_y = subtitle_y + 80 + i * 25
             self.screen.blit(rule_text, (rule_x, rule_y))
@@ -561,24 +971,27 @@ class RegicideFixedGUI:
         """绘制游戏界面"""
         game_info = self.game.get_game_state_info()
         hand_info = self.game.get_hand_info()
+        rects = self.region_rects
         
         # 绘制当前敌人
-        if game_info['current_enemy']:
-            enemy_x = self.width // 2 - 60
-            enemy_y = 100
+        if game_info['current_enemy'] and self.in_clip(rects['enemy']):
+            enemy_x, enemy_y = rects['enemy'].topleft
             self.card_renderer.draw_enemy_card(self.screen, game_info['current_enemy'], enemy_x, enemy_y)
         
-        # 绘制手牌
-        self.draw_hand(hand_info['cards'])
+        # 绘制手牌（跳过时保留上次的卡牌点击区域，手牌不变时它们仍然有效）
+        if self.in_clip(rects['hand']):
+            self.draw_hand(hand_info['cards'])
         
         # 绘制游戏信息
-        self.draw_game_info(game_info, hand_info)
+        if self.in_clip(rects['game_info']):
+            self.draw_game_info(game_info, hand_info)
         
         # 绘制牌堆
-        self.draw_deck_display()
+        if self.in_clip(rects['deck']):
+            self.draw_deck_display()
         
         # 绘制选中卡牌的效果预览
-        if self.selected_cards:
+        if self.selected_cards and self.in_clip(rects['play_preview']):
             self.draw_play_preview()
     
     def draw_hand(self, cards):
@@ -595,14 +1008,12 @@ class RegicideFixedGUI:
         visible_cards = cards[start_index:end_index]
 
         # 手牌区域定位
-        hand_area_margin = 60
-        hand_area_y = self.height - 190
-        hand_area_height = 170
-        hand_area_rect = pygame.Rect(hand_area_margin, hand_area_y, self.width - 2 * hand_area_margin, hand_area_height)
+        hand_area_rect = self.hand_area_rect
+        hand_area_y = hand_area_rect.y
+        hand_area_height = hand_area_rect.height
 
-        # 绘制手牌区域背景
-        pygame.draw.rect(self.screen, (40, 40, 80, 100), hand_area_rect)
-        pygame.draw.rect(self.screen, Colors.WHITE, hand_area_rect, 2)
+        # 绘制手牌区域背景和边框（预先绘制的图层）
+        self.screen.blit(self.hand_frame_layer, hand_area_rect.topleft)
 
         # 计算可见手牌布局
         if visible_cards:
@@ -662,7 +1073,7 @@ class RegicideFixedGUI:
                 (left_arrow_pos[0] + 15, left_arrow_pos[1] + 8)
             ])
             # 显示左侧隐藏的牌数
-            left_text = self.font_small.render(f"<{self.hand_scroll_offset}", True, Colors.WHITE)
+            left_text = render_text(self.font_small, f"<{self.hand_scroll_offset}", Colors.WHITE)
             self.screen.blit(left_text, (left_arrow_pos[0] + 20, left_arrow_pos[1] - 8))
 
         # 右滚动箭头
@@ -676,20 +1087,20 @@ class RegicideFixedGUI:
             ])
             # 显示右侧隐藏的牌数
             hidden_right = total_cards - (self.hand_scroll_offset + self.max_visible_cards)
-            right_text = self.font_small.render(f"{hidden_right}>", True, Colors.WHITE)
+            right_text = render_text(self.font_small, f"{hidden_right}>", Colors.WHITE)
             text_rect = right_text.get_rect()
             self.screen.blit(right_text, (right_arrow_pos[0] - text_rect.width - 20, right_arrow_pos[1] - 8))
 
         # 滚动状态文字
         status_text = f"Cards {self.hand_scroll_offset + 1}-{min(self.hand_scroll_offset + self.max_visible_cards, total_cards)} of {total_cards}"
-        status_surface = self.font_small.render(status_text, True, Colors.TEXT_LIGHT)
+        status_surface = render_text(self.font_small, status_text, Colors.TEXT_LIGHT)
         status_rect = status_surface.get_rect()
         status_x = (self.width - status_rect.width) // 2
         self.screen.blit(status_surface, (status_x, indicator_y - 20))
 
         # 滚动说明文字
         scroll_help = "Use mouse wheel to scroll through hand cards"
-        help_surface = self.font_small.render(scroll_help, True, Colors.TEXT_LIGHT)
+        help_surface = render_text(self.font_small, scroll_help, Colors.TEXT_LIGHT)
         help_rect = help_surface.get_rect()
         help_x = (self.width - help_rect.width) // 2
         self.screen.blit(help_surface, (help_x, indicator_y + 15))
@@ -713,7 +1124,7 @@ class RegicideFixedGUI:
         ]
         
         for i, info in enumerate(infos):
-            info_text = self.font_small.render(info, True, Colors.TEXT_LIGHT)
+            info_text = render_text(self.font_small, info, Colors.TEXT_LIGHT)
             self.screen.blit(info_text, (info_x, info_y + i * 25))
     
     def _translate_phase(self, phase):
@@ -753,6 +1164,9 @@ class RegicideFixedGUI:
         if effectiveness['combo_bonus'] > 0:
             preview_info.append(f"Combo Bonus: +{effectiveness['combo_bonus']}")
         
+        if effectiveness['attack_reduction'] > 0:
+            preview_info.append(f"Spades: Enemy attack -{effectiveness['attack_reduction']}")
+        
         if effectiveness['will_defeat_enemy']:
             preview_info.append("Will defeat enemy!")
         
@@ -761,44 +1175,43 @@ class RegicideFixedGUI:
             if "Will defeat" in info:
                 color = Colors.LIGHT_GREEN
                 
-            info_text = self.font_small.render(info, True, color)
+            info_text = render_text(self.font_small, info, color)
             self.screen.blit(info_text, (preview_x, preview_y + i * 20))
     
     def draw_victory(self):
         """绘制胜利界面"""
-        victory_text = self.font_large.render("VICTORY!", True, Colors.GOLD)
+        victory_text = render_text(self.font_large, "VICTORY!", Colors.GOLD)
         victory_x = self.width // 2 - victory_text.get_width() // 2
         victory_y = self.height // 2 - 50
         self.screen.blit(victory_text, (victory_x, victory_y))
         
-        subtitle_text = self.font_medium.render("All enemies defeated!", True, Colors.WHITE)
+        subtitle_text = render_text(self.font_medium, "All enemies defeated!", Colors.WHITE)
         subtitle_x = self.width // 2 - subtitle_text.get_width() // 2
         subtitle_y = victory_y + 60
         self.screen.blit(subtitle_text, (subtitle_x, subtitle_y))
     
     def draw_defeat(self):
         """绘制失败界面"""
-        defeat_text = self.font_large.render("DEFEAT", True, Colors.RED)
+        defeat_text = render_text(self.font_large, "DEFEAT", Colors.RED)
         defeat_x = self.width // 2 - defeat_text.get_width() // 2
         defeat_y = self.height // 2 - 50
         self.screen.blit(defeat_text, (defeat_x, defeat_y))
         
-        subtitle_text = self.font_medium.render("Not enough cards to continue...", True, Colors.WHITE)
+        subtitle_text = render_text(self.font_medium, "Not enough cards to continue...", Colors.WHITE)
         subtitle_x = self.width // 2 - subtitle_text.get_width() // 2
         subtitle_y = defeat_y + 60
         self.screen.blit(subtitle_text, (subtitle_x, subtitle_y))
     
     def draw_messages(self):
         """绘制消息"""
-        if not self.messages:
+        if not self.messages or not self.in_clip(self.region_rects['messages']):
             return
         
         message_x = 50
         message_y = self.height - 300
         
         for i, message in enumerate(self.messages):
-            alpha = min(255, self.message_timer * 2)  # 淡出效果
-            message_text = self.font_small.render(message, True, Colors.WHITE)
+            message_text = render_text(self.font_small, message, Colors.WHITE)
             self.screen.blit(message_text, (message_x, message_y + i * 20))
     
     def draw_suit_guide(self):
@@ -806,37 +1219,58 @@ class RegicideFixedGUI:
         guide_x = self.width - 350
         guide_y = 180
         
-        # 背景
-        guide_bg = pygame.Rect(guide_x - 10, guide_y - 10, 330, 120)
-        pygame.draw.rect(self.screen, Colors.NAVY, guide_bg)
-        pygame.draw.rect(self.screen, Colors.WHITE, guide_bg, 1)
-        
-        # 标题
-        title_text = self.font_small.render("Suit Abilities:", True, Colors.GOLD)
-        self.screen.blit(title_text, (guide_x, guide_y))
-        
-        # 花色说明
-        abilities = [
-            "H (Hearts): Heal cards from discard",
-            "D (Diamonds): Draw more cards",
-            "S (Spades): Weaken enemy attack",
-            "C (Clubs): Double damage"
-        ]
-        
-        for i, ability in enumerate(abilities):
-            ability_text = self.font_small.render(ability, True, Colors.WHITE)
-            self.screen.blit(ability_text, (guide_x, guide_y + 20 + i * 18))
+        # 背景、标题和说明都在预先绘制的图层中
+        self.screen.blit(self.suit_guide_layer, (guide_x - 10, guide_y - 10))
+    
+    def draw_replay_controls(self):
+        """绘制回放进度条、关键帧刻度和当前行动说明"""
+        replay = self.replay
+        scrub_rect = self.replay_scrub_rect()
+        total = max(1, len(replay))
+        
+        pygame.draw.rect(self.screen, Colors.NAVY, scrub_rect)
+        filled = scrub_rect.copy()
+        filled.width = scrub_rect.width * replay.position // total
+        pygame.draw.rect(self.screen, Colors.GOLD, filled)
+        pygame.draw.rect(self.screen, Colors.WHITE, scrub_rect, 1)
+        
+        # 关键帧刻度
+        for keyframe in range(0, len(replay) + 1, replay.interval):
+            tick_x = scrub_rect.x + scrub_rect.width * keyframe // total
+            pygame.draw.line(self.screen, Colors.SILVER, (tick_x, scrub_rect.bottom), (tick_x, scrub_rect.bottom + 4))
+        
+        pygame.draw.circle(self.screen, Colors.WHITE, (self.replay_knob_x(), scrub_rect.centery), 8)
+        
+        label = f"Replay {replay.position}/{len(replay)}: {replay.describe(self.card_text)}"
+        if self.game.game_state == GameState.DISCARD_SELECTION:
+            label += f"  (must discard {self.game.required_discard_value})"
+        elif self.game.game_state in (GameState.VICTORY, GameState.DEFEAT):
+            label += f"  [{self.game.game_state.name.title()}]"
+        label_surface = render_text(self.font_small, label, Colors.TEXT_LIGHT)
+        self.screen.blit(label_surface, (scrub_rect.x, scrub_rect.y - 22))
+    
+    def replay_knob_x(self):
+        """回放进度条滑块的横坐标（自动回放时在两个行动之间平滑移动）"""
+        scrub_rect = self.replay_scrub_rect()
+        return scrub_rect.x + int(scrub_rect.width * self.replay_progress() / max(1, len(self.replay)))
     
     def draw_buttons(self):
         """根据游戏状态绘制相应按钮"""
-        if self.game.game_state == GameState.DISCARD_SELECTION:
-            # 弃牌选择模式只显示确认按钮和退出按钮
+        if self.replay is not None:
+            # 回放模式显示回放控制、新游戏和退出按钮
+            for button in self.replay_buttons.values():
+                button.draw(self.screen)
+            self.buttons['new_game'].draw(self.screen)
+            self.buttons['quit'].draw(self.screen)
+        elif self.game.game_state == GameState.DISCARD_SELECTION:
+            # 弃牌选择模式只显示确认、建议和退出按钮
             self.buttons['confirm_discard'].draw(self.screen)
+            self.buttons['suggest_discard'].draw(self.screen)
             self.buttons['quit'].draw(self.screen)
         else:
-            # 其他状态显示所有按钮（除了弃牌确认按钮）
+            # 其他状态显示所有按钮（除了弃牌相关按钮）
             for name, button in self.buttons.items():
-                if name != 'confirm_discard':
+                if name not in ('confirm_discard', 'suggest_discard'):
                     button.draw(self.screen)
     
     def draw_discard_selection(self):
@@ -845,13 +1279,10 @@ class RegicideFixedGUI:
         self.draw_game()
         
         # 半透明覆盖层
-        overlay = pygame.Surface((self.width, self.height))
-        overlay.set_alpha(128)
-        overlay.fill(Colors.BLACK)
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.discard_overlay_layer, (0, 0))
         
         # 弃牌选择提示
-        title_text = self.font_large.render("Select Cards to Discard", True, Colors.WHITE)
+        title_text = render_text(self.font_large, "Select Cards to Discard", Colors.WHITE)
         title_x = self.width // 2 - title_text.get_width() // 2
         self.screen.blit(title_text, (title_x, 150))
         
@@ -860,13 +1291,13 @@ class RegicideFixedGUI:
         required = self.game.required_discard_value
         info_text = f"Required: {required} points | Selected: {current_value} points"
         
-        info_surface = self.font_medium.render(info_text, True, Colors.WHITE)
+        info_surface = render_text(self.font_medium, info_text, Colors.WHITE)
         info_x = self.width // 2 - info_surface.get_width() // 2
         self.screen.blit(info_surface, (info_x, 190))
         
         # 提示文字
         hint_text = "Click cards to select/deselect them for discard"
-        hint_surface = self.font_small.render(hint_text, True, Colors.SILVER)
+        hint_surface = render_text(self.font_small, hint_text, Colors.SILVER)
         hint_x = self.width // 2 - hint_surface.get_width() // 2
         self.screen.blit(hint_surface, (hint_x, 220))
     
@@ -876,15 +1307,8 @@ class RegicideFixedGUI:
         deck_x = self.width - 140
         deck_y = 30
         
-        # 绘制牌堆背景区域（更小）
-        deck_area = pygame.Rect(deck_x - 10, deck_y - 10, 120, 150)
-        pygame.draw.rect(self.screen, (30, 30, 60), deck_area)
-        pygame.draw.rect(self.screen, Colors.WHITE, deck_area, 2)
-        
-        # 标题
-        title_text = self.font_small.render("Deck", True, Colors.WHITE)
-        title_x = deck_x + 50 - title_text.get_width() // 2
-        self.screen.blit(title_text, (title_x, deck_y))
+        # 牌堆背景区域和标题（预先绘制的图层）
+        self.screen.blit(self.deck_panel_layer, (deck_x - 10, deck_y - 10))
         
         # 获取牌堆信息
         remaining_cards = len(self.game.deck.cards)
@@ -900,23 +1324,38 @@ class RegicideFixedGUI:
         
         # 显示剩余牌数
         remaining_text = f"Deck: {remaining_cards}"
-        remaining_surface = self.font_small.render(remaining_text, True, Colors.WHITE)
+        remaining_surface = render_text(self.font_small, remaining_text, Colors.WHITE)
         remaining_x = deck_x + 50 - remaining_surface.get_width() // 2
         self.screen.blit(remaining_surface, (remaining_x, deck_y + 70))
         
         # 显示弃牌堆数量
         discard_text = f"Discard: {discard_pile_count}"
-        discard_surface = self.font_small.render(discard_text, True, Colors.SILVER)
+        discard_surface = render_text(self.font_small, discard_text, Colors.SILVER)
         discard_x = deck_x + 50 - discard_surface.get_width() // 2
         self.screen.blit(discard_surface, (discard_x, deck_y + 90))
         
         # 如果牌堆为空，显示警告
         if remaining_cards == 0:
             warning_text = "EMPTY!"
-            warning_surface = self.font_small.render(warning_text, True, Colors.RED)
+            warning_surface = render_text(self.font_small, warning_text, Colors.RED)
             warning_x = deck_x + 50 - warning_surface.get_width() // 2
             self.screen.blit(warning_surface, (warning_x, deck_y + 45))
 
 if __name__ == "__main__":
-    game = RegicideFixedGUI()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Regicide card battle game")
+    parser.add_argument("--replay", metavar="LOG", help="open a recorded event log in replay mode")
+    parser.add_argument("--game", type=int, default=0, help="which game of the log to replay")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="repaint the whole window every frame instead of only changed regions (toggle with F2)")
+    args = parser.parse_args()
+    
+    game = RegicideFixedGUI(dirty_rects=not args.full_redraw)
+    if args.replay:
+        try:
+            game.start_replay(ReplayTimeline.from_file(args.replay, args.game))
+        except (OSError, ValueError, ReplayError) as error:
+            print(f"Cannot open replay: {error}")
+            sys.exit(1)
     game.run()
\ No newline at end of file
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Headless Batch Simulator
+无界面批量模拟器：用策略对象驱动游戏引擎，在进程池中批量运行对局
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+
+from discard_solver import DiscardObjective
+from game_engine import RegicideGame, GameState
+from game_log import GameLog
+
+
+class RandomPolicy:
+    """随机策略：在所有合法出牌中随机选择，随机弃牌直到满足要求"""
+
+    name = "random"
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    def reset(self, seed):
+        """新对局开始时按对局种子重置随机源，保证整局可复现"""
+        self.rng.seed(f"policy-{seed}")
+
+    def choose_play(self, game):
+        """选择要打出的牌"""
+        plays = game.get_possible_plays()
+        if not plays:
+            return None
+        return self.rng.choice(plays)
+
+    def choose_discard(self, game):
+        """选择要弃掉的牌"""
+        cards = list(game.get_current_player_hand().cards)
+        self.rng.shuffle(cards)
+        chosen = []
+        total = 0
+        for card in cards:
+            if total >= game.required_discard_value:
+                break
+            chosen.append(card)
+            total += card.attack_value
+        return chosen
+
+
+class GreedyPolicy:
+    """贪心策略：优先用最小代价击败敌人，否则打出伤害最高的牌；弃牌用求解器保留组合牌"""
+
+    name = "greedy"
+
+    def __init__(self, rng=None):
+        self.rng = rng
+
+    def reset(self, seed):
+        """确定性策略，无需重置"""
+
+    def choose_play(self, game):
+        """选择要打出的牌（一次性结算所有候选出牌）"""
+        best_play = None
+        best_key = None
+        for cards, outcome in game.evaluate_possible_plays():
+            cost = sum(card.attack_value for card in cards)
+            if outcome.defeats_enemy:
+                # 能击败敌人时，代价越小越好
+                key = (1, -cost, outcome.total_attack)
+            else:
+                key = (0, outcome.total_attack, -cost)
+            if best_key is None or key > best_key:
+                best_key = key
+                best_play = cards
+        return best_play
+
+    def choose_discard(self, game):
+        """选择要弃掉的牌：尽量保留组合牌的最小损失弃牌"""
+        return game.suggest_discard(DiscardObjective.KEEP_COMBOS) or []
+
+
+class HighCardPolicy:
+    """高牌策略：总是打出点数最大的单张牌；弃牌从小到大（批量NumPy引擎使用同一策略）"""
+
+    name = "highcard"
+
+    def __init__(self, rng=None):
+        self.rng = rng
+
+    def reset(self, seed):
+        """确定性策略，无需重置"""
+
+    def choose_play(self, game):
+        """选择要打出的牌"""
+        cards = game.get_current_player_hand().cards
+        if not cards:
+            return None
+        return [max(cards, key=lambda card: (card.attack_value, card.id))]
+
+    def choose_discard(self, game):
+        """选择要弃掉的牌"""
+        cards = sorted(game.get_current_player_hand().cards, key=lambda card: (card.attack_value, card.id))
+        chosen = []
+        total = 0
+        for card in cards:
+            if total >= game.required_discard_value:
+                break
+            chosen.append(card)
+            total += card.attack_value
+        return chosen
+
+
+# 可用策略注册表（按名称传递给子进程）
+POLICIES = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy,
+    HighCardPolicy.name: HighCardPolicy,
+}
+
+
+def spawn_seeds(seed, count):
+    """从一个主种子派生互相独立的子种子序列（每个工作进程/每局一个）"""
+    stream = random.Random(seed)
+    return [stream.getrandbits(63) for _ in range(count)]
+
+
+def step_game(game, policy, exporter=None):
+    """用策略推进一步（出牌或弃牌），返回对局是否仍在进行；exporter不为None时记录这一决策"""
+    if game.game_state in (GameState.VICTORY, GameState.DEFEAT):
+        return False
+
+    # 没有任何合法行动（无牌可出或手牌不够弃）视为失败
+    if not game.has_legal_action():
+        game.declare_defeat()
+        return False
+
+    if game.game_state == GameState.DISCARD_SELECTION:
+        chosen = policy.choose_discard(game)
+        for card in chosen:
+            # 与regicide_env的弃牌行动一致：每选一张牌是一个决策
+            if exporter is not None:
+                exporter.record(game, (card,), discard=True)
+            game.toggle_discard_selection(card)
+        ok = game.confirm_discard()
+    else:
+        cards = policy.choose_play(game)
+        if exporter is not None and cards:
+            exporter.record(game, cards)
+        ok = bool(cards) and bool(game.play_cards(cards))
+    if not ok:
+        game.declare_defeat()
+        return False
+
+    return game.game_state not in (GameState.VICTORY, GameState.DEFEAT)
+
+
+def play_game(game, policy, max_turns=1000, seed=None, exporter=None):
+    """用策略完整运行一局游戏，返回对局结果字典（相同seed得到相同对局）"""
+    game.start_new_game(seed)
+    policy.reset(game.game_seed)
+    if exporter is not None:
+        exporter.begin_game(game.game_seed)
+
+    steps = 0
+    while steps < max_turns and step_game(game, policy, exporter):
+        steps += 1
+
+    if exporter is not None:
+        exporter.end_game(game.victory, game.enemy_queue.get_defeated_enemies())
+
+    return {
+        'seed': game.game_seed,
+        'victory': game.victory,
+        'enemies_defeated': game.enemy_queue.get_defeated_enemies(),
+        'turns': game.turn_count,
+    }
+
+
+# 每批次最多记录的失败对局种子数
+MAX_RECORDED_LOSSES = 20
+
+
+# 当前进程的训练数据导出器：一个进程一个，跨批次累积成固定行数的分块
+_exporter = None
+
+
+def _open_exporter(export_dir):
+    """为当前进程创建导出器，文件名以进程号区分，各进程互不干扰"""
+    from data_export import TrainingDataExporter  # 需要numpy，只在导出时载入
+    return TrainingDataExporter(export_dir, prefix=f"part-{os.getpid()}")
+
+
+def _init_worker(export_dir):
+    """进程池初始化：创建本进程的导出器，进程退出时写出最后一个不满的分块"""
+    global _exporter
+    if export_dir is not None:
+        _exporter = _open_exporter(export_dir)
+        Finalize(_exporter, _exporter.close, exitpriority=10)
+
+
+def _run_chunk(policy_name, chunk_seed, games, max_turns, record_log=False):
+    """
+    子进程任务：用本批次独立的种子流运行一批对局并返回汇总结果（以及本批次的事件日志）。
+    训练数据写入本进程的导出器（见_init_worker）。
+    """
+    policy = POLICIES[policy_name]()
+    game = RegicideGame()
+    log = GameLog() if record_log else None
+    game.attach_log(log)
+    exporter = _exporter
+    rows_before = exporter.rows_recorded if exporter is not None else 0
+    wins = 0
+    enemies = 0
+    turns = 0
+    loss_seeds = []
+    for game_seed in spawn_seeds(chunk_seed, games):
+        result = play_game(game, policy, max_turns, game_seed, exporter)
+        wins += result['victory']
+        enemies += result['enemies_defeated']
+        turns += result['turns']
+        if not result['victory'] and len(loss_seeds) < MAX_RECORDED_LOSSES:
+            loss_seeds.append(game_seed)
+    exported = exporter.rows_recorded - rows_before if exporter is not None else 0
+    return games, wins, enemies, turns, exported, loss_seeds, log.to_bytes() if log is not None else b""
+
+
+def run_batch(games, policy_name="greedy", workers=None, chunk_size=200, max_turns=1000, seed=None,
+              log_path=None, export_dir=None):
+    """
+    在进程池中批量运行对局，返回统计信息（相同seed与chunk_size得到相同结果）。
+    指定log_path时把所有对局的事件日志按批次顺序写入该文件（见game_log）；
+    指定export_dir时把每个决策导出为训练数据（见data_export）。
+    """
+    if policy_name not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy_name}")
+    workers = workers or os.cpu_count() or 1
+
+    chunks = []
+    remaining = games
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append(size)
+        remaining -= size
+    chunk_seeds = spawn_seeds(seed, len(chunks))
+
+    start_time = time.perf_counter()
+    totals = [0, 0, 0, 0, 0]
+    loss_seeds = []
+    record_log = log_path is not None
+    task_args = ([policy_name] * len(chunks), chunk_seeds, chunks, [max_turns] * len(chunks),
+                 [record_log] * len(chunks))
+    if workers == 1:
+        global _exporter
+        _exporter = _open_exporter(export_dir) if export_dir is not None else None
+        try:
+            results = list(map(_run_chunk, *task_args))
+        finally:
+            if _exporter is not None:
+                _exporter.close()
+                _exporter = None
+    else:
+        # 退出with时等待工作进程结束，它们的导出器在退出前写完最后的分块
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(export_dir,)) as executor:
+            results = list(executor.map(_run_chunk, *task_args))
+    for *counts, chunk_losses, _ in results:
+        totals = [a + b for a, b in zip(totals, counts)]
+        loss_seeds.extend(chunk_losses[:MAX_RECORDED_LOSSES - len(loss_seeds)])
+    log_bytes = 0
+    if record_log:
+        with open(log_path, "wb") as stream:
+            for *_, chunk_log in results:
+                stream.write(chunk_log)
+                log_bytes += len(chunk_log)
+    elapsed = time.perf_counter() - start_time
+
+    played, wins, enemies, turns, exported = totals
+    return {
+        'policy': policy_name,
+        'seed': seed,
+        'games': played,
+        'workers': workers,
+        'elapsed': elapsed,
+        'games_per_sec': played / elapsed if elapsed > 0 else 0.0,
+        'wins': wins,
+        'win_rate': wins / played if played else 0.0,
+        'avg_enemies_defeated': enemies / played if played else 0.0,
+        'avg_turns': turns / played if played else 0.0,
+        'loss_seeds': loss_seeds,
+        'log_path': log_path,
+        'log_bytes': log_bytes,
+        'export_dir': export_dir,
+        'exported_rows': exported,
+    }
+
+
+def rerun_game(game_seed, policy_name="greedy", max_turns=1000):
+    """用单个对局种子重新运行一局（复现失败对局）"""
+    return play_game(RegicideGame(), POLICIES[policy_name](), max_turns, game_seed)
+
+
+def format_report(stats):
+    """格式化统计结果"""
+    lines = [
+        f"Policy:            {stats['policy']}",
+        f"Games:             {stats['games']} ({stats['workers']} workers)",
+        f"Elapsed:           {stats['elapsed']:.2f}s",
+        f"Games/sec:         {stats['games_per_sec']:.1f}",
+        f"Win rate:          {stats['win_rate']:.2%} ({stats['wins']} wins)",
+        f"Enemies defeated:  {stats['avg_enemies_defeated']:.2f} avg",
+        f"Turns:             {stats['avg_turns']:.1f} avg",
+        f"Lost game seeds:   {' '.join(str(seed) for seed in stats['loss_seeds'][:5]) or '-'}",
+    ]
+    if stats.get('log_path'):
+        per_game = stats['log_bytes'] / stats['games'] if stats['games'] else 0.0
+        lines.append(f"Event log:         {stats['log_path']} ({stats['log_bytes']} bytes, {per_game:.0f} bytes/game)")
+    if stats.get('export_dir'):
+        lines.append(f"Training data:     {stats['export_dir']} ({stats['exported_rows']} rows)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regicide headless batch simulator")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to simulate")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="greedy", help="play/discard policy")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="games per worker task")
+    parser.add_argument("--max-turns", type=int, default=1000, help="turn limit per game")
+    parser.add_argument("--seed", type=int, default=None, help="master seed for reproducible runs")
+    parser.add_argument("--rerun", type=int, default=None, metavar="GAME_SEED",
+                        help="replay a single game from its game seed")
+    parser.add_argument("--log", default=None, metavar="PATH", help="write a binary event log of every game")
+    parser.add_argument("--export", default=None, metavar="DIR",
+                        help="write every decision as training data (.npz chunks, needs numpy)")
+    args = parser.parse_args()
+
+    if args.rerun is not None:
+        result = rerun_game(args.rerun, args.policy, args.max_turns)
+        outcome = "victory" if result['victory'] else "defeat"
+        print(f"Game {result['seed']}: {outcome}, {result['enemies_defeated']} enemies defeated, "
+              f"{result['turns']} turns")
+        return
+
+    stats = run_batch(args.games, args.policy, args.workers, args.chunk_size, args.max_turns, args.seed,
+                      args.log, args.export)
+    print(format_report(stats))
+
+
+if __name__ == "__main__":
+    main()
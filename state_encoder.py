@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - State Encoder
+状态特征编码：把 RegicideGame 的状态直接写入调用方预先分配的float32数组（稳定状态下不分配新数组）
+
+特征布局（FEATURE_LAYOUT 给出每段的偏移和长度）：
+    hand            52  手牌（按牌编号）
+    selected        52  已选中要弃的牌
+    deck            52  牌库中的牌（不含顺序，可由公开信息推出）
+    discard         52  弃牌堆中的牌
+    enemy_suit       4  当前敌人花色
+    enemy_rank       3  当前敌人J/Q/K
+    enemy_stats      4  生命/40、最大生命/40、实际攻击力/20、黑桃累计降低的攻击力/20
+    counts           5  剩余敌人/12、需弃点数/20、手牌数/手牌上限、牌库数/40、弃牌堆数/40
+    phase            7  游戏状态（GameState）
+"""
+
+import numpy as np
+
+from card import CARD_COUNT, SUIT_INDEX, Rank
+from game_engine import GAME_STATES, GAME_STATE_CODES, RegicideGame
+
+
+def _build_layout(sections):
+    """由 (名称, 长度) 列表计算 {名称: (偏移, 长度)}"""
+    layout = {}
+    offset = 0
+    for name, size in sections:
+        layout[name] = (offset, size)
+        offset += size
+    return layout, offset
+
+
+FEATURE_LAYOUT, FEATURE_SIZE = _build_layout((
+    ('hand', CARD_COUNT),
+    ('selected', CARD_COUNT),
+    ('deck', CARD_COUNT),
+    ('discard', CARD_COUNT),
+    ('enemy_suit', 4),
+    ('enemy_rank', 3),
+    ('enemy_stats', 4),
+    ('counts', 5),
+    ('phase', len(GAME_STATES)),
+))
+
+_HAND = FEATURE_LAYOUT['hand'][0]
+_SELECTED = FEATURE_LAYOUT['selected'][0]
+_DECK = FEATURE_LAYOUT['deck'][0]
+_DISCARD = FEATURE_LAYOUT['discard'][0]
+_ENEMY_SUIT = FEATURE_LAYOUT['enemy_suit'][0]
+_ENEMY_RANK = FEATURE_LAYOUT['enemy_rank'][0]
+_ENEMY_STATS = FEATURE_LAYOUT['enemy_stats'][0]
+_COUNTS = FEATURE_LAYOUT['counts'][0]
+_PHASE = FEATURE_LAYOUT['phase'][0]
+
+ENEMY_COUNT = 12
+DECK_CAPACITY = 40
+HEALTH_SCALE = 40.0
+ATTACK_SCALE = 20.0
+
+# 每个字节值对应的8个0/1位（低位在前）。四个牌掩码段在特征向量中相邻：
+# 掩码写入预分配的64位字，按字节查表展开到预分配的位缓冲区，再取每段的前52位复制到输出
+# （模块级缓冲区，只能在一个线程中编码）
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder='little').astype(np.float32)
+_CARD_SECTIONS = 4
+_mask_words = np.zeros(_CARD_SECTIONS, dtype='<u8')
+_mask_bytes = _mask_words.view(np.uint8)
+_mask_bits = np.zeros((_CARD_SECTIONS * 8, 8), dtype=np.float32)
+_card_bits = _mask_bits.reshape(_CARD_SECTIONS, 64)[:, :CARD_COUNT]
+assert _SELECTED == _HAND + CARD_COUNT and _DECK == _SELECTED + CARD_COUNT and _DISCARD == _DECK + CARD_COUNT
+
+
+def allocate(count=None):
+    """分配特征缓冲区：count为None时为一维 (FEATURE_SIZE,)，否则为 (count, FEATURE_SIZE)"""
+    shape = FEATURE_SIZE if count is None else (count, FEATURE_SIZE)
+    return np.zeros(shape, dtype=np.float32)
+
+
+def encode_state(game, out):
+    """
+    把游戏状态写入 out（长度 FEATURE_SIZE 的C连续float32数组，或二维缓冲区的一行），返回 out。
+    所有特征段都会被完整覆盖，缓冲区可以跨局、跨步骤重复使用。
+    """
+    hand = game.get_current_player_hand()
+    deck = game.deck
+    discard_pile = game.discard_pile
+
+    selected = 0
+    for card in game.selected_for_discard:
+        selected |= 1 << card.id
+    _mask_words[0] = hand.mask
+    _mask_words[1] = selected
+    _mask_words[2] = deck.mask
+    _mask_words[3] = discard_pile.mask
+    np.take(_BYTE_BITS, _mask_bytes, axis=0, mode='clip', out=_mask_bits)
+    out[_HAND:_HAND + _CARD_SECTIONS * CARD_COUNT].reshape(_CARD_SECTIONS, CARD_COUNT)[...] = _card_bits
+
+    out[_ENEMY_SUIT:] = 0.0
+    enemy_queue = game.enemy_queue
+    enemy = enemy_queue.get_current_enemy()
+    if enemy is not None:
+        out[_ENEMY_SUIT + SUIT_INDEX[enemy.suit]] = 1.0
+        out[_ENEMY_RANK + enemy.rank.value - Rank.JACK.value] = 1.0
+        out[_ENEMY_STATS] = enemy.current_health / HEALTH_SCALE
+        out[_ENEMY_STATS + 1] = enemy.max_health / HEALTH_SCALE
+        out[_ENEMY_STATS + 2] = enemy.attack_power / ATTACK_SCALE
+        out[_ENEMY_STATS + 3] = enemy.attack_reduction / ATTACK_SCALE
+
+    out[_COUNTS] = (ENEMY_COUNT - enemy_queue.get_defeated_enemies()) / ENEMY_COUNT
+    out[_COUNTS + 1] = game.required_discard_value / ATTACK_SCALE
+    out[_COUNTS + 2] = hand.size() / RegicideGame.MAX_HAND_SIZE
+    out[_COUNTS + 3] = deck.cards_left() / DECK_CAPACITY
+    out[_COUNTS + 4] = len(discard_pile) / DECK_CAPACITY
+
+    out[_PHASE + GAME_STATE_CODES[game.game_state]] = 1.0
+    return out
+
+
+def encode_batch(games, out):
+    """把多局游戏的状态写入 out 的前 len(games) 行（形状 (N, FEATURE_SIZE)），返回 out"""
+    for row, game in enumerate(games):
+        encode_state(game, out[row])
+    return out
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+MCTSAdvisor 进程池复用测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advisor import MCTSAdvisor  # noqa: E402
+from game_engine import RegicideGame  # noqa: E402
+
+
+def test_parallel_advisor_reuses_its_pool():
+    game = RegicideGame()
+    game.start_new_game(1)
+    with MCTSAdvisor(iterations=40, workers=2, seed=1) as advisor:
+        first = advisor.advise(game)
+        executor = advisor._executor
+        assert executor is not None
+        second = advisor.advise(game)
+        assert advisor._executor is executor
+        assert sum(item['visits'] for item in first) == sum(item['visits'] for item in second) == 40
+    assert advisor._executor is None
+
+    # 关闭后再次调用会重新创建进程池
+    advisor.advise(game)
+    assert advisor._executor is not None
+    advisor.close()
+    assert advisor._executor is None
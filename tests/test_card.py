@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Hand 出牌枚举与 DiscardPile 测试
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import card  # noqa: E402
+from card import CARDS_BY_ID, DiscardPile, Hand  # noqa: E402
+
+
+def make_hand(card_ids):
+    hand = Hand()
+    hand.add_cards(CARDS_BY_ID[card_id] for card_id in card_ids)
+    return hand
+
+
+def test_mutating_hand_during_iteration_does_not_poison_memo():
+    card_ids = (0, 1, 14, 27, 3, 16)
+    card._PLAYS_MEMO.clear()
+    expected = list(make_hand(card_ids).iter_plays())
+    card._PLAYS_MEMO.clear()
+
+    hand = make_hand(card_ids)
+    plays = hand.iter_plays()
+    first = next(plays)
+    hand.remove_card(CARDS_BY_ID[27])
+    assert [first] + list(plays) == expected
+
+    assert make_hand(card_ids).mask not in card._PLAYS_MEMO
+    assert list(make_hand(card_ids).iter_plays()) == expected
+    assert (CARDS_BY_ID[27],) in expected
+
+
+def test_discard_pile_add_remove_and_order():
+    cards = [CARDS_BY_ID[card_id] for card_id in (5, 17, 30, 2, 44)]
+    pile = DiscardPile(cards)
+    assert len(pile) == 5
+    assert pile.cards == cards
+    assert all(card in pile for card in cards)
+
+    # 从中间移除：其余的牌保持加入顺序
+    pile.remove(cards[1])
+    assert cards[1] not in pile
+    assert pile.cards == [cards[0], cards[2], cards[3], cards[4]]
+    assert list(pile) == pile.cards
+
+    # 移除数组中的最后一张
+    pile.remove(cards[4])
+    assert pile.cards == [cards[0], cards[2], cards[3]]
+
+    # 重新加入的牌排在最后
+    pile.append(cards[1])
+    assert cards[1] in pile
+    assert pile.cards == [cards[0], cards[2], cards[3], cards[1]]
+    assert pile.mask == sum(1 << card.id for card in pile.cards)
+
+    with pytest.raises(ValueError):
+        pile.append(cards[0])
+    with pytest.raises(ValueError):
+        pile.remove(cards[4])
+
+
+def test_discard_pile_random_removals_keep_insertion_order():
+    rng = random.Random(4)
+    pile = DiscardPile()
+    expected = []
+    for _ in range(500):
+        absent = [card for card in CARDS_BY_ID if card not in pile]
+        if expected and (not absent or rng.random() < 0.5):
+            card = rng.choice(expected)
+            pile.remove(card)
+            expected.remove(card)
+        else:
+            card = rng.choice(absent)
+            pile.append(card)
+            expected.append(card)
+        assert pile.cards == expected
+        assert len(pile) == len(expected)
+    removed = pile.sample_remove(5, rng)
+    assert len(removed) == min(5, len(expected))
+    assert pile.cards == [card for card in expected if card not in removed]
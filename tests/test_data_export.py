@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+训练数据导出往返测试：写出分块后读回
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+np = pytest.importorskip("numpy")
+
+from data_export import COLUMNS, TrainingDataExporter, iter_chunks, unpack_legal  # noqa: E402
+from game_engine import RegicideGame  # noqa: E402
+from simulator import GreedyPolicy, play_game, run_batch  # noqa: E402
+
+
+def check_chunks(directory, expected_rows, chunk_rows=None):
+    """读回所有分块，检查列的类型、行数和行动掩码；返回读到的行数"""
+    total = 0
+    for chunk in iter_chunks(directory):
+        rows = len(chunk['action'])
+        assert set(chunk) == set(COLUMNS)
+        for name, (dtype, shape) in COLUMNS.items():
+            assert chunk[name].dtype == dtype
+            assert chunk[name].shape == (rows,) + shape
+        if chunk_rows is not None:
+            assert rows <= chunk_rows
+        legal = unpack_legal(chunk['legal'])
+        assert legal[np.arange(rows), chunk['action']].all()
+        total += rows
+    assert total == expected_rows
+    return total
+
+
+def test_exporter_round_trip_with_small_chunks(tmp_path):
+    game = RegicideGame()
+    policy = GreedyPolicy()
+    with TrainingDataExporter(str(tmp_path), chunk_rows=7, queue_size=1) as exporter:
+        for seed in range(12):
+            play_game(game, policy, seed=seed, exporter=exporter)
+    assert exporter.rows_recorded == exporter.rows_written > 7 * 4
+    assert len(exporter.files) == -(-exporter.rows_written // 7)
+    check_chunks(str(tmp_path), exporter.rows_written, chunk_rows=7)
+
+    # 每局的结果在跨越分块边界时也一致
+    outcomes = {}
+    for chunk in iter_chunks(str(tmp_path)):
+        for seed, victory, defeated in zip(chunk['game_seed'], chunk['victory'], chunk['enemies_defeated']):
+            assert outcomes.setdefault(int(seed), (victory, defeated)) == (victory, defeated)
+    assert len(outcomes) == 12
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_export_flushes_every_worker(tmp_path, workers):
+    stats = run_batch(40, "greedy", workers=workers, chunk_size=5, seed=3, export_dir=str(tmp_path))
+    assert stats['exported_rows'] > 0
+    check_chunks(str(tmp_path), stats['exported_rows'])
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+弃牌求解器与穷举所有子集的结果对比
+"""
+
+import os
+import random
+import sys
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from card import CARDS_BY_ID, Rank  # noqa: E402
+from discard_solver import DiscardObjective, optimal_discards, solve_discard  # noqa: E402
+
+NUMBER_CARDS = [card for card in CARDS_BY_ID if card.is_number_card]
+
+
+def objective_key(hand, discard, objective):
+    """按目标的优先级排列的代价（越小越好）"""
+    total = sum(card.attack_value for card in discard)
+    if objective == DiscardObjective.MIN_TOTAL:
+        return total, len(discard)
+    if objective == DiscardObjective.FEWEST_CARDS:
+        return len(discard), total
+    ranks = [card.rank for card in hand]
+    combo_pieces = sum(card.rank == Rank.ACE or ranks.count(card.rank) > 1 for card in discard)
+    return combo_pieces, total, len(discard)
+
+
+def brute_force(hand, required, objective):
+    """穷举：所有满足要求的子集中代价最小的那些"""
+    feasible = [subset for size in range(len(hand) + 1) for subset in combinations(hand, size)
+                if sum(card.attack_value for card in subset) >= required]
+    if not feasible:
+        return None, set()
+    best = min(objective_key(hand, subset, objective) for subset in feasible)
+    return best, {frozenset(subset) for subset in feasible if objective_key(hand, subset, objective) == best}
+
+
+def random_cases(count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        hand = rng.sample(NUMBER_CARDS, rng.randint(1, 8))
+        yield hand, rng.randint(1, sum(card.attack_value for card in hand) + 3)
+
+
+@pytest.mark.parametrize("objective", list(DiscardObjective))
+def test_solver_matches_brute_force(objective):
+    for hand, required in random_cases(300):
+        best, optimal = brute_force(hand, required, objective)
+        solution = solve_discard(hand, required, objective)
+        if best is None:
+            assert solution is None
+            assert optimal_discards(hand, required, objective) == []
+            continue
+        assert objective_key(hand, solution, objective) == best
+        solutions = optimal_discards(hand, required, objective, limit=1 << 10)
+        assert len(solutions) == len({frozenset(subset) for subset in solutions})
+        assert {frozenset(subset) for subset in solutions} == optimal
+
+
+def test_infeasible_and_trivial_requirements():
+    hand = [card for card in NUMBER_CARDS if card.rank in (Rank.TWO, Rank.THREE)][:3]
+    total = sum(card.attack_value for card in hand)
+    for objective in DiscardObjective:
+        assert solve_discard(hand, total + 1, objective) is None
+        assert optimal_discards(hand, total + 1, objective) == []
+        assert solve_discard([], 1, objective) is None
+        assert solve_discard(hand, 0, objective) == []
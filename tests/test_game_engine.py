@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+RegicideGame 快照与复制测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import RegicideGame  # noqa: E402
+from simulator import RandomPolicy, step_game  # noqa: E402
+
+
+def test_clone_matches_and_diverges_independently():
+    for seed in range(30):
+        game = RegicideGame()
+        game.start_new_game(seed)
+        policy = RandomPolicy()
+        policy.reset(seed)
+        for _ in range(seed % 7):
+            step_game(game, policy)
+
+        clone = game.clone()
+        assert clone.snapshot(include_rng=True) == game.snapshot(include_rng=True)
+        assert clone.state_hash() == game.state_hash()
+
+        # 相同的行动序列得到相同的对局（随机源状态也被复制）
+        original_policy, clone_policy = RandomPolicy(), RandomPolicy()
+        original_policy.reset(seed + 1)
+        clone_policy.reset(seed + 1)
+        before = game.snapshot(include_rng=True)
+        clone_running = True
+        while clone_running:
+            clone_running = step_game(clone, clone_policy)
+        assert game.snapshot(include_rng=True) == before
+
+        while step_game(game, original_policy):
+            pass
+        assert game.snapshot(include_rng=True) == clone.snapshot(include_rng=True)
+
+
+def test_clone_then_restore_original_state():
+    game = RegicideGame()
+    game.start_new_game(3)
+    snapshot = game.snapshot(include_rng=True)
+    clone = game.clone()
+    clone.restore(snapshot)
+    assert clone.snapshot(include_rng=True) == snapshot
+    assert game.enemy_queue.get_current_enemy() is not clone.enemy_queue.get_current_enemy()
+
+
+def test_derived_game_seeds_do_not_depend_on_earlier_games():
+    played, idle = RegicideGame(seed=11), RegicideGame(seed=11)
+    played.start_new_game()
+    idle.start_new_game()
+    assert played.game_seed == idle.game_seed
+
+    # 一局打完、另一局什么都不做，之后派生的种子仍然相同
+    policy = RandomPolicy()
+    policy.reset(played.game_seed)
+    while step_game(played, policy):
+        pass
+    idle.rng.random()
+    played.start_new_game()
+    idle.start_new_game()
+    assert played.game_seed == idle.game_seed
+    assert played.snapshot(include_rng=True) == idle.snapshot(include_rng=True)
+
+    # 每局的随机源只由本局种子决定
+    fresh = RegicideGame()
+    fresh.start_new_game(played.game_seed)
+    assert fresh.snapshot(include_rng=True) == played.snapshot(include_rng=True)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+事件日志往返测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+from game_engine import GameState, RegicideGame  # noqa: E402
+from game_log import GameLog, iter_events, replay  # noqa: E402
+from simulator import GreedyPolicy, play_game  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", [0, 12345, (1 << 63) - 1, -(1 << 63)])
+def test_game_survives_log_round_trip(seed):
+    game = RegicideGame()
+    log = GameLog()
+    game.attach_log(log)
+    play_game(game, GreedyPolicy(), seed=seed)
+
+    replayed = replay(iter_events(log.to_bytes()))
+    assert replayed.game_seed == seed
+    assert replayed.snapshot(include_rng=True) == game.snapshot(include_rng=True)
+
+
+@pytest.mark.parametrize("seed", [1 << 63, -(1 << 63) - 1, "seed"])
+def test_out_of_range_seed_is_rejected_before_setup(seed):
+    game = RegicideGame()
+    log = GameLog()
+    game.attach_log(log)
+    with pytest.raises(ValueError, match="Game seed"):
+        game.start_new_game(seed)
+    assert len(log) == 0
+    assert game.game_state == GameState.MENU
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+GUI 自适应帧调度测试（SDL dummy 驱动，无需显示器）
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pytest  # noqa: E402
+
+pygame = pytest.importorskip("pygame")
+
+from game_log import GameLog, ReplayTimeline  # noqa: E402
+from game_engine import RegicideGame  # noqa: E402
+from regicide_fixed import RegicideFixedGUI  # noqa: E402
+from simulator import GreedyPolicy, play_game  # noqa: E402
+
+
+@pytest.fixture
+def gui():
+    gui = RegicideFixedGUI()
+    yield gui
+    pygame.quit()
+
+
+def recorded_timeline(seed=7):
+    game = RegicideGame()
+    log = GameLog()
+    game.attach_log(log)
+    play_game(game, GreedyPolicy(), seed=seed)
+    return ReplayTimeline(log.events())
+
+
+def test_idle_without_animation(gui):
+    gui.messages.clear()
+    assert not gui.animation_active()
+    assert gui.idle_timeout() == gui.IDLE_TIMEOUT_MS
+
+
+def test_replay_autoplay_runs_at_full_rate(gui):
+    gui.start_replay(recorded_timeline())
+    gui.seek_replay(0)
+    assert gui.idle_timeout() > 0
+
+    gui.toggle_autoplay()
+    assert gui.animation_active()
+    assert gui.idle_timeout() == 0
+
+    gui.autoplay_since -= gui.REPLAY_STEP_MS
+    gui.update()
+    assert gui.replay.position == 1
+    assert gui.idle_timeout() == 0
+
+    gui.toggle_autoplay()
+    assert not gui.animation_active()
+    assert gui.idle_timeout() > 0
+
+
+def test_autoplay_stops_at_end_of_replay(gui):
+    gui.start_replay(recorded_timeline())
+    gui.seek_replay(len(gui.replay) - 1)
+    gui.toggle_autoplay()
+    gui.autoplay_since -= gui.REPLAY_STEP_MS
+    gui.update()
+    assert gui.replay.position == len(gui.replay)
+    assert not gui.animation_active()
+
+
+def test_exit_replay_stops_animation(gui):
+    gui.start_replay(recorded_timeline())
+    gui.seek_replay(0)
+    gui.toggle_autoplay()
+    gui.exit_replay()
+    assert not gui.animation_active()
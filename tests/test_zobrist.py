@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+增量维护的Zobrist哈希与从头计算的结果对比
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import ids_to_cards  # noqa: E402
+from game_engine import GAME_STATE_CODES, RegicideGame  # noqa: E402
+from game_log import DISCARD, DRAW, HEAL, PLAY, GameLog  # noqa: E402
+from simulator import RandomPolicy, step_game  # noqa: E402
+from zobrist import (DECK_KEYS, DECK_ORDER_KEYS, DEFEATED_KEYS, DISCARD_KEYS, DISCARD_ORDER_KEYS,  # noqa: E402
+                     ENEMY_HEALTH_KEYS, ENEMY_KEYS, ENEMY_ORDER_KEYS, ENEMY_REDUCTION_KEYS, HAND_KEYS,
+                     MASK64, PHASE_KEYS, PLAYER_KEYS, REQUIRED_KEYS, SELECTED_KEYS, TURN_KEY,
+                     hash_cards, hash_sequence, rotate)
+
+
+def canonical_hash(game):
+    """从头计算 state_hash()"""
+    value = (PHASE_KEYS[GAME_STATE_CODES[game.game_state]]
+             ^ REQUIRED_KEYS[game.required_discard_value]
+             ^ PLAYER_KEYS[game.current_player]
+             ^ hash_cards(DECK_KEYS, game.deck.cards)
+             ^ hash_cards(DISCARD_KEYS, game.discard_pile.cards)
+             ^ hash_cards(SELECTED_KEYS, game.selected_for_discard))
+    queue = game.enemy_queue
+    value ^= DEFEATED_KEYS[queue.current_enemy_index]
+    enemy = queue.get_current_enemy()
+    if enemy is not None:
+        value ^= (ENEMY_KEYS[enemy.card.id] ^ ENEMY_HEALTH_KEYS[enemy.current_health]
+                  ^ ENEMY_REDUCTION_KEYS[min(enemy.attack_reduction, enemy.base_attack_power)])
+    for index, hand in enumerate(game.player_hands):
+        value ^= rotate(hash_cards(HAND_KEYS, hand.cards), index)
+    return value
+
+
+def full_hash(game):
+    """从头计算 full_state_hash()"""
+    discard_slots = ids_to_cards(game.discard_pile.get_state()[1])
+    return (canonical_hash(game)
+            ^ rotate(hash_sequence(DECK_ORDER_KEYS, game.deck.cards), 1)
+            ^ rotate(hash_sequence(DISCARD_ORDER_KEYS, discard_slots), 2)
+            ^ rotate(hash_sequence(ENEMY_ORDER_KEYS, (enemy.card for enemy in game.enemy_queue.enemies)), 3)
+            ^ (game.turn_count * TURN_KEY & MASK64))
+
+
+def test_incremental_hashes_match_recompute():
+    seen = set()
+    for seed in range(40):
+        game = RegicideGame()
+        log = GameLog()
+        game.attach_log(log)
+        game.start_new_game(seed)
+        policy = RandomPolicy()
+        policy.reset(seed)
+        running = True
+        while running:
+            assert game.state_hash() == canonical_hash(game)
+            assert game.full_state_hash() == full_hash(game)
+            running = step_game(game, policy)
+        assert game.state_hash() == canonical_hash(game)
+        assert game.full_state_hash() == full_hash(game)
+        seen.update(event for event, _ in log.events())
+    # 出牌、弃牌、红桃回复和方块抽牌都经过了检查
+    assert {PLAY, DISCARD, HEAL, DRAW} <= seen
+
+
+def test_full_hash_distinguishes_deck_order():
+    game = RegicideGame()
+    game.start_new_game(1)
+    other = game.clone()
+    cards = list(other.deck.cards)
+    cards[0], cards[-1] = cards[-1], cards[0]
+    other.deck.cards = cards
+    assert other.state_hash() == game.state_hash()
+    assert other.full_state_hash() != game.full_state_hash()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Font and Text Cache
+字体注册表和文字Surface的LRU缓存：界面每帧绘制的文字大多相同，只在第一次出现时渲染
+"""
+
+from collections import OrderedDict
+
+import pygame
+
+DEFAULT_MAX_ENTRIES = 512
+
+# (字体文件, 字号) -> Font；创建Font需要读取并解析字体文件，整个界面共享同一批对象
+_fonts = {}
+
+
+def get_font(size, name=None):
+    """按字体文件和字号取共享的Font对象（name为None时使用pygame默认字体）"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+def clear_fonts():
+    """丢弃所有Font对象（pygame.quit() 之后需要重新初始化时调用）"""
+    _fonts.clear()
+    text_cache.clear()
+
+
+class TextCache:
+    """
+    文字Surface的LRU缓存，键为 (字体, 文字, 颜色, 抗锯齿)。
+
+    条目数超过 max_entries 时淘汰最久未使用的条目，长时间运行（回合数、数字不断变化）内存也不会增长。
+    颜色需为元组（可哈希）；返回的Surface是共享的，调用方不要修改。
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """取缓存中的文字Surface，没有时渲染一次"""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """清空缓存（计数保留）"""
+        self._surfaces.clear()
+
+    def stats(self):
+        """命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._surfaces),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+# 界面共用的缓存
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):
+    """用共享缓存渲染文字"""
+    return text_cache.render(font, text, color, antialias)
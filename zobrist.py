@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Regicide Game - Zobrist Keys
+Zobrist哈希随机键表：牌库、手牌、弃牌堆和敌人在每次变化时用异或增量更新自己的哈希值
+
+键表由固定种子生成，所以同一状态在不同进程、不同运行中的哈希值相同。
+
+与顺序有关的部分（牌库顺序、弃牌堆数组顺序、敌人出场顺序）使用位置多项式哈希：
+序列 c0, c1, ... 的哈希为 sum(keys[ci] * ORDER_BASE**i) mod 2**64，
+在两端或任意位置增删一张牌只需常数次乘加。
+"""
+
+import random
+
+_rng = random.Random(0x5EED_2E61C1DE)
+
+
+def _keys(count):
+    """生成count个64位随机键"""
+    return tuple(_rng.getrandbits(64) for _ in range(count))
+
+
+# 牌在各个位置上的键（按牌编号）
+HAND_KEYS = _keys(52)
+DECK_KEYS = _keys(52)
+DISCARD_KEYS = _keys(52)
+SELECTED_KEYS = _keys(52)
+
+# 敌人：当前敌人身份（按牌编号）、生命值、有效的攻击力减少值、已击败数
+ENEMY_KEYS = _keys(52)
+ENEMY_HEALTH_KEYS = _keys(41)
+ENEMY_REDUCTION_KEYS = _keys(21)
+DEFEATED_KEYS = _keys(13)
+
+# 游戏层面：游戏状态、需弃点数、当前玩家
+PHASE_KEYS = _keys(8)
+REQUIRED_KEYS = _keys(64)
+PLAYER_KEYS = _keys(8)
+
+# 顺序哈希：牌库（从底到顶）、弃牌堆数组、敌人队列中每个位置上的牌，以及回合数
+DECK_ORDER_KEYS = _keys(52)
+DISCARD_ORDER_KEYS = _keys(52)
+ENEMY_ORDER_KEYS = _keys(52)
+TURN_KEY = _rng.getrandbits(64) | 1
+
+MASK64 = (1 << 64) - 1
+
+# 位置多项式的底数（奇数）及其各次幂；任何序列都不超过52张牌
+ORDER_BASE = _rng.getrandbits(64) | 1
+ORDER_POWERS = tuple(pow(ORDER_BASE, position, 1 << 64) for position in range(53))
+
+
+def hash_mask(keys, mask):
+    """牌掩码中所有牌的键的异或（耗时与牌数成正比）"""
+    value = 0
+    while mask:
+        low = mask & -mask
+        value ^= keys[low.bit_length() - 1]
+        mask ^= low
+    return value
+
+
+def hash_cards(keys, cards):
+    """一组牌的键的异或"""
+    value = 0
+    for card in cards:
+        value ^= keys[card.id]
+    return value
+
+
+def hash_sequence(keys, cards):
+    """一串牌的位置多项式哈希（第i张牌的键乘以 ORDER_BASE**i）"""
+    value = 0
+    for position, card in enumerate(cards):
+        value += keys[card.id] * ORDER_POWERS[position]
+    return value & MASK64
+
+
+def rotate(value, count):
+    """64位循环左移，用于区分多名玩家的手牌哈希"""
+    count %= 64
+    return ((value << count) | (value >> (64 - count))) & MASK64 if count else value